@@ -2,7 +2,7 @@
 import os
 import warnings
 import logging
-from typing import Any, Dict, IO, List, Union, Optional, Sequence
+from typing import Any, Dict, IO, List, Union, Optional, Sequence, Tuple
 
 # this has to be set before importing tensorflow
 os.environ["TF_USE_LEGACY_KERAS"] = "1"
@@ -26,6 +26,11 @@ from deepface.modules import (
     detection,
     streaming,
     preprocessing,
+    embedding_cache,
+    batching,
+    calibration,
+    compilation,
+    warmup as warming,
 )
 from deepface import __version__
 
@@ -48,7 +53,12 @@ if tf_version == 2:
 folder_utils.initialize_folder()
 
 
-def build_model(model_name: str, task: str = "facial_recognition") -> Any:
+def build_model(
+    model_name: str,
+    task: str = "facial_recognition",
+    backend: Optional[str] = None,
+    quantization: Optional[str] = None,
+) -> Any:
     """
     This function builds a pre-trained model
     Args:
@@ -61,10 +71,135 @@ def build_model(model_name: str, task: str = "facial_recognition") -> Any:
             - Fasnet for spoofing
         task (str): facial_recognition, facial_attribute, face_detector, spoofing
             default is facial_recognition
+        backend (str): runtime of facial recognition models, tensorflow or onnx.
+            Keras models are exported to onnx once and run with onnx runtime then.
+            Default is DEEPFACE_BACKEND environment variable or tensorflow if it is not set.
+        quantization (str): dynamic or static to run an int8 variant of a keras facial
+            recognition model with onnx runtime. Static variants must be calibrated with
+            quantize_model first. It cannot be requested with the tensorflow backend.
+            If neither backend nor quantization is given, default is DEEPFACE_QUANTIZATION
+            environment variable for keras facial recognition models, or None for the float
+            model if it is not set.
     Returns:
         built_model
     """
-    return modeling.build_model(task=task, model_name=model_name)
+    return modeling.build_model(
+        task=task, model_name=model_name, backend=backend, quantization=quantization
+    )
+
+
+def preload_models(
+    model_names: List[str],
+    task: str = "facial_recognition",
+    backend: Optional[str] = None,
+    quantization: Optional[str] = None,
+) -> List[Any]:
+    """
+    Build models ahead of the first request, so that servers serving several models have a
+    predictable memory footprint. Preloaded models are not evicted under the memory budget
+    until they are unloaded.
+    Args:
+        model_names (list): model identifiers, see build_model
+        task (str): facial_recognition, facial_attribute, face_detector, spoofing
+            default is facial_recognition
+        backend (str): runtime of facial recognition models, see build_model
+        quantization (str): int8 variant of keras facial recognition models, see build_model
+    Returns:
+        built_models (list): built models in the order of model_names
+    """
+    return modeling.preload(
+        task=task, model_names=model_names, backend=backend, quantization=quantization
+    )
+
+
+def unload_model(
+    model_name: str,
+    task: str = "facial_recognition",
+    backend: Optional[str] = None,
+    quantization: Optional[str] = None,
+) -> bool:
+    """
+    Drop a built model, it is built again on its next use
+    Args:
+        model_name (str): model identifier, see build_model
+        task (str): facial_recognition, facial_attribute, face_detector, spoofing
+            default is facial_recognition
+        backend (str): runtime of facial recognition models, see build_model
+        quantization (str): int8 variant of keras facial recognition models, see build_model
+    Returns:
+        unloaded (bool): True if the model was built before, False otherwise
+    """
+    return modeling.unload(
+        task=task, model_name=model_name, backend=backend, quantization=quantization
+    )
+
+
+def set_model_memory_budget(max_bytes: Optional[int]) -> None:
+    """
+    Limit parameter bytes of built models. Least recently used models are evicted once it is
+    exceeded, except preloaded ones. Keras models count their weights, onnx runtime graphs
+    their file size, and models of other frameworks are not counted.
+    Args:
+        max_bytes (int): memory budget in bytes. None keeps every model built. Default is
+            DEEPFACE_MODEL_MEMORY_BUDGET environment variable or None if it is not set.
+    """
+    modeling.set_memory_budget(max_bytes=max_bytes)
+
+
+def get_loaded_models() -> Dict[str, Dict[str, Any]]:
+    """
+    Models built so far
+    Returns:
+        models (dict): models by task and cache key, e.g. facial_recognition/Facenet, from
+            the least to the most recently used one, with the following keys.
+
+        - 'bytes' (int): parameter bytes of the model
+
+        - 'pinned' (bool): model is preloaded and not evicted under the memory budget
+    """
+    return modeling.get_loaded_models()
+
+
+def warmup(
+    models: Optional[List[str]] = None,
+    detectors: Optional[List[str]] = None,
+    batch_sizes: Sequence[int] = (1,),
+    background: bool = True,
+) -> Optional[Any]:
+    """
+    Build models and run dummy inference on them ahead of the first request, so that it does
+    not pay for weight loading, graph construction and tracing. Progress is published per
+    model, see get_readiness. Models which are warming up or ready already are skipped.
+    Args:
+        models (list): models as task/model_name, or model_name for facial recognition
+            models, e.g. ["VGG-Face", "facial_attribute/Age", "facial_attribute/Gender"]
+        detectors (list): face detector backends, e.g. ["opencv", "retinaface"]
+        batch_sizes (list): number of faces dummy inference runs with (default is (1,))
+        background (bool): warm up in a background thread, otherwise block until models
+            are ready (default is True)
+    Returns:
+        thread (threading.Thread): background thread to join, None if background is False
+            or every model is warming up or ready already
+    """
+    return warming.warmup(
+        models=models, detectors=detectors, batch_sizes=batch_sizes, background=background
+    )
+
+
+def get_readiness() -> Dict[str, Dict[str, Any]]:
+    """
+    Readiness of the models passed to warmup in this process
+    Returns:
+        readiness (dict): models by task and model name, e.g. facial_recognition/Facenet,
+            with the following keys.
+
+        - 'state' (str): pending, building, warming, ready or failed
+
+        - 'error' (str): failure message if its state is failed, None otherwise
+
+        - 'seconds' (float): duration of building and warming up once it is ready or failed
+    """
+    return warming.get_readiness()
 
 
 def verify(
@@ -80,6 +215,7 @@ def verify(
     silent: bool = False,
     threshold: Optional[float] = None,
     anti_spoofing: bool = False,
+    use_cache: bool = False,
 ) -> Dict[str, Any]:
     """
     Verify if an image pair represents the same person or different persons.
@@ -87,12 +223,12 @@ def verify(
         img1_path (str or np.ndarray or IO[bytes] or List[float]): Path to the first image.
             Accepts exact image path as a string, numpy array (BGR), a file object that supports
             at least `.read` and is opened in binary mode, base64 encoded images
-            or pre-calculated embeddings.
+            or pre-calculated embeddings as a list or a 1D numpy array.
 
         img2_path (str or np.ndarray or IO[bytes] or List[float]): Path to the second image.
             Accepts exact image path as a string, numpy array (BGR), a file object that supports
             at least `.read` and is opened in binary mode, base64 encoded images
-            or pre-calculated embeddings.
+            or pre-calculated embeddings as a list or a 1D numpy array.
 
         model_name (str): Model for face recognition. Options: VGG-Face, Facenet, Facenet512,
             OpenFace, DeepFace, DeepID, Dlib, ArcFace, SFace and GhostFaceNet (default is VGG-Face).
@@ -124,6 +260,11 @@ def verify(
 
         anti_spoofing (boolean): Flag to enable anti spoofing (default is False).
 
+        use_cache (boolean): Look up faces and embeddings of both images in the shared
+            embedding cache by their content hash and the given settings, so that a repeated
+            reference image costs only a hash and a lookup. Budget and on-disk directory of
+            the cache are set with `configure_embedding_cache` (default is False).
+
     Returns:
         result (dict): A dictionary containing verification results with following keys.
 
@@ -162,6 +303,99 @@ def verify(
         silent=silent,
         threshold=threshold,
         anti_spoofing=anti_spoofing,
+        use_cache=use_cache,
+    )
+
+
+def verify_many(
+    pairs: Sequence[
+        Tuple[
+            Union[str, np.ndarray, IO[bytes], List[float]],
+            Union[str, np.ndarray, IO[bytes], List[float]],
+        ]
+    ],
+    model_name: str = "VGG-Face",
+    detector_backend: str = "opencv",
+    distance_metric: str = "cosine",
+    enforce_detection: bool = True,
+    align: bool = True,
+    expand_percentage: int = 0,
+    normalization: str = "base",
+    silent: bool = False,
+    threshold: Optional[float] = None,
+    anti_spoofing: bool = False,
+    batch_size: int = 32,
+    detection_workers: int = 4,
+) -> List[Dict[str, Any]]:
+    """
+    Verify many image pairs at once.
+
+    Images appearing in several pairs are detected and represented only once, faces of all
+    unique images are represented in batches and all pair distances are found in vectorized
+    form. This is much faster than calling verify for each pair.
+
+    Args:
+        pairs (sequence of tuples): Image pairs. Each item of a pair accepts exact image path
+            as a string, numpy array (BGR), a file object that supports at least `.read` and
+            is opened in binary mode, base64 encoded images or pre-calculated embeddings.
+            The same numpy array, file object or embedding list passed in several pairs
+            is processed once, as well as the same path or base64 string.
+
+        model_name (str): Model for face recognition. Options: VGG-Face, Facenet, Facenet512,
+            OpenFace, DeepFace, DeepID, Dlib, ArcFace, SFace and GhostFaceNet (default is VGG-Face).
+
+        detector_backend (string): face detector backend. Options: 'opencv', 'retinaface',
+            'mtcnn', 'ssd', 'dlib', 'mediapipe', 'yolov8', 'yolov11n', 'yolov11s', 'yolov11m',
+            'centerface' or 'skip' (default is opencv).
+
+        distance_metric (string): Metric for measuring similarity. Options: 'cosine',
+            'euclidean', 'euclidean_l2', 'angular' (default is cosine).
+
+        enforce_detection (boolean): If no face is detected in an image, raise an exception.
+            Set to False to avoid the exception for low-resolution images (default is True).
+
+        align (bool): Flag to enable face alignment (default is True).
+
+        expand_percentage (int): expand detected facial area with a percentage (default is 0).
+
+        normalization (string): Normalize the input image before feeding it to the model.
+            Options: base, raw, Facenet, Facenet2018, VGGFace, VGGFace2, ArcFace (default is base)
+
+        silent (boolean): Suppress or allow some log messages for a quieter analysis process
+            (default is False).
+
+        threshold (float): Specify a threshold to determine whether a pair represents the same
+            person or different individuals. If left unset, default pre-tuned threshold values
+            will be applied based on the specified model name and distance metric
+            (default is None).
+
+        anti_spoofing (boolean): Flag to enable anti spoofing (default is False).
+
+        batch_size (int): Number of faces represented in a single forward pass (default is 32).
+
+        detection_workers (int): Number of threads detecting faces of the unique images
+            concurrently (default is 4).
+
+    Returns:
+        results (List[Dict[str, Any]]): A verification result for each pair in the same order,
+            with the same keys as the result of verify. 'time' is the duration of the whole
+            call in seconds.
+    """
+
+    return verification.verify_many(
+        pairs=pairs,
+        model_name=model_name,
+        detector_backend=detector_backend,
+        distance_metric=distance_metric,
+        enforce_detection=enforce_detection,
+        align=align,
+        expand_percentage=expand_percentage,
+        normalization=normalization,
+        silent=silent,
+        threshold=threshold,
+        anti_spoofing=anti_spoofing,
+        batch_size=batch_size,
+        detection_workers=detection_workers,
     )
 
 
@@ -269,7 +503,7 @@ def analyze(
 
 
 def find(
-    img_path: Union[str, np.ndarray, IO[bytes]],
+    img_path: Union[str, np.ndarray, IO[bytes], List[Union[str, np.ndarray, IO[bytes]]]],
     db_path: str,
     model_name: str = "VGG-Face",
     distance_metric: str = "cosine",
@@ -283,14 +517,36 @@ def find(
     refresh_database: bool = True,
     anti_spoofing: bool = False,
     batched: bool = False,
-) -> Union[List[pd.DataFrame], List[List[Dict[str, Any]]]]:
+    datastore_format: str = "pickle",
+    index: Optional[str] = None,
+    nprobe: int = 8,
+    enrollment_workers: int = 1,
+    enrollment_batch_size: int = 32,
+    enrollment_processes: bool = False,
+    top_k: Optional[int] = None,
+    max_results: Optional[int] = None,
+    shards: int = 1,
+    shard_by: str = "identity",
+    compression: Optional[str] = None,
+    rerank: Optional[int] = None,
+    detection_workers: int = 4,
+    check_modified_images: bool = False,
+    watch_database: bool = False,
+) -> Union[
+    List[pd.DataFrame],
+    List[List[Dict[str, Any]]],
+    List[List[pd.DataFrame]],
+    List[List[List[Dict[str, Any]]]],
+]:
     """
     Identify individuals in a database
     Args:
-        img_path (str or np.ndarray or IO[bytes]): The exact path to the image, a numpy array
-            in BGR format, a file object that supports at least `.read` and is opened in binary
-            mode, or a base64 encoded image. If the source image contains multiple
-            faces, the result will include information for each detected face.
+        img_path (str or np.ndarray or IO[bytes] or list): The exact path to the image, a numpy
+            array in BGR format, a file object that supports at least `.read` and is opened in
+            binary mode, or a base64 encoded image. If the source image contains multiple
+            faces, the result will include information for each detected face. A list of
+            images or a 4D numpy array of images can be passed to search many images in one
+            call, then faces of all images are embedded and compared with the database at once.
 
         db_path (string): Path to the folder containing image files. All detected faces
             in the database will be considered in the decision-making process.
@@ -329,6 +585,71 @@ def find(
 
         anti_spoofing (boolean): Flag to enable anti spoofing (default is False).
 
+        batched (boolean): Return a list of dicts per detected face instead of dataframes.
+            It is optimized for large batch processing (default is False).
+
+        datastore_format (string): How representations of db_path are stored. Options: 'pickle'
+            keeps a list of dicts in a single pkl file, 'npy' keeps a contiguous float32
+            embedding matrix opened with memory mapping next to a compact metadata table.
+            Prefer 'npy' for large galleries, it is opened without loading it into memory
+            (default is pickle).
+
+        index (string): Approximate nearest neighbour index to search the database with.
+            Options: None for exhaustive search or 'ivf' for an inverted file index with k-means
+            coarse quantization. Candidates found by the index are re-ranked with exact
+            distances. The index is stored next to the datastore and updated incrementally
+            (default is None).
+
+        nprobe (int): Number of inverted lists probed per face if index is 'ivf'. Higher values
+            increase recall at the cost of speed (default is 8).
+
+        enrollment_workers (int): Number of workers decoding images newly added to db_path and
+            detecting their faces concurrently (default is 1).
+
+        enrollment_batch_size (int): Number of faces of newly added images fed to the facial
+            recognition model at once (default is 32).
+
+        enrollment_processes (boolean): Detect faces of newly added images in a process pool
+            instead of a thread pool. Each process loads its own detector (default is False).
+
+        top_k (int): Maximum number of closest matches returned per detected face. Candidates
+            are picked with partial selection instead of sorting the whole database.
+            None returns all matches under the threshold (default is None).
+
+        max_results (int): Maximum number of closest matches returned in total across all
+            detected faces. None returns all matches (default is None).
+
+        shards (int): Number of shards the database is split into for exhaustive search.
+            Each shard is searched in its own worker process on a shared memory copy of
+            the embeddings, and the closest matches of the shards are merged (default is 1).
+
+        shard_by (string): How the database is split into shards. Options: 'identity' hashes
+            the image path, 'directory' keeps all images of a top level directory of db_path,
+            e.g. a person, in the same shard (default is identity).
+
+        compression (string): Search a compressed copy of the database embeddings kept in
+            memory. Options: None for the original vectors, 'float16', 'int8' for uint8 codes
+            with per-dimension scale or 'pq' for product quantization. Distances are
+            approximate unless rerank is set. The codes are stored next to the datastore
+            and updated incrementally (default is None).
+
+        rerank (int): Number of closest candidates per detected face found with compressed
+            distances that are re-ranked with exact distances of the original vectors.
+            None returns compressed distances as they are (default is None).
+
+        detection_workers (int): Number of threads detecting faces of the images concurrently
+            if a list of images or a 4D numpy array is passed (default is 4).
+
+        check_modified_images (boolean): Stat every image of the folders that are not
+            modified to find images overwritten in place, which does not change the
+            modification time of their folder. It costs a stat per image of the database
+            on each call, otherwise only the folders are stated (default is False).
+
+        watch_database (boolean): Watch db_path for changes with watchdog, an optional
+            dependency, so that calls skip scanning db_path until a change is reported.
+            Changes made by other hosts of a network filesystem are not reported
+            (default is False).
+
     Returns:
         results (List[pd.DataFrame] or List[List[Dict[str, Any]]]):
             A list of pandas dataframes (if `batched=False`) or
@@ -336,6 +657,9 @@ def find(
             Each dataframe or dict corresponds to the identity information for
             an individual detected in the source image.
 
+            If a list of images or a 4D numpy array is passed, one such list is returned
+            for each image in the same order.
+
             Note: If you have a large database and/or a source photo with many faces,
             use `batched=True`, as it is optimized for large batch processing.
             Please pay attention that when using `batched=True`, the function returns
@@ -372,6 +696,21 @@ def find(
         refresh_database=refresh_database,
         anti_spoofing=anti_spoofing,
         batched=batched,
+        datastore_format=datastore_format,
+        index=index,
+        nprobe=nprobe,
+        enrollment_workers=enrollment_workers,
+        enrollment_batch_size=enrollment_batch_size,
+        enrollment_processes=enrollment_processes,
+        top_k=top_k,
+        max_results=max_results,
+        shards=shards,
+        shard_by=shard_by,
+        compression=compression,
+        rerank=rerank,
+        detection_workers=detection_workers,
+        check_modified_images=check_modified_images,
+        watch_database=watch_database,
     )
 
 
@@ -385,6 +724,8 @@ def represent(
     normalization: str = "base",
     anti_spoofing: bool = False,
     max_faces: Optional[int] = None,
+    use_cache: bool = False,
+    output: str = "list",
 ) -> Union[List[Dict[str, Any]], List[List[Dict[str, Any]]]]:
     """
     Represent facial images as multi-dimensional vector embeddings.
@@ -422,14 +763,24 @@ def represent(
 
         max_faces (int): Set a limit on the number of faces to be processed (default is None).
 
+        use_cache (boolean): Look up results in the shared embedding cache by the content hash
+            of each image and the given settings, so that repeated images skip detection and
+            the forward pass. Budget and on-disk directory of the cache are set with
+            `configure_embedding_cache` (default is False).
+
+        output (string): Format of the embeddings. Options: list or numpy. numpy keeps each
+            embedding as a float32 array instead of building a python float per dimension,
+            which is faster and lighter for high dimensional models (default is list).
+
     Returns:
         results (List[Dict[str, Any]] or List[Dict[str, Any]]): A list of dictionaries.
             Result type becomes List of List of Dict if batch input passed.
             Each containing the following fields:
 
-        - embedding (List[float]): Multidimensional vector representing facial features.
-            The number of dimensions varies based on the reference model
-            (e.g., FaceNet returns 128 dimensions, VGG-Face returns 4096 dimensions).
+        - embedding (List[float] or np.ndarray): Multidimensional vector representing facial
+            features, as a float32 array if output is numpy. The number of dimensions varies
+            based on the reference model (e.g., FaceNet returns 128 dimensions, VGG-Face
+            returns 4096 dimensions).
 
         - facial_area (dict): Detected facial area by face detection in dictionary format.
             Contains 'x' and 'y' as the left-corner point, and 'w' and 'h'
@@ -449,6 +800,152 @@ def represent(
         normalization=normalization,
         anti_spoofing=anti_spoofing,
         max_faces=max_faces,
+        use_cache=use_cache,
+        output=output,
+    )
+
+
+def configure_embedding_cache(
+    max_bytes: int = embedding_cache.DEFAULT_MAX_BYTES, path: Optional[str] = None
+) -> None:
+    """
+    Configure the embedding cache consulted by represent and verify with use_cache=True.
+    Cached entries so far are dropped from memory.
+    Args:
+        max_bytes (int): memory budget of cached embeddings, least recently used entries are
+            evicted once it is exceeded (default is 64 MB).
+        path (str): directory to keep entries on disk as well, so that they survive evictions
+            and restarts. None keeps entries in memory only (default is None).
+    """
+    embedding_cache.configure_embedding_cache(max_bytes=max_bytes, path=path)
+
+
+def enable_micro_batching(max_batch_size: int = 32, max_delay: float = 0.005) -> None:
+    """
+    Collect preprocessed faces of concurrent callers of the same facial recognition,
+    facial attribute or spoofing model into batches. A batch is inferred once it has
+    max_batch_size faces or its first face waited max_delay seconds, and each caller gets
+    back its own results. This increases throughput of multi-threaded servers calling
+    represent, verify, find or analyze for a single image at a time.
+    Args:
+        max_batch_size (int): number of faces flushing a batch (default is 32).
+        max_delay (float): seconds a face waits for others at most (default is 0.005).
+    """
+    batching.enable_micro_batching(max_batch_size=max_batch_size, max_delay=max_delay)
+
+
+def disable_micro_batching() -> None:
+    """
+    Infer faces of each caller separately again
+    """
+    batching.disable_micro_batching()
+
+
+def get_batching_metrics() -> Dict[str, Dict[str, float]]:
+    """
+    Metrics of micro batching
+    Returns:
+        metrics (dict): metrics of each scheduled model by task and model name, e.g.
+            facial_recognition/Facenet, with the following keys.
+
+        - 'queue_depth' (int): number of requests waiting to be batched
+
+        - 'requests' (int): number of requests inferred so far
+
+        - 'rows' (int): number of faces inferred so far
+
+        - 'batches' (int): number of batches inferred so far
+
+        - 'mean_batch_size' (float): mean number of faces of a batch
+
+        - 'max_batch_size' (int): number of faces of the largest batch
+
+        - 'last_batch_size' (int): number of faces of the last batch
+    """
+    return batching.get_batching_metrics()
+
+
+def enable_compiled_inference(max_batch_size: int = 32, jit_compile: bool = False) -> None:
+    """
+    Run keras facial recognition and facial attribute models through graphs traced once
+    with a fixed input signature, instead of calling them eagerly for a single face and with
+    predict_on_batch for more. Batches are padded to power of two sizes, and each size is run
+    once when a model is built, so that mixed batch sizes do not retrace or re-plan graphs
+    and requests do not pay for it. Models built so far are traced and warmed up here.
+    Args:
+        max_batch_size (int): largest padded batch size, larger batches are inferred in
+            chunks of it (default is 32).
+        jit_compile (bool): compile the graphs with xla, which requires tensorflow built
+            with xla support (default is False).
+    """
+    compilation.enable_compiled_inference(max_batch_size=max_batch_size, jit_compile=jit_compile)
+    modeling.compile_models()
+
+
+def disable_compiled_inference() -> None:
+    """
+    Call keras models eagerly again
+    """
+    compilation.disable_compiled_inference()
+
+
+def quantize_model(
+    model_name: str,
+    db_path: str,
+    quantization: str = "static",
+    detector_backend: str = "opencv",
+    align: bool = True,
+    normalization: str = "base",
+    distance_metric: str = "cosine",
+    held_out_ratio: float = 0.2,
+    max_images: int = 500,
+) -> Dict[str, Any]:
+    """
+    Create the int8 variant of a keras facial recognition model for CPU serving, and report
+    how far its embeddings drift from the float model on images held out from calibration.
+    The variant is loaded with build_model(model_name, quantization=quantization) then, and
+    served by represent, verify and find once DEEPFACE_QUANTIZATION environment variable is
+    set to quantization.
+    Args:
+        model_name (str): keras model for face recognition. Options: VGG-Face, Facenet,
+            Facenet512, OpenFace, DeepFace, DeepID, ArcFace and GhostFaceNet
+        db_path (str): path to the folder containing sample images for calibration
+        quantization (str): static quantization calibrates activation ranges with the
+            sample faces, dynamic quantization finds them at inference time (default is static)
+        detector_backend (string): face detector backend (default is opencv)
+        align (bool): perform alignment based on the eye positions (default is True)
+        normalization (string): normalize the input image before feeding it to the model
+            (default is base)
+        distance_metric (string): metric to measure the drift with (default is cosine)
+        held_out_ratio (float): ratio of images kept out of calibration (default is 0.2)
+        max_images (int): maximum number of images sampled from db_path (default is 500)
+    Returns:
+        report (dict): drift report with the following keys.
+
+        - 'model_path' (str): exact path of the int8 graph
+
+        - 'threshold' (float): pre-tuned threshold of the model and metric
+
+        - 'calibration_faces', 'held_out_faces' (int): number of faces in each set
+
+        - 'mean_drift', 'max_drift' (float): distance between float and int8 embeddings
+            of a held-out face
+
+        - 'mean_pair_drift' (float): mean absolute change of distances of held-out pairs
+
+        - 'decision_changes' (float): ratio of held-out pairs whose verification decision
+            under the threshold changed
+    """
+    return calibration.quantize_model(
+        model_name=model_name,
+        db_path=db_path,
+        quantization=quantization,
+        detector_backend=detector_backend,
+        align=align,
+        normalization=normalization,
+        distance_metric=distance_metric,
+        held_out_ratio=held_out_ratio,
+        max_images=max_images,
     )
 
 
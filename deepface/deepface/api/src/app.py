@@ -1,3 +1,6 @@
+# built-in dependencies
+import os
+
 # 3rd parth dependencies
 from flask import Flask
 from flask_cors import CORS
@@ -5,6 +8,7 @@ from flask_cors import CORS
 # project dependencies
 from deepface import DeepFace
 from deepface.api.src.modules.core.routes import blueprint
+from deepface.modules import warmup
 from deepface.commons.logger import Logger
 
 logger = Logger()
@@ -14,5 +18,16 @@ def create_app():
     app = Flask(__name__)
     CORS(app)
     app.register_blueprint(blueprint)
+
+    models = [model for model in os.getenv("DEEPFACE_PRELOAD_MODELS", "").split(",") if model]
+    detectors = [
+        detector for detector in os.getenv("DEEPFACE_WARMUP_DETECTORS", "").split(",") if detector
+    ]
+    app.config["DEEPFACE_WARMUP"] = {"models": models, "detectors": detectors}
+    # with gunicorn --preload, the master only downloads weights, tensorflow is not fork
+    # safe once it runs, so each worker builds its own models from the post_fork hook in
+    # gunicorn.conf.py as soon as it starts, otherwise the first health check starts it
+    warmup.download_weights(models)
+
     logger.info(f"Welcome to DeepFace API v{DeepFace.__version__}!")
     return app
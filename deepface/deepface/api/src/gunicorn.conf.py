@@ -0,0 +1,14 @@
+# project dependencies
+from deepface import DeepFace
+
+
+def post_fork(server, worker):  # pylint: disable=unused-argument
+    """
+    Build and warm up the models of a worker as soon as it is forked, otherwise the first
+    health check starts it. The master only downloads their weights, see create_app.
+    Unlike os.register_at_fork, this only runs for gunicorn workers and not for any other
+    process forked later on, e.g. by a detection process pool.
+    """
+    # with --preload, the app is created once in the master and cached by gunicorn
+    settings = server.app.wsgi().config["DEEPFACE_WARMUP"]
+    DeepFace.warmup(models=settings["models"], detectors=settings["detectors"])
@@ -1,14 +1,15 @@
 # built-in dependencies
+import os
 from typing import Union
 
 # 3rd party dependencies
-from flask import Blueprint, request
+from flask import Blueprint, current_app, request
 import numpy as np
 
 # project dependencies
 from deepface import DeepFace
 from deepface.api.src.modules.core import service
-from deepface.commons import image_utils
+from deepface.commons import image_utils, memory_utils
 from deepface.commons.logger import Logger
 
 logger = Logger()
@@ -23,6 +24,30 @@ def home():
     return f"<h1>Welcome to DeepFace API v{DeepFace.__version__}!</h1>"
 
 
+@blueprint.route("/health")
+def health():
+    # workers which are not forked from a preloading master start warming up here
+    DeepFace.warmup(**current_app.config.get("DEEPFACE_WARMUP", {}))
+
+    readiness = DeepFace.get_readiness()
+    ready = all(model["state"] == "ready" for model in readiness.values())
+
+    # load balancers route traffic to workers responding with 200 only
+    return {"ready": ready, "models": readiness}, 200 if ready else 503
+
+
+@blueprint.route("/memory")
+def memory():
+    # memory of the worker serving the request, its own models are counted in uss and
+    # pages inherited from the master in shared
+    try:
+        usage = memory_utils.find_memory_usage()
+    except Exception as err:
+        return {"exception": str(err)}, 400
+
+    return {"pid": os.getpid(), **usage, "models": DeepFace.get_loaded_models()}
+
+
 def extract_image_from_request(img_key: str) -> Union[str, np.ndarray]:
     """
     Extracts an image from the request either from json or a multipart/form-data file.
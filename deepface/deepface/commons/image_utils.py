@@ -31,9 +31,8 @@ def list_images(path: str) -> List[str]:
         for file in f:
             if os.path.splitext(file)[1].lower() in IMAGE_EXTS:
                 exact_path = os.path.join(r, file)
-                with Image.open(exact_path) as img:  # lazy
-                    if img.format.lower() in PIL_EXTS:
-                        images.append(exact_path)
+                if find_image_format(exact_path) in PIL_EXTS:
+                    images.append(exact_path)
     return images
 
 
@@ -49,9 +48,20 @@ def yield_images(path: str) -> Generator[str, None, None]:
         for file in f:
             if os.path.splitext(file)[1].lower() in IMAGE_EXTS:
                 exact_path = os.path.join(r, file)
-                with Image.open(exact_path) as img:  # lazy
-                    if img.format.lower() in PIL_EXTS:
-                        yield exact_path
+                if find_image_format(exact_path) in PIL_EXTS:
+                    yield exact_path
+
+
+def find_image_format(file_path: str) -> str:
+    """
+    Find the actual format of an image file regardless of its extension
+    Args:
+        file_path (str): exact image path
+    Returns:
+        format (str): lower cased format name such as jpeg or png
+    """
+    with Image.open(file_path) as img:  # lazy
+        return img.format.lower()
 
 
 def find_image_hash(file_path: str) -> str:
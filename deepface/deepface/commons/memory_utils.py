@@ -0,0 +1,93 @@
+# built-in dependencies
+import os
+from typing import Dict, List, Optional
+
+# project dependencies
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+# fields of /proc/<pid>/smaps_rollup summed into each measurement, in kB
+MEASUREMENTS = {
+    "rss": ["Rss"],
+    "pss": ["Pss"],
+    "uss": ["Private_Clean", "Private_Dirty"],
+    "shared": ["Shared_Clean", "Shared_Dirty"],
+}
+
+
+def find_memory_usage(pid: Optional[int] = None) -> Dict[str, int]:
+    """
+    Measure memory of a process. Pages of models built before a fork stay shared with
+    the parent process until either of them writes to them, so that they are counted in
+    shared but not in uss.
+
+    Args:
+        pid (int): process id, None for the current process
+
+    Returns:
+        usage (dict): memory in bytes with the following keys
+        - rss (int): resident memory including pages shared with other processes
+        - pss (int): resident memory where shared pages are divided among their processes
+        - uss (int): unique memory which would be freed if the process exited
+        - shared (int): resident memory shared with other processes
+
+    Raises:
+        ValueError: if memory of the process cannot be measured, e.g. out of linux
+    """
+    if pid is None:
+        pid = os.getpid()
+
+    path = f"/proc/{pid}/smaps_rollup"
+    fields: Dict[str, int] = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    except OSError as err:
+        # missing out of linux, or the process exited
+        raise ValueError(f"Memory of process {pid} cannot be measured from {path}") from err
+
+    return {
+        measurement: sum(fields.get(field, 0) for field in names)
+        for measurement, names in MEASUREMENTS.items()
+    }
+
+
+def find_workers_memory_usage(pid: Optional[int] = None) -> Dict[int, Dict[str, int]]:
+    """
+    Measure memory of each child process, e.g. workers forked by a gunicorn master
+
+    Args:
+        pid (int): process id of the parent, None for the current process
+
+    Returns:
+        usages (dict): memory of each child by its process id, see find_memory_usage
+    """
+    if pid is None:
+        pid = os.getpid()
+
+    children: List[int] = []
+    task_path = f"/proc/{pid}/task"
+    try:
+        tids = os.listdir(task_path)
+    except OSError:
+        tids = []
+    for tid in tids:
+        try:
+            with open(os.path.join(task_path, tid, "children"), "r", encoding="utf-8") as f:
+                children.extend(int(child) for child in f.read().split())
+        except OSError:
+            # thread or process exited meanwhile
+            continue
+
+    usages = {}
+    for child in sorted(set(children)):
+        try:
+            usages[child] = find_memory_usage(child)
+        except ValueError:
+            # child exited meanwhile
+            logger.debug(f"memory of process {child} cannot be measured")
+    return usages
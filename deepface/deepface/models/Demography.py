@@ -2,6 +2,7 @@ from typing import Union, List
 from abc import ABC, abstractmethod
 import numpy as np
 from deepface.commons import package_utils
+from deepface.modules import batching, compilation
 
 tf_version = package_utils.get_tf_major_version()
 if tf_version == 1:
@@ -39,9 +40,27 @@ class Demography(ABC):
             raise NotImplementedError("no model selected")
         assert img_batch.ndim == 4, "expected 4-dimensional tensor input"
 
+        # inputs of concurrent callers are inferred together if micro batching is enabled
+        predictions = batching.schedule(
+            f"facial_attribute/{self.model_name}", self._predict_batch, img_batch
+        )
+
+        if img_batch.shape[0] == 1:  # Single image
+            return predictions[0, :]
+        return predictions
+
+    def _predict_batch(self, img_batch: np.ndarray) -> np.ndarray:
+        """
+        Predict for a batch of preprocessed images as (n, classes)
+        """
+        # traced graph of the model if compiled inference is enabled
+        compiled_model = compilation.find_compiled_model(self)
+        if compiled_model is not None:
+            return compiled_model(img_batch)
+
         if img_batch.shape[0] == 1:  # Single image
             # Predict with legacy method.
-            return self.model(img_batch, training=False).numpy()[0, :]
+            return self.model(img_batch, training=False).numpy()
 
         # Batch of images
         # Predict with batch prediction
@@ -2,6 +2,7 @@ from abc import ABC
 from typing import Any, Union, List, Tuple
 import numpy as np
 from deepface.commons import package_utils
+from deepface.modules import batching, compilation
 
 tf_version = package_utils.get_tf_major_version()
 if tf_version == 2:
@@ -9,6 +10,9 @@ if tf_version == 2:
 else:
     from keras.models import Model
 
+# formats embeddings can be returned in
+OUTPUTS = {"list", "numpy"}
+
 # Notice that all facial recognition models must be inherited from this class
 
 
@@ -19,30 +23,70 @@ class FacialRecognition(ABC):
     input_shape: Tuple[int, int]
     output_shape: int
 
-    def forward(self, img: np.ndarray) -> Union[List[float], List[List[float]]]:
-        if not isinstance(self.model, Model):
-            raise ValueError(
-                "You must overwrite forward method if it is not a keras model,"
-                f"but {self.model_name} not overwritten!"
-            )
+    def forward(
+        self, img: np.ndarray, output: str = "list"
+    ) -> Union[List[float], List[List[float]], np.ndarray]:
+        """
+        Find embeddings of preprocessed images
+        Args:
+            img (np.ndarray): (X, X, 3) or (n, X, X, 3) shaped images
+            output (str): list returns embeddings as python floats, a single list for
+                a single image. numpy returns a (n, output_shape) float32 matrix without
+                converting its items to python floats (default is list).
+        Returns:
+            embeddings (list or np.ndarray): embeddings of given images
+        """
+        if output not in OUTPUTS:
+            raise ValueError(f"unimplemented output - {output}")
 
         # predict expexts e.g. (1, 224, 224, 3) shaped inputs
         if img.ndim == 3:
             img = np.expand_dims(img, axis=0)
 
-        if img.ndim == 4 and img.shape[0] == 1:
-            # model.predict causes memory issue when it is called in a for loop
-            # embedding = model.predict(img, verbose=0)[0].tolist()
-            embeddings = self.model(img, training=False).numpy()
-        elif img.ndim == 4 and img.shape[0] > 1:
-            embeddings = self.model.predict_on_batch(img)
-        else:
+        if img.ndim != 4 or img.shape[0] == 0:
             raise ValueError(f"Input image must be (1, X, X, 3) shaped but it is {img.shape}")
 
+        # inputs of concurrent callers are inferred together if micro batching is enabled
+        embeddings = batching.schedule(self._batching_name(), self._predict, img)
+
         assert isinstance(
             embeddings, np.ndarray
         ), f"Embeddings must be numpy array but it is {type(embeddings)}"
 
+        if output == "numpy":
+            return embeddings.astype(np.float32, copy=False)
         if embeddings.shape[0] == 1:
             return embeddings[0].tolist()
         return embeddings.tolist()
+
+    def _predict(self, img: np.ndarray) -> np.ndarray:
+        """
+        Find embeddings of a batch of preprocessed images. Models which are not keras
+        models must overwrite this method.
+        Args:
+            img (np.ndarray): (n, X, X, 3) shaped batch
+        Returns:
+            embeddings (np.ndarray): (n, output_shape) shaped embeddings
+        """
+        if not isinstance(self.model, Model):
+            raise ValueError(
+                "You must overwrite _predict method if it is not a keras model,"
+                f"but {self.model_name} not overwritten!"
+            )
+
+        # traced graph of the model if compiled inference is enabled
+        compiled_model = compilation.find_compiled_model(self)
+        if compiled_model is not None:
+            return compiled_model(img)
+
+        if img.shape[0] == 1:
+            # model.predict causes memory issue when it is called in a for loop
+            # embedding = model.predict(img, verbose=0)[0].tolist()
+            return self.model(img, training=False).numpy()
+        return self.model.predict_on_batch(img)
+
+    def _batching_name(self) -> str:
+        """
+        Name of the micro batching scheduler of the model, see batching.schedule
+        """
+        return f"facial_recognition/{self.model_name}"
@@ -1,5 +1,4 @@
 import os
-from typing import List, Union
 import numpy as np
 
 from deepface.commons import weight_utils, folder_utils
@@ -11,6 +10,7 @@ logger = Logger()
 class Buffalo_L(FacialRecognition):
     def __init__(self):
         self.model = None
+        self.model_name = "Buffalo_L"
         self.input_shape = (112, 112)
         self.output_shape = 512
         self.load_model()
@@ -69,28 +69,20 @@ class Buffalo_L(FacialRecognition):
         img = img[:, :, :, ::-1]
         return img
 
-    def forward(self, img: np.ndarray) -> Union[List[float], List[List[float]]]:
+    def _predict(self, img: np.ndarray) -> np.ndarray:
         """
-        Extract facial embedding(s) from the input image or batch of images.
+        Extract facial embeddings from a batch of images.
 
         Args:
-            img: Input image or batch with shape (112, 112, 3) 
-            or (batch_size, 112, 112, 3).
+            img: Input batch with shape (batch_size, 112, 112, 3).
 
         Returns:
-            Embedding as a list of floats (single image) 
-            or list of lists of floats (batch).
+            Embeddings with shape (batch_size, 512).
         """
         # Preprocess the input (single image or batch)
         img = self.preprocess(img)
-        batch_size = img.shape[0]
-
-        # Handle both single images and batches
-        embeddings = []
-        for i in range(batch_size):
-            embedding = self.model.get_feat(img[i])
-            embeddings.append(embedding.flatten().tolist())
 
-        # Return single embedding if batch_size is 1, otherwise return list of embeddings
-        return embeddings[0] if batch_size == 1 else embeddings
+        # get_feat stacks a list of images into a single blob and runs the onnx session once
+        embeddings = self.model.get_feat(list(img))
+        return embeddings.reshape(img.shape[0], -1)
     
\ No newline at end of file
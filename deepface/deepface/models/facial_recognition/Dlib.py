@@ -1,6 +1,3 @@
-# built-in dependencies
-from typing import List, Union
-
 # 3rd party dependencies
 import numpy as np
 
@@ -26,20 +23,16 @@ class DlibClient(FacialRecognition):
         self.input_shape = (150, 150)
         self.output_shape = 128
 
-    def forward(self, img: np.ndarray) -> Union[List[float], List[List[float]]]:
+    def _predict(self, img: np.ndarray) -> np.ndarray:
         """
         Find embeddings with Dlib model.
-            This model necessitates the override of the forward method
+            This model necessitates the override of the _predict method
             because it is not a keras model.
         Args:
-            img (np.ndarray): pre-loaded image(s) in BGR
+            img (np.ndarray): pre-loaded images in BGR
         Returns
-            embeddings (list of lists or list of floats): multi-dimensional vectors
+            embeddings (np.ndarray): multi-dimensional vectors
         """
-        # Handle single image case
-        if len(img.shape) == 3:
-            img = np.expand_dims(img, axis=0)
-
         # bgr to rgb
         img = img[:, :, :, ::-1]  # bgr to rgb
 
@@ -49,11 +42,10 @@ class DlibClient(FacialRecognition):
 
         img = img.astype(np.uint8)
 
-        embeddings = self.model.model.compute_face_descriptor(img)
-        embeddings = [np.array(embedding).tolist() for embedding in embeddings]
-        if len(embeddings) == 1:
-            return embeddings[0]
-        return embeddings
+        # a list of face chips is described in a single forward pass of the network
+        faces = [np.ascontiguousarray(face) for face in img]
+        embeddings = self.model.model.compute_face_descriptor(faces)
+        return np.array([np.asarray(embedding) for embedding in embeddings])
 
 
 class DlibResNet:
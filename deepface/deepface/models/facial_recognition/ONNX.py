@@ -0,0 +1,313 @@
+# built-in dependencies
+import os
+import hashlib
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 3rd party dependencies
+import numpy as np
+
+# project dependencies
+from deepface.commons import folder_utils
+from deepface.models.FacialRecognition import FacialRecognition
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+# keras models which can be exported to onnx
+EXPORTABLE_MODELS = {
+    "VGG-Face",
+    "Facenet",
+    "Facenet512",
+    "OpenFace",
+    "DeepFace",
+    "DeepID",
+    "ArcFace",
+    "GhostFaceNet",
+}
+
+# weight files of the keras models under the weights directory, see their load_model
+WEIGHT_FILES = {
+    "VGG-Face": "vgg_face_weights.h5",
+    "Facenet": "facenet_weights.h5",
+    "Facenet512": "facenet512_weights.h5",
+    "OpenFace": "openface_weights.h5",
+    "DeepFace": "VGGFace2_DeepFace_weights_val-0.9034.h5",
+    "DeepID": "deepid_keras_weights.h5",
+    "ArcFace": "arcface_weights.h5",
+    "GhostFaceNet": "ghostfacenet_v1.h5",
+}
+
+# models l2 normalizing their embeddings out of the graph, see VggFaceClient._predict
+NORMALIZED_MODELS = {"VGG-Face"}
+
+# onnx operator set of the exported graphs
+OPSET = 13
+
+# int8 quantization of the exported graphs, dynamic quantizes activations at inference
+# time whereas static uses activation ranges calibrated with sample faces
+QUANTIZATIONS = {"dynamic", "static"}
+
+# digests of weight files by path, size and modification time
+weight_digests: Dict[Tuple[str, int, float], str] = {}
+weight_digests_lock = threading.Lock()
+
+
+# pylint: disable=too-few-public-methods
+class ONNXRecognitionClient(FacialRecognition):
+    """
+    Facial recognition model exported from keras to onnx and run with onnx runtime.
+
+    The keras model is built and exported once, the graph is cached under the weights
+    directory and loaded from there afterwards without building the keras model. Graphs
+    are cached per keras weights and exporter version, so that changing either exports
+    the model again. Int8 variants of the graph are cached next to it, a static variant
+    must be calibrated with DeepFace.quantize_model before it is loaded.
+
+    Attributes:
+        model_name (str): name of the exported keras model
+        intra_op_threads (int): threads used within an operator, 0 lets onnx runtime decide
+        quantization (str): dynamic or static int8 quantization, None for float graphs
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        build_client: Callable[[], FacialRecognition],
+        intra_op_threads: Optional[int] = None,
+        quantization: Optional[str] = None,
+    ):
+        if model_name not in EXPORTABLE_MODELS:
+            raise ValueError(f"{model_name} cannot be run with onnx runtime")
+        if quantization is not None and quantization not in QUANTIZATIONS:
+            raise ValueError(f"unimplemented quantization - {quantization}")
+
+        try:
+            import onnxruntime as ort
+        except ModuleNotFoundError as err:
+            raise ModuleNotFoundError(
+                "onnxruntime is an optional dependency for the onnx backend. "
+                "Please install it with: pip install onnxruntime>=1.9.0"
+            ) from err
+
+        if intra_op_threads is None:
+            intra_op_threads = int(os.getenv("DEEPFACE_ONNX_THREADS", "0"))
+
+        self.model_name = model_name
+        self.intra_op_threads = intra_op_threads
+        self.quantization = quantization
+
+        keras_client = None
+        if not os.path.isfile(find_weights_path(model_name)):
+            # the keras model downloads its weights when it is built
+            keras_client = build_client()
+        self.model_path = find_model_path(model_name, quantization)
+
+        if not os.path.isfile(self.model_path):
+            if quantization == "static":
+                raise ValueError(
+                    f"{model_name} is not calibrated for static quantization yet, "
+                    "calibrate it with DeepFace.quantize_model first"
+                )
+            float_path = find_model_path(model_name)
+            if not os.path.isfile(float_path):
+                export_model(keras_client or build_client(), float_path)
+            if quantization == "dynamic":
+                quantize_graph(float_path, self.model_path)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = intra_op_threads
+        self.model: Any = ort.InferenceSession(
+            self.model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+
+        model_input = self.model.get_inputs()[0]
+        self.input_name = model_input.name
+        # graph inputs are (n, height, width, 3) whereas input_shape is (width, height)
+        self.input_shape = (model_input.shape[2], model_input.shape[1])
+        self.output_shape = self.model.get_outputs()[0].shape[-1]
+
+    def _predict(self, img: np.ndarray) -> np.ndarray:
+        """
+        Find embeddings of a batch of preprocessed images with onnx runtime
+        Args:
+            img (np.ndarray): (n, X, X, 3) shaped batch
+        Returns:
+            embeddings (np.ndarray): (n, output_shape) shaped embeddings
+        """
+        embeddings = self.model.run(None, {self.input_name: img.astype(np.float32)})[0]
+        if self.model_name in NORMALIZED_MODELS:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / (norms + 1e-10)
+        return embeddings
+
+    def _batching_name(self) -> str:
+        # keras and onnx runtime clients of the same model are scheduled separately
+        if self.quantization is None:
+            return f"facial_recognition/{self.model_name}/onnx"
+        return f"facial_recognition/{self.model_name}/onnx-{self.quantization}"
+
+
+def find_model_path(model_name: str, quantization: Optional[str] = None) -> str:
+    """
+    Find where the onnx graph of a model is cached for its current keras weights
+    and exporter version
+    Args:
+        model_name (str): name of the keras model
+        quantization (str): dynamic or static for int8 graphs, None for the float graph
+    Returns:
+        model_path (str): exact path of the onnx graph
+    """
+    weights_path = find_weights_path(model_name)
+    if not os.path.isfile(weights_path):
+        raise ValueError(
+            f"weights of {model_name} are not downloaded to {weights_path} yet, "
+            "build the keras model first"
+        )
+
+    hasher = hashlib.sha1()
+    hasher.update(find_weights_digest(weights_path).encode("utf-8"))
+    hasher.update(f"tf2onnx-{find_exporter_version()}-opset{OPSET}".encode("utf-8"))
+
+    home = folder_utils.get_deepface_home()
+    file_name = f"{model_name.lower().replace('-', '_')}_{hasher.hexdigest()[:16]}"
+    if quantization is not None:
+        file_name = f"{file_name}_int8_{quantization}"
+    return os.path.normpath(os.path.join(home, ".deepface/weights/onnx", f"{file_name}.onnx"))
+
+
+def find_weights_path(model_name: str) -> str:
+    """
+    Find where the keras weights of a model are downloaded
+    Args:
+        model_name (str): name of the keras model
+    Returns:
+        weights_path (str): exact path of the weight file
+    """
+    home = folder_utils.get_deepface_home()
+    return os.path.normpath(os.path.join(home, ".deepface/weights", WEIGHT_FILES[model_name]))
+
+
+def find_weights_digest(weights_path: str) -> str:
+    """
+    Find the hash of the content of a weight file, it is computed once per process
+    unless the file changes
+    Args:
+        weights_path (str): exact path of the weight file
+    Returns:
+        hash (str): digest with sha1 algorithm
+    """
+    file_stats = os.stat(weights_path)
+    key = (weights_path, file_stats.st_size, file_stats.st_mtime)
+    with weight_digests_lock:
+        digest = weight_digests.get(key)
+    if digest is not None:
+        return digest
+
+    hasher = hashlib.sha1()
+    with open(weights_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    digest = hasher.hexdigest()
+    with weight_digests_lock:
+        weight_digests[key] = digest
+    return digest
+
+
+def find_exporter_version() -> str:
+    """
+    Find the version of tf2onnx without importing it, importing it imports tensorflow
+    Returns:
+        version (str): installed version, unknown if it is not installed
+    """
+    try:
+        from importlib import metadata
+    except ImportError:
+        # python 3.7
+        return "unknown"
+    try:
+        return metadata.version("tf2onnx")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def export_model(client: FacialRecognition, model_path: str) -> None:
+    """
+    Export the keras model of a built client to onnx
+    Args:
+        client (FacialRecognition): built keras client
+        model_path (str): exact path of the onnx graph to be created
+    """
+    try:
+        import tensorflow as tf
+        import tf2onnx
+    except ModuleNotFoundError as err:
+        raise ModuleNotFoundError(
+            "tf2onnx is an optional dependency to export keras models to onnx. "
+            "Please install it with: pip install tf2onnx"
+        ) from err
+
+    logger.info(f"🔗 {client.model_name} will be exported to {model_path}...")
+    os.makedirs(os.path.dirname(model_path), exist_ok=True)
+
+    input_shape = tuple(client.model.inputs[0].shape[1:])
+    signature = [tf.TensorSpec((None,) + input_shape, tf.float32, name="input")]
+
+    # write to a temporary file first so that readers never see partial graphs
+    tmp_path = f"{model_path}.{os.getpid()}.tmp"
+    tf2onnx.convert.from_keras(
+        client.model, input_signature=signature, opset=OPSET, output_path=tmp_path
+    )
+    os.replace(tmp_path, model_path)
+
+
+def quantize_graph(
+    float_path: str, model_path: str, calibration: Optional[List[np.ndarray]] = None
+) -> None:
+    """
+    Create an int8 variant of an exported float graph
+    Args:
+        float_path (str): exact path of the float graph
+        model_path (str): exact path of the int8 graph to be created
+        calibration (list): preprocessed (n, X, X, 3) batches of faces to calibrate the
+            activation ranges of a static variant, None for a dynamic variant
+    """
+    try:
+        import onnxruntime as ort
+        from onnxruntime import quantization as ort_quantization
+    except ModuleNotFoundError as err:
+        raise ModuleNotFoundError(
+            "onnxruntime is an optional dependency for int8 quantization. "
+            "Please install it with: pip install onnxruntime>=1.9.0"
+        ) from err
+
+    tmp_path = f"{model_path}.{os.getpid()}.tmp"
+    if calibration is None:
+        logger.info(f"{float_path} will be quantized dynamically to {model_path}...")
+        ort_quantization.quantize_dynamic(
+            float_path, tmp_path, weight_type=ort_quantization.QuantType.QInt8
+        )
+    else:
+        logger.info(f"{float_path} will be quantized statically to {model_path}...")
+
+        class CalibrationReader(ort_quantization.CalibrationDataReader):
+            def __init__(self, input_name: str, batches: List[np.ndarray]):
+                self._inputs = iter([{input_name: batch.astype(np.float32)} for batch in batches])
+
+            def get_next(self) -> Optional[Dict[str, np.ndarray]]:
+                return next(self._inputs, None)
+
+        input_name = ort.InferenceSession(
+            float_path, providers=["CPUExecutionProvider"]
+        ).get_inputs()[0].name
+        ort_quantization.quantize_static(
+            float_path,
+            tmp_path,
+            CalibrationReader(input_name, calibration),
+            quant_format=ort_quantization.QuantFormat.QDQ,
+            activation_type=ort_quantization.QuantType.QInt8,
+            weight_type=ort_quantization.QuantType.QInt8,
+            per_channel=True,
+        )
+    os.replace(tmp_path, model_path)
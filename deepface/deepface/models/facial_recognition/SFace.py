@@ -1,5 +1,6 @@
 # built-in dependencies
-from typing import Any, List, Union
+import threading
+from typing import Any, Optional
 
 # 3rd party dependencies
 import numpy as np
@@ -27,27 +28,18 @@ class SFaceClient(FacialRecognition):
         self.input_shape = (112, 112)
         self.output_shape = 128
 
-    def forward(self, img: np.ndarray) -> Union[List[float], List[List[float]]]:
+    def _predict(self, img: np.ndarray) -> np.ndarray:
         """
         Find embeddings with SFace model
-            This model necessitates the override of the forward method
+            This model necessitates the override of the _predict method
             because it is not a keras model.
         Args:
-            img (np.ndarray): pre-loaded image in BGR
+            img (np.ndarray): pre-loaded images in BGR
         Returns
-            embeddings (list): multi-dimensional vector
+            embeddings (np.ndarray): multi-dimensional vectors
         """
         input_blob = (img * 255).astype(np.uint8)
-
-        embeddings = []
-        for i in range(input_blob.shape[0]):
-            embedding = self.model.model.feature(input_blob[i])
-            embeddings.append(embedding)
-        embeddings = np.concatenate(embeddings, axis=0)
-
-        if embeddings.shape[0] == 1:
-            return embeddings[0].tolist()
-        return embeddings.tolist()
+        return self.model.features(input_blob)
 
 
 def load_model(
@@ -81,3 +73,56 @@ class SFaceWrapper:
                 + "This is an optional dependency."
                 + "You can install it as pip install opencv-contrib-python."
             ) from err
+
+        # FaceRecognizerSF describes a single face per call, so that the same graph is also
+        # loaded into a dnn net to describe a batch of faces in a single forward pass
+        self.net = cv.dnn.readNetFromONNX(model_path)
+        # inputs and outputs of a net are its state, so that concurrent callers such as
+        # micro batchers and api threads must not interleave between setting and reading
+        self._lock = threading.Lock()
+        # graphs exported with a fixed batch size describe faces one by one, once a batched
+        # forward pass fails it is not tried again
+        self._batching_unsupported = False
+
+    def features(self, faces: np.ndarray) -> np.ndarray:
+        """
+        Find embeddings of aligned faces
+        Args:
+            faces (np.ndarray): (n, 112, 112, 3) shaped uint8 faces in BGR
+        Returns:
+            embeddings (np.ndarray): (n, 128) shaped embeddings
+        """
+        if not self._batching_unsupported:
+            embeddings = self.__forward_batch(faces)
+            if embeddings is not None:
+                return embeddings
+
+        with self._lock:
+            return np.concatenate([self.model.feature(face) for face in faces], axis=0)
+
+    def __forward_batch(self, faces: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Describe faces in a single forward pass of the net
+        Returns:
+            embeddings (np.ndarray): (n, 128) shaped embeddings, None if the net
+                does not support batches
+        """
+        # same preprocessing with FaceRecognizerSF.feature
+        blob = cv.dnn.blobFromImages(
+            list(faces), 1.0, (112, 112), (0, 0, 0), swapRB=True, crop=False
+        )
+        try:
+            with self._lock:
+                self.net.setInput(blob)
+                embeddings = self.net.forward()
+            if embeddings.shape[0] == faces.shape[0]:
+                return embeddings.reshape(faces.shape[0], -1)
+            error = f"{embeddings.shape[0]} embeddings are returned for {faces.shape[0]} faces"
+        except cv.error as err:
+            error = str(err)
+
+        self._batching_unsupported = True
+        logger.warn(
+            f"batched forward pass of SFace failed, faces are described one by one - {error}"
+        )
+        return None
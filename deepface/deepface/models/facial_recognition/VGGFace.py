@@ -1,6 +1,3 @@
-# built-in dependencies
-from typing import List
-
 # 3rd party dependencies
 import numpy as np
 
@@ -55,27 +52,19 @@ class VggFaceClient(FacialRecognition):
         self.input_shape = (224, 224)
         self.output_shape = 4096
 
-    def forward(self, img: np.ndarray) -> List[float]:
+    def _predict(self, img: np.ndarray) -> np.ndarray:
         """
         Generates embeddings using the VGG-Face model.
             This method incorporates an additional normalization layer.
 
         Args:
-            img (np.ndarray): pre-loaded image in BGR
+            img (np.ndarray): (n, 224, 224, 3) shaped batch in BGR
         Returns
-            embeddings (list): multi-dimensional vector
+            embeddings (np.ndarray): (n, 4096) shaped l2 normalized embeddings
         """
-        # model.predict causes memory issue when it is called in a for loop
-        # embedding = model.predict(img, verbose=0)[0].tolist()
-
         # having normalization layer in descriptor troubles for some gpu users (e.g. issue 957, 966)
         # instead we are now calculating it with traditional way not with keras backend
-        embedding = super().forward(img)
-        if isinstance(embedding, list) and len(embedding) > 0 and isinstance(embedding[0], list):
-            embedding = verification.l2_normalize(embedding, axis=1)
-        else:
-            embedding = verification.l2_normalize(embedding)
-        return embedding.tolist()
+        return verification.l2_normalize(super()._predict(img), axis=1)
 
 
 def base_model() -> Sequential:
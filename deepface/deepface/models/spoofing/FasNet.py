@@ -7,6 +7,7 @@ import numpy as np
 
 # project dependencies
 from deepface.commons import weight_utils
+from deepface.modules import batching
 from deepface.commons.logger import Logger
 
 logger = Logger()
@@ -103,41 +104,42 @@ class Fasnet:
         Returns:
             result (tuple): a result tuple consisting of is_real and score
         """
-        import torch
-        import torch.nn.functional as F
-
         x, y, w, h = facial_area
         first_img = crop(img, (x, y, w, h), 2.7, 80, 80)
         second_img = crop(img, (x, y, w, h), 4, 80, 80)
 
-        test_transform = Compose(
-            [
-                ToTensor(),
-            ]
-        )
+        # crops of concurrent callers are inferred together if micro batching is enabled
+        crops = np.expand_dims(np.stack([first_img, second_img]), axis=0)
+        prediction = batching.schedule("spoofing/Fasnet", self._predict, crops)
 
-        first_img = test_transform(first_img)
-        first_img = first_img.unsqueeze(0).to(self.device)
+        label = np.argmax(prediction[0])
+        is_real = True if label == 1 else False  # pylint: disable=simplifiable-if-expression
+        score = prediction[0][label] / 2
 
-        second_img = test_transform(second_img)
-        second_img = second_img.unsqueeze(0).to(self.device)
+        return is_real, score
 
-        with torch.no_grad():
-            first_result = self.first_model.forward(first_img)
-            first_result = F.softmax(first_result).cpu().numpy()
+    def _predict(self, crops: np.ndarray) -> np.ndarray:
+        """
+        Find sum of the predictions of both models for a batch of face crops
+        Args:
+            crops (np.ndarray): (n, 2, 80, 80, 3) crops for the first and the second model
+        Returns:
+            predictions (np.ndarray): (n, 3) sum of the class probabilities of both models
+        """
+        import torch
+        import torch.nn.functional as F
 
-            second_result = self.second_model.forward(second_img)
-            second_result = F.softmax(second_result).cpu().numpy()
+        # same as ToTensor for each crop
+        tensors = torch.from_numpy(crops.transpose((0, 1, 4, 2, 3))).float().to(self.device)
 
-        prediction = np.zeros((1, 3))
-        prediction += first_result
-        prediction += second_result
+        with torch.no_grad():
+            first_result = self.first_model.forward(tensors[:, 0])
+            first_result = F.softmax(first_result, dim=1).cpu().numpy()
 
-        label = np.argmax(prediction)
-        is_real = True if label == 1 else False  # pylint: disable=simplifiable-if-expression
-        score = prediction[0][label] / 2
+            second_result = self.second_model.forward(tensors[:, 1])
+            second_result = F.softmax(second_result, dim=1).cpu().numpy()
 
-        return is_real, score
+        return first_result + second_result
 
 
 # subsdiary classes and functions
@@ -0,0 +1,240 @@
+# built-in dependencies
+import os
+import hashlib
+from typing import List, Optional
+
+# 3rd party dependencies
+import numpy as np
+
+# project dependencies
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+# distance metrics ranking the same as euclidean distance of l2 normalized vectors
+NORMALIZED_METRICS = {"cosine", "angular", "euclidean_l2"}
+
+# index is re-trained once the gallery grows this many times of its training size
+RETRAIN_GROWTH = 4
+
+# maximum number of vectors sampled per list while training coarse quantizer
+TRAINING_SAMPLES_PER_LIST = 32
+
+# number of rows processed at once while assigning vectors to lists
+ASSIGNMENT_CHUNK = 65536
+
+
+# pylint: disable=too-many-instance-attributes
+class IVFIndex:
+    """
+    Inverted file index with k-means coarse quantization.
+
+    Gallery vectors are clustered into `nlist` lists. A query probes its `nprobe`
+    closest lists only, and the vectors in those lists are returned as candidates to be
+    re-ranked with exact distances. Probing more lists increases recall at the cost of
+    speed. New gallery rows are assigned to the existing lists incrementally, and the
+    quantizer is re-trained once the gallery grows enough.
+
+    Attributes:
+        path (str): exact path of the npz file keeping the index
+        normalized (bool): vectors are l2 normalized before clustering
+    """
+
+    def __init__(self, path: str, normalized: bool, nlist: Optional[int] = None):
+        self.path = path
+        self.normalized = normalized
+        self.nlist = nlist
+        self.centroids: Optional[np.ndarray] = None
+        self.assignments = np.zeros(0, dtype=np.int32)
+        self.trained_size = 0
+        self.checksum = ""
+        self._order = np.zeros(0, dtype=np.int64)
+        self._offsets = np.zeros(1, dtype=np.int64)
+
+        if os.path.exists(path):
+            with np.load(path, allow_pickle=False) as data:
+                self.centroids = data["centroids"]
+                self.assignments = data["assignments"]
+                self.trained_size = int(data["trained_size"])
+                self.checksum = str(data["checksum"])
+            self._build_lists()
+
+    def sync(
+        self, embeddings: np.ndarray, valid_mask: np.ndarray, identities: np.ndarray
+    ) -> None:
+        """
+        Bring the index up to date with the gallery
+        Args:
+            embeddings (np.ndarray): (N, D) gallery matrix
+            valid_mask (np.ndarray): (N,) mask of the rows having an embedding
+            identities (np.ndarray): (N,) identity of each row, used to detect re-layouts
+        """
+        num_valid = int(valid_mask.sum())
+        assigned = self.assignments.shape[0]
+
+        if (
+            self.centroids is None
+            or self.centroids.shape[0] == 0
+            or num_valid > RETRAIN_GROWTH * max(self.trained_size, 1)
+        ):
+            self._train(embeddings, valid_mask)
+            self.assignments = self._assign(embeddings, valid_mask, 0)
+        elif assigned > embeddings.shape[0] or self.checksum != identities_checksum(
+            identities[:assigned]
+        ):
+            # existing rows moved, keep quantizer but assign all rows again
+            self.assignments = self._assign(embeddings, valid_mask, 0)
+        elif assigned < embeddings.shape[0]:
+            self.assignments = np.concatenate(
+                [self.assignments, self._assign(embeddings, valid_mask, assigned)]
+            )
+        else:
+            return
+
+        self.checksum = identities_checksum(identities)
+        self._build_lists()
+        self._save()
+
+    def search(self, queries: np.ndarray, nprobe: int) -> List[np.ndarray]:
+        """
+        Find candidate gallery rows of each query
+        Args:
+            queries (np.ndarray): (M, D) query matrix
+            nprobe (int): number of closest lists probed per query
+        Returns:
+            candidates (list): M arrays of gallery row indices
+        """
+        if self.centroids is None or self.centroids.shape[0] == 0:
+            return [np.zeros(0, dtype=np.int64) for _ in range(queries.shape[0])]
+
+        queries = self._prepare(queries)
+        nprobe = max(1, min(nprobe, self.centroids.shape[0]))
+        coarse = _squared_distances(queries, self.centroids)  # (M, nlist)
+        probes = np.argpartition(coarse, nprobe - 1, axis=1)[:, :nprobe]  # (M, nprobe)
+
+        candidates = []
+        for lists in probes:
+            candidates.append(
+                np.concatenate(
+                    [self._order[self._offsets[i] : self._offsets[i + 1]] for i in lists]
+                )
+            )
+        return candidates
+
+    def _train(self, embeddings: np.ndarray, valid_mask: np.ndarray) -> None:
+        valid_rows = np.flatnonzero(valid_mask)
+        num_valid = valid_rows.shape[0]
+        self.trained_size = num_valid
+        if num_valid == 0:
+            self.centroids = np.zeros((0, embeddings.shape[1]), dtype=np.float32)
+            return
+
+        nlist = self.nlist or int(4 * np.sqrt(num_valid))
+        nlist = max(1, min(nlist, num_valid))
+
+        rng = np.random.default_rng(seed=len(valid_rows))
+        sample_size = min(num_valid, nlist * TRAINING_SAMPLES_PER_LIST)
+        sample_rows = np.sort(rng.choice(valid_rows, size=sample_size, replace=False))
+        sample = self._prepare(np.asarray(embeddings[sample_rows]))
+
+        self.centroids = kmeans(sample, nlist, rng)
+        logger.debug(f"IVF index trained with {nlist} lists on {sample_size} vectors")
+
+    def _assign(self, embeddings: np.ndarray, valid_mask: np.ndarray, start: int) -> np.ndarray:
+        """
+        Find the closest list of rows starting from given index, -1 for invalid rows
+        """
+        assignments = np.full(embeddings.shape[0] - start, -1, dtype=np.int32)
+        for offset in range(start, embeddings.shape[0], ASSIGNMENT_CHUNK):
+            end = min(offset + ASSIGNMENT_CHUNK, embeddings.shape[0])
+            rows = np.flatnonzero(valid_mask[offset:end]) + offset
+            if rows.shape[0] == 0:
+                continue
+            chunk = self._prepare(np.asarray(embeddings[rows]))
+            assignments[rows - start] = closest(chunk, self.centroids)
+        return assignments
+
+    def _prepare(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.normalized:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / (norms + 1e-10)
+        return vectors
+
+    def _build_lists(self) -> None:
+        """
+        Group row indices by their list, so that a list is a contiguous slice of `_order`
+        """
+        valid = self.assignments >= 0
+        rows = np.flatnonzero(valid)
+        self._order = rows[np.argsort(self.assignments[valid], kind="stable")]
+        nlist = 0 if self.centroids is None else self.centroids.shape[0]
+        counts = np.bincount(self.assignments[valid], minlength=nlist)
+        self._offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    def _save(self) -> None:
+        # write to a temporary file first so that readers never see a partial index
+        tmp_path = self.path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            centroids=self.centroids,
+            assignments=self.assignments,
+            trained_size=self.trained_size,
+            checksum=self.checksum,
+        )
+        os.replace(tmp_path, self.path)
+
+
+def identities_checksum(identities: np.ndarray) -> str:
+    """
+    Digest of gallery identities in row order, it changes once existing rows move
+    """
+    hasher = hashlib.sha1()
+    hasher.update("\n".join(identities.tolist()).encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def _squared_distances(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """
+    Squared euclidean distances of (M, D) vectors to (K, D) centroids as (M, K) matrix
+    """
+    return (
+        np.sum(vectors**2, axis=1, keepdims=True)
+        - 2 * vectors @ centroids.T
+        + np.sum(centroids**2, axis=1)[None, :]
+    )
+
+
+def closest(vectors: np.ndarray, centroids: np.ndarray, chunk_size: int = 4096) -> np.ndarray:
+    """
+    Index of the closest centroid of each vector, distances are found chunk by chunk
+    to keep the (chunk, K) distance matrix small
+    """
+    labels = np.zeros(vectors.shape[0], dtype=np.int32)
+    for offset in range(0, vectors.shape[0], chunk_size):
+        chunk = vectors[offset : offset + chunk_size]
+        labels[offset : offset + chunk_size] = _squared_distances(chunk, centroids).argmin(axis=1)
+    return labels
+
+
+def kmeans(
+    vectors: np.ndarray, k: int, rng: np.random.Generator, iterations: int = 10
+) -> np.ndarray:
+    """
+    Lloyd's k-means, empty clusters are re-seeded with random vectors
+    """
+    centroids = vectors[rng.choice(vectors.shape[0], size=k, replace=False)].copy()
+    for _ in range(iterations):
+        labels = closest(vectors, centroids)
+        counts = np.bincount(labels, minlength=k)
+
+        # sum members of each cluster over contiguous runs of sorted labels
+        order = np.argsort(labels, kind="stable")
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        filled = counts > 0
+        sums = np.add.reduceat(vectors[order], starts[filled], axis=0)
+
+        centroids[filled] = sums / counts[filled, None]
+        if not filled.all():
+            centroids[~filled] = vectors[rng.choice(vectors.shape[0], size=int((~filled).sum()))]
+    return centroids
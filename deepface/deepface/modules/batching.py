@@ -0,0 +1,315 @@
+# built-in dependencies
+import time
+import queue
+import weakref
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 3rd party dependencies
+import numpy as np
+
+# project dependencies
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+# micro batching is disabled until enable_micro_batching is called
+batching_config: Optional[Tuple[int, float]] = None
+batchers: Dict[str, "MicroBatcher"] = {}
+batchers_lock = threading.Lock()
+# models whose schedulers were released, callers still holding them infer directly
+released_owners: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+
+class MicroBatcher:
+    """
+    Inference scheduler collecting preprocessed inputs of concurrent callers into batches.
+
+    Callers block until the rows they submitted are inferred. A background thread takes the
+    first waiting request, keeps collecting requests until the batch has max_batch_size rows
+    or max_delay seconds passed, and runs the model once for the whole batch. Requests of
+    different input shapes are inferred separately. Requests having max_batch_size rows
+    already are inferred directly in the calling thread.
+
+    Attributes:
+        name (str): task and model name of the scheduled model
+        owner (object): model instance whose inference is scheduled, None if it is unknown
+        max_batch_size (int): number of rows flushing a batch
+        max_delay (float): seconds a request waits for others at most
+    """
+
+    def __init__(
+        self,
+        infer: Callable[[np.ndarray], np.ndarray],
+        name: str,
+        max_batch_size: int = 32,
+        max_delay: float = 0.005,
+        owner: Optional[Any] = None,
+    ):
+        if max_batch_size < 1:
+            raise ValueError(
+                f"max_batch_size must be a positive integer but it is {max_batch_size}"
+            )
+        if max_delay < 0:
+            raise ValueError(f"max_delay must be non-negative but it is {max_delay}")
+
+        self.name = name
+        self.owner = owner
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._infer = infer
+        self._queue: "queue.Queue[Optional[Tuple[np.ndarray, Future]]]" = queue.Queue()
+        self._closed = False
+        self._state_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._rows = 0
+        self._batches = 0
+        self._largest_batch = 0
+        self._last_batch = 0
+
+        self._thread = threading.Thread(
+            target=self._run, name=f"deepface-batcher-{name}", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Infer given rows together with the rows of concurrent callers
+        Args:
+            batch (np.ndarray): (n, ...) preprocessed inputs
+        Returns:
+            outputs (np.ndarray): (n, ...) outputs of the given rows
+        """
+        if batch.shape[0] >= self.max_batch_size or threading.current_thread() is self._thread:
+            outputs = self._infer(batch)
+            self._record(requests=1, rows=batch.shape[0])
+            return outputs
+
+        future: Future = Future()
+        with self._state_lock:
+            closed = self._closed
+            if not closed:
+                self._queue.put((batch, future))
+        if closed:
+            # scheduler stopped meanwhile, infer in the calling thread
+            return self._infer(batch)
+        return future.result()
+
+    def metrics(self) -> Dict[str, float]:
+        """
+        Counters of the scheduler
+        Returns:
+            metrics (dict): queue_depth as the number of waiting requests, requests, rows and
+                batches inferred so far, mean_batch_size, max_batch_size and last_batch_size
+                in rows
+        """
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "requests": self._requests,
+                "rows": self._rows,
+                "batches": self._batches,
+                "mean_batch_size": self._rows / self._batches if self._batches > 0 else 0.0,
+                "max_batch_size": self._largest_batch,
+                "last_batch_size": self._last_batch,
+            }
+
+    def close(self) -> None:
+        """
+        Stop the background thread after waiting requests are inferred
+        """
+        with self._state_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        stopped = False
+        while not stopped:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            pending = [item]
+            rows = item[0].shape[0]
+            deadline = time.monotonic() + self.max_delay
+            while rows < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopped = True
+                    break
+                pending.append(item)
+                rows += item[0].shape[0]
+
+            self._flush(pending)
+
+    def _flush(self, pending: List[Tuple[np.ndarray, Future]]) -> None:
+        # inputs of different shapes cannot be stacked into the same batch
+        groups: Dict[Tuple, List[Tuple[np.ndarray, Future]]] = {}
+        for batch, future in pending:
+            groups.setdefault((batch.shape[1:], batch.dtype.str), []).append((batch, future))
+
+        for group in groups.values():
+            inputs = np.concatenate([batch for batch, _ in group], axis=0)
+            try:
+                outputs = self._infer(inputs)
+            except Exception as err:  # pylint: disable=broad-except
+                for _, future in group:
+                    future.set_exception(err)
+                continue
+
+            self._record(requests=len(group), rows=inputs.shape[0], batches=1)
+            start = 0
+            for batch, future in group:
+                future.set_result(outputs[start : start + batch.shape[0]])
+                start += batch.shape[0]
+
+    def _record(self, requests: int, rows: int, batches: int = 1) -> None:
+        with self._stats_lock:
+            self._requests += requests
+            self._rows += rows
+            self._batches += batches
+            self._largest_batch = max(self._largest_batch, rows)
+            self._last_batch = rows
+
+
+def schedule(
+    name: str,
+    infer: Callable[[np.ndarray], np.ndarray],
+    batch: np.ndarray,
+    owner: Optional[Any] = None,
+) -> np.ndarray:
+    """
+    Infer a batch of preprocessed inputs, through the micro batcher of the model if micro
+    batching is enabled and directly otherwise. A scheduler runs the inference of the model
+    instance which created it, so that instances of a model rebuilt after it was unloaded
+    never infer through the dropped one.
+    Args:
+        name (str): task and model name, e.g. facial_recognition/Facenet
+        infer (callable): inference of the model mapping (n, ...) inputs to (n, ...) outputs
+        batch (np.ndarray): (n, ...) preprocessed inputs
+        owner (object): model instance infer belongs to, default is the instance of infer if
+            it is a bound method
+    Returns:
+        outputs (np.ndarray): (n, ...) outputs
+    """
+    if batching_config is None:
+        return infer(batch)
+
+    if owner is None:
+        owner = getattr(infer, "__self__", None)
+    if owner is not None and owner in released_owners:
+        # the model was unloaded while this caller still held it
+        return infer(batch)
+
+    batcher = batchers.get(name)
+    if batcher is None or batcher.owner is not owner:
+        batcher, replaced = __find_batcher(name, infer, owner)
+        if replaced is not None:
+            replaced.close()
+        if batcher is None:
+            return infer(batch)
+    return batcher.submit(batch)
+
+
+def __find_batcher(
+    name: str, infer: Callable[[np.ndarray], np.ndarray], owner: Optional[Any]
+) -> Tuple[Optional[MicroBatcher], Optional[MicroBatcher]]:
+    """
+    Find or create the scheduler of a model instance
+    Returns:
+        batcher (MicroBatcher): scheduler of the instance, None if the instance must infer
+            directly because micro batching is disabled or another live instance is scheduled
+            under the same name
+        replaced (MicroBatcher): scheduler of an unloaded instance which must be closed
+    """
+    replaced = None
+    with batchers_lock:
+        if batching_config is None:
+            return None, None
+        batcher = batchers.get(name)
+        if batcher is not None and batcher.owner is not owner:
+            if batcher.owner is None or batcher.owner not in released_owners:
+                return None, None
+            # created by a caller still holding an unloaded instance
+            replaced = batchers.pop(name)
+            batcher = None
+        if batcher is None:
+            max_batch_size, max_delay = batching_config
+            batcher = MicroBatcher(
+                infer=infer,
+                name=name,
+                max_batch_size=max_batch_size,
+                max_delay=max_delay,
+                owner=owner,
+            )
+            batchers[name] = batcher
+    return batcher, replaced
+
+
+def enable_micro_batching(max_batch_size: int = 32, max_delay: float = 0.005) -> None:
+    """
+    Collect inputs of concurrent callers of the same model into batches
+    Args:
+        max_batch_size (int): number of rows flushing a batch (default is 32)
+        max_delay (float): seconds a request waits for others at most (default is 0.005)
+    """
+    global batching_config  # pylint: disable=global-statement
+    if max_batch_size < 1:
+        raise ValueError(f"max_batch_size must be a positive integer but it is {max_batch_size}")
+    if max_delay < 0:
+        raise ValueError(f"max_delay must be non-negative but it is {max_delay}")
+
+    disable_micro_batching()
+    batching_config = (max_batch_size, max_delay)
+    logger.debug(f"micro batching enabled with {max_batch_size} rows and {max_delay}s delay")
+
+
+def disable_micro_batching() -> None:
+    """
+    Infer inputs of each caller separately, and stop the schedulers
+    """
+    global batching_config  # pylint: disable=global-statement
+    with batchers_lock:
+        batching_config = None
+        closed = list(batchers.values())
+        batchers.clear()
+    for batcher in closed:
+        batcher.close()
+
+
+def release_batcher(name: str, owner: Optional[Any] = None) -> None:
+    """
+    Stop the scheduler of a model, e.g. once the model is unloaded
+    Args:
+        name (str): task and model name, e.g. facial_recognition/Facenet
+        owner (object): unloaded model instance, callers still holding it infer directly
+            from then on instead of scheduling it again
+    """
+    with batchers_lock:
+        if owner is not None:
+            released_owners.add(owner)
+        batcher = batchers.pop(name, None)
+    if batcher is not None:
+        batcher.close()
+
+
+def get_batching_metrics() -> Dict[str, Dict[str, float]]:
+    """
+    Metrics of the schedulers created so far
+    Returns:
+        metrics (dict): metrics of each scheduled model by task and model name,
+            see MicroBatcher.metrics
+    """
+    with batchers_lock:
+        return {name: batcher.metrics() for name, batcher in batchers.items()}
@@ -0,0 +1,191 @@
+# built-in dependencies
+from typing import Any, Dict, List, Tuple
+
+# 3rd party dependencies
+import numpy as np
+
+# project dependencies
+from deepface.commons import image_utils
+from deepface.modules import modeling, detection, preprocessing, verification
+from deepface.models.facial_recognition import ONNX
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+
+def quantize_model(
+    model_name: str,
+    db_path: str,
+    quantization: str = "static",
+    detector_backend: str = "opencv",
+    align: bool = True,
+    normalization: str = "base",
+    distance_metric: str = "cosine",
+    held_out_ratio: float = 0.2,
+    max_images: int = 500,
+    batch_size: int = 16,
+) -> Dict[str, Any]:
+    """
+    Create the int8 variant of a keras facial recognition model and measure how far its
+    embeddings drift from the float model.
+
+    Images in db_path are split into calibration and held-out sets. Static variants are
+    calibrated with the faces of the calibration set, and are created again on each call.
+    Embeddings of held-out faces are compared between the float and the int8 graphs, and
+    verification decisions of held-out pairs are compared under the pre-tuned threshold.
+    Processes which already built the variant keep their loaded graph.
+
+    Args:
+        model_name (str): keras model for face recognition. Options: VGG-Face, Facenet,
+            Facenet512, OpenFace, DeepFace, DeepID, ArcFace and GhostFaceNet
+        db_path (str): path to the folder containing sample images
+        quantization (str): static or dynamic int8 quantization (default is static)
+        detector_backend (string): face detector backend (default is opencv)
+        align (bool): perform alignment based on the eye positions (default is True)
+        normalization (string): normalize the input image before feeding it to the model
+            (default is base)
+        distance_metric (string): metric to measure the drift and the decisions with
+            (default is cosine)
+        held_out_ratio (float): ratio of images kept out of calibration (default is 0.2)
+        max_images (int): maximum number of images sampled from db_path (default is 500)
+        batch_size (int): number of faces per calibration and inference batch (default is 16)
+    Returns:
+        report (dict): drift report with the following keys
+        - model_name (str): model of the int8 variant
+        - quantization (str): static or dynamic
+        - model_path (str): exact path of the int8 graph
+        - distance_metric (str): metric of the drift and the decisions
+        - threshold (float): pre-tuned threshold of the model and metric
+        - calibration_faces (int): number of faces used for calibration
+        - held_out_faces (int): number of faces compared between both graphs
+        - mean_drift (float): mean distance between float and int8 embeddings of a face
+        - max_drift (float): maximum distance between float and int8 embeddings of a face
+        - mean_pair_drift (float): mean absolute change of distances of held-out pairs
+        - decision_changes (float): ratio of held-out pairs whose verification
+            decision under the threshold changed
+    """
+    if model_name not in ONNX.EXPORTABLE_MODELS:
+        raise ValueError(f"{model_name} cannot be quantized")
+    if quantization not in ONNX.QUANTIZATIONS:
+        raise ValueError(f"unimplemented quantization - {quantization}")
+    if not 0 < held_out_ratio < 1:
+        raise ValueError(f"held_out_ratio must be in (0, 1) but it is {held_out_ratio}")
+
+    images = sorted(image_utils.list_images(db_path))
+    if len(images) < 2:
+        raise ValueError(f"At least 2 images are required in {db_path} to quantize a model")
+    rng = np.random.default_rng(seed=0)
+    images = [images[i] for i in rng.permutation(len(images))[:max_images]]
+    num_held_out = max(1, int(len(images) * held_out_ratio))
+    num_held_out = min(num_held_out, len(images) - 1)
+
+    float_client = modeling.build_model(
+        task="facial_recognition", model_name=model_name, backend="onnx"
+    )
+    held_out = __load_faces(
+        images[:num_held_out], float_client.input_shape, detector_backend, align, normalization
+    )
+    calibration = __load_faces(
+        images[num_held_out:], float_client.input_shape, detector_backend, align, normalization
+    )
+
+    model_path = ONNX.find_model_path(model_name, quantization)
+    if quantization == "static":
+        ONNX.quantize_graph(
+            float_client.model_path, model_path, calibration=__split(calibration, batch_size)
+        )
+    quantized_client = ONNX.ONNXRecognitionClient(
+        model_name=model_name,
+        build_client=lambda: modeling.build_model(
+            task="facial_recognition", model_name=model_name, backend="tensorflow"
+        ),
+        quantization=quantization,
+    )
+
+    float_embeddings = __represent(float_client, held_out, batch_size)
+    quantized_embeddings = __represent(quantized_client, held_out, batch_size)
+
+    drifts = np.diag(
+        verification.find_distance(
+            float_embeddings, quantized_embeddings, distance_metric, rounded=False
+        )
+    )
+    float_distances, quantized_distances = [
+        verification.find_distance(embeddings, embeddings, distance_metric, rounded=False)
+        for embeddings in (float_embeddings, quantized_embeddings)
+    ]
+    rows, cols = np.triu_indices(held_out.shape[0], k=1)
+    float_distances = float_distances[rows, cols]
+    quantized_distances = quantized_distances[rows, cols]
+
+    threshold = verification.find_threshold(model_name, distance_metric)
+    decision_changes = 0.0
+    mean_pair_drift = 0.0
+    if rows.shape[0] > 0:
+        decision_changes = float(
+            np.mean((float_distances <= threshold) != (quantized_distances <= threshold))
+        )
+        mean_pair_drift = float(np.mean(np.abs(float_distances - quantized_distances)))
+
+    report = {
+        "model_name": model_name,
+        "quantization": quantization,
+        "model_path": model_path,
+        "distance_metric": distance_metric,
+        "threshold": threshold,
+        "calibration_faces": calibration.shape[0],
+        "held_out_faces": held_out.shape[0],
+        "mean_drift": float(np.mean(drifts)),
+        "max_drift": float(np.max(drifts)),
+        "mean_pair_drift": mean_pair_drift,
+        "decision_changes": decision_changes,
+    }
+    logger.info(
+        f"{quantization} int8 {model_name} drifts {report['mean_drift']:.6f} on average and "
+        f"changes {decision_changes:.2%} of {rows.shape[0]} held-out decisions"
+    )
+    return report
+
+
+def __load_faces(
+    images: List[str],
+    input_shape: Tuple[int, int],
+    detector_backend: str,
+    align: bool,
+    normalization: str,
+) -> np.ndarray:
+    """
+    Detect and preprocess the faces of given images as represent does
+    Returns:
+        faces (np.ndarray): (n, X, X, 3) shaped batch
+    """
+    faces = []
+    for img_path in images:
+        img_objs = detection.extract_faces(
+            img_path=img_path,
+            detector_backend=detector_backend,
+            grayscale=False,
+            enforce_detection=False,
+            align=align,
+        )
+        for img_obj in img_objs:
+            # rgb to bgr
+            img = img_obj["face"][:, :, ::-1]
+            img = preprocessing.resize_image(
+                img=img, target_size=(input_shape[1], input_shape[0])
+            )
+            faces.append(preprocessing.normalize_input(img=img, normalization=normalization))
+    return np.concatenate(faces, axis=0).astype(np.float32)
+
+
+def __split(faces: np.ndarray, batch_size: int) -> List[np.ndarray]:
+    return [faces[start : start + batch_size] for start in range(0, faces.shape[0], batch_size)]
+
+
+def __represent(client: Any, faces: np.ndarray, batch_size: int) -> np.ndarray:
+    """
+    Find (n, d) embeddings of preprocessed faces batch by batch
+    """
+    return np.concatenate(
+        [client.forward(batch, output="numpy") for batch in __split(faces, batch_size)]
+    )
@@ -0,0 +1,165 @@
+# built-in dependencies
+import threading
+from typing import Any, List, Optional, Tuple
+
+# 3rd party dependencies
+import numpy as np
+import tensorflow as tf
+
+# project dependencies
+from deepface.commons import package_utils
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+tf_version = package_utils.get_tf_major_version()
+if tf_version == 1:
+    from keras.models import Model
+else:
+    from tensorflow.keras.models import Model
+
+# compiled inference is disabled until enable_compiled_inference is called
+compilation_config: Optional[Tuple[int, bool]] = None
+compilation_lock = threading.Lock()
+
+
+class CompiledModel:
+    """
+    Keras model traced once into a graph with a fixed input signature.
+
+    Batches are padded with zeros up to the next power of two, so that a model sees a few
+    batch sizes only, and each of them is run once at compile time. Therefore, requests never
+    pay tracing or graph planning costs, and xla compiles a program per bucket at most.
+    Batches larger than the largest bucket are inferred in chunks of it.
+
+    Attributes:
+        model (Model): compiled keras model
+        buckets (list): batch sizes the model is run with
+        jit_compile (bool): compile the graph with xla
+    """
+
+    def __init__(self, model: Model, max_batch_size: int = 32, jit_compile: bool = False):
+        self.model = model
+        self.buckets = find_buckets(max_batch_size)
+        self.jit_compile = jit_compile
+        self.input_shape = tuple(int(dim) for dim in model.inputs[0].shape[1:])
+
+        signature = [tf.TensorSpec((None,) + self.input_shape, tf.float32)]
+        self._function = tf.function(
+            lambda batch: model(batch, training=False),
+            input_signature=signature,
+            jit_compile=jit_compile,
+        )
+
+    def __call__(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Infer a batch of preprocessed inputs
+        Args:
+            batch (np.ndarray): (n, ...) preprocessed inputs
+        Returns:
+            outputs (np.ndarray): (n, ...) outputs
+        """
+        batch = batch.astype(np.float32, copy=False)
+        largest = self.buckets[-1]
+        if batch.shape[0] > largest:
+            chunks = [batch[start : start + largest] for start in range(0, batch.shape[0], largest)]
+            return np.concatenate([self(chunk) for chunk in chunks])
+
+        size = batch.shape[0]
+        bucket = next(bucket for bucket in self.buckets if bucket >= size)
+        if bucket > size:
+            padding = np.zeros((bucket - size,) + batch.shape[1:], dtype=np.float32)
+            batch = np.concatenate([batch, padding])
+        return self._function(batch).numpy()[:size]
+
+    def warm_up(self) -> None:
+        """
+        Run each bucket once so that its graph is planned, and compiled if xla is enabled
+        """
+        for bucket in self.buckets:
+            self._function(np.zeros((bucket,) + self.input_shape, dtype=np.float32))
+        logger.debug(f"compiled inference is warmed up for batch sizes {self.buckets}")
+
+
+def find_buckets(max_batch_size: int) -> List[int]:
+    """
+    Find batch sizes of compiled models
+    Args:
+        max_batch_size (int): batch size of the largest bucket, rounded up to a power of two
+    Returns:
+        buckets (list): powers of two from 1 to the largest bucket
+    """
+    buckets = [1]
+    while buckets[-1] < max_batch_size:
+        buckets.append(buckets[-1] * 2)
+    return buckets
+
+
+def find_compiled_model(client: Any) -> Optional[CompiledModel]:
+    """
+    Find the compiled model of a facial recognition or facial attribute client, compiling and
+    warming it up on its first use
+    Args:
+        client (Any): built client having a keras model
+    Returns:
+        compiled_model (CompiledModel): compiled model of the client, None if compiled
+            inference is disabled or the client does not have a keras model
+    """
+    config = compilation_config
+    model = getattr(client, "model", None)
+    if config is None or not isinstance(model, Model):
+        return None
+
+    compiled_model = getattr(client, "compiled_model", None)
+    if __is_valid(compiled_model, model, config):
+        return compiled_model
+
+    with compilation_lock:
+        compiled_model = getattr(client, "compiled_model", None)
+        if __is_valid(compiled_model, model, config):
+            return compiled_model
+
+        max_batch_size, jit_compile = config
+        compiled_model = CompiledModel(
+            model=model, max_batch_size=max_batch_size, jit_compile=jit_compile
+        )
+        compiled_model.warm_up()
+        client.compiled_model = compiled_model
+    return compiled_model
+
+
+def __is_valid(
+    compiled_model: Optional[CompiledModel], model: Model, config: Tuple[int, bool]
+) -> bool:
+    # clients may rebuild their models
+    return (
+        compiled_model is not None
+        and compiled_model.model is model
+        and (compiled_model.buckets[-1], compiled_model.jit_compile)
+        == (find_buckets(config[0])[-1], config[1])
+    )
+
+
+def enable_compiled_inference(max_batch_size: int = 32, jit_compile: bool = False) -> None:
+    """
+    Run keras models through graphs traced once, with batches padded to power of two buckets
+    Args:
+        max_batch_size (int): batch size of the largest bucket (default is 32)
+        jit_compile (bool): compile the graphs with xla (default is False)
+    """
+    global compilation_config  # pylint: disable=global-statement
+    if tf_version == 1:
+        raise ValueError("Compiled inference requires tensorflow 2")
+    if max_batch_size < 1:
+        raise ValueError(f"max_batch_size must be a positive integer but it is {max_batch_size}")
+
+    compilation_config = (max_batch_size, jit_compile)
+    logger.debug(f"compiled inference enabled up to {max_batch_size} rows, xla is {jit_compile}")
+
+
+def disable_compiled_inference() -> None:
+    """
+    Run keras models eagerly again
+    """
+    global compilation_config  # pylint: disable=global-statement
+    compilation_config = None
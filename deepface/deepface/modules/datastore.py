@@ -0,0 +1,380 @@
+# built-in dependencies
+import os
+import struct
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# 3rd party dependencies
+import numpy as np
+
+# project dependencies
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+# .npy files start with this magic string and version 1.0 header
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+
+# header is always padded to this length so that it can be rewritten in place
+# while the embedding matrix grows
+NPY_HEADER_SIZE = 128
+
+EMBEDDINGS_FILE = "embeddings.npy"
+METADATA_FILE = "metadata.npz"
+
+TARGET_COLUMNS = ["target_x", "target_y", "target_w", "target_h"]
+
+# once tombstoned rows exceed this ratio, the store is rewritten without them
+COMPACTION_RATIO = 0.5
+
+
+class EmbeddingStore:
+    """
+    Append-only columnar store of facial embeddings.
+
+    Embeddings are kept in a contiguous float32 `.npy` matrix which is opened with
+    memory mapping, so that opening a store does not scale with the gallery size.
+    Identity, hash, target box and l2 norm of each row are kept in a compact metadata
+    table. Norms are found once while appending, so that searches do not normalize the
+    whole matrix again.
+    Removed rows are tombstoned and the store is compacted once they pile up.
+
+    Attributes:
+        path (str): directory keeping the embedding matrix and metadata table
+        dims (int): number of dimensions of each embedding, 0 for an empty store
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.embeddings_path = os.path.join(path, EMBEDDINGS_FILE)
+        self.metadata_path = os.path.join(path, METADATA_FILE)
+        self.dims = 0
+        self._embeddings: Optional[np.ndarray] = None
+        self._metadata: Dict[str, np.ndarray] = _empty_metadata()
+
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    def __len__(self) -> int:
+        return int(self._metadata["alive"].sum())
+
+    @property
+    def size(self) -> int:
+        """
+        Number of physical rows, including tombstoned ones
+        """
+        return int(self._metadata["identity"].shape[0])
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        """
+        Read-only (N, D) float32 matrix of embeddings. Rows without a face or
+        tombstoned rows are zero filled, use `valid_mask` to discard them.
+        """
+        if self._embeddings is None:
+            return np.zeros((self.size, self.dims), dtype=np.float32)
+        return self._embeddings[: self.size]
+
+    @property
+    def valid_mask(self) -> np.ndarray:
+        """
+        (N,) boolean mask of the rows having an embedding and not removed yet
+        """
+        return self._metadata["alive"] & self._metadata["has_embedding"]
+
+    @property
+    def alive_mask(self) -> np.ndarray:
+        """
+        (N,) boolean mask of the rows not removed yet
+        """
+        return self._metadata["alive"]
+
+    @property
+    def metadata(self) -> Dict[str, np.ndarray]:
+        """
+        Columns of identity, hash and target box, each of them has N items
+        """
+        return {
+            key: self._metadata[key] for key in ["identity", "hash"] + TARGET_COLUMNS
+        }
+
+    @property
+    def norms(self) -> np.ndarray:
+        """
+        (N,) float32 l2 norm of each embedding, 0 for rows without a face
+        """
+        return self._metadata["norm"]
+
+    def identities(self) -> Set[str]:
+        """
+        Set of identities stored and not removed yet
+        """
+        return set(self._metadata["identity"][self._metadata["alive"]].tolist())
+
+    def hashes(self) -> Dict[str, str]:
+        """
+        Hash of each alive identity's image file
+        """
+        alive = self._metadata["alive"]
+        return dict(
+            zip(
+                self._metadata["identity"][alive].tolist(),
+                self._metadata["hash"][alive].tolist(),
+            )
+        )
+
+    def append(self, representations: List[Dict[str, Any]]) -> None:
+        """
+        Append representations to the end of the store
+        Args:
+            representations (list): items having identity, hash, embedding
+                and target box keys as produced by `find`
+        """
+        if len(representations) == 0:
+            return
+
+        dims = self.dims
+        for item in representations:
+            if item["embedding"] is not None:
+                item_dims = len(item["embedding"])
+                if dims == 0:
+                    dims = item_dims
+                elif dims != item_dims:
+                    raise ValueError(
+                        "Source and target embeddings must have same dimensions but "
+                        f"{dims}:{item_dims}. Model structure may change after "
+                        f"{self.path} created. Delete it and re-run."
+                    )
+
+        if dims == 0:
+            # nothing but faceless images so far, keep an empty matrix
+            dims = self.dims
+
+        matrix = np.zeros((len(representations), dims), dtype=np.float32)
+        for i, item in enumerate(representations):
+            if item["embedding"] is not None:
+                matrix[i] = item["embedding"]
+
+        self.dims = dims
+        self._write_rows(matrix)
+
+        extension = {
+            "identity": np.array([item["identity"] for item in representations], dtype=str),
+            "hash": np.array([item["hash"] for item in representations], dtype=str),
+            "has_embedding": np.array(
+                [item["embedding"] is not None for item in representations], dtype=bool
+            ),
+            "alive": np.ones(len(representations), dtype=bool),
+            "norm": np.linalg.norm(matrix, axis=1).astype(np.float32),
+        }
+        for column in TARGET_COLUMNS:
+            extension[column] = np.array(
+                [item[column] for item in representations], dtype=np.int32
+            )
+
+        self._metadata = {
+            key: np.concatenate([self._metadata[key], extension[key]])
+            for key in self._metadata.keys()
+        }
+        self._save_metadata()
+        self._open_embeddings()
+
+    def remove(self, identities: Iterable[str]) -> None:
+        """
+        Tombstone all rows of given identities
+        Args:
+            identities (iterable of str): exact image paths to be removed
+        """
+        identities = set(identities)
+        if len(identities) == 0:
+            return
+
+        dropped = np.isin(self._metadata["identity"], list(identities))
+        if not dropped.any():
+            return
+
+        self._metadata["alive"] = self._metadata["alive"] & ~dropped
+        self._save_metadata()
+
+        if self.size > 0 and 1 - len(self) / self.size > COMPACTION_RATIO:
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Rewrite the store without tombstoned rows
+        """
+        alive = self._metadata["alive"]
+        # alive rows are copied chunk by chunk, so that memory does not grow with the store
+        tmp_path = self.embeddings_path + ".tmp"
+        _copy_npy_rows(tmp_path, self.embeddings, np.flatnonzero(alive))
+        self._metadata = {key: value[alive] for key, value in self._metadata.items()}
+
+        # release the memory map before the file is overwritten
+        self._embeddings = None
+        os.replace(tmp_path, self.embeddings_path)
+        self._save_metadata()
+        self._open_embeddings()
+        logger.debug(f"{self.path} compacted to {self.size} rows")
+
+    def to_representations(self) -> List[Dict[str, Any]]:
+        """
+        Export alive rows in the legacy pickle format of `find`
+        Returns:
+            representations (list): items having identity, hash, embedding and target box
+        """
+        representations = []
+        embeddings = self.embeddings
+        for i in np.flatnonzero(self._metadata["alive"]):
+            item = {
+                "identity": str(self._metadata["identity"][i]),
+                "hash": str(self._metadata["hash"][i]),
+                "embedding": (
+                    embeddings[i].tolist() if self._metadata["has_embedding"][i] else None
+                ),
+            }
+            for column in TARGET_COLUMNS:
+                item[column] = int(self._metadata[column][i])
+            representations.append(item)
+        return representations
+
+    def _load(self) -> None:
+        if os.path.exists(self.metadata_path):
+            with np.load(self.metadata_path, allow_pickle=False) as data:
+                self._metadata = {key: data[key] for key in data.files}
+
+        self._open_embeddings()
+
+        if "norm" not in self._metadata:
+            # stores created before norms were kept, find them once
+            self._metadata["norm"] = _find_norms(self.embeddings)
+            if self.size > 0:
+                self._save_metadata()
+
+        if self.size > self._rows_on_disk():
+            raise ValueError(
+                f"{self.embeddings_path} has less rows than its metadata. "
+                f"Consider to delete {self.path}"
+            )
+
+    def _rows_on_disk(self) -> int:
+        if not os.path.exists(self.embeddings_path):
+            return 0
+        shape, _ = _read_npy_header(self.embeddings_path)
+        return int(shape[0])
+
+    def _open_embeddings(self) -> None:
+        self._embeddings = None
+        if not os.path.exists(self.embeddings_path):
+            return
+
+        shape, offset = _read_npy_header(self.embeddings_path)
+        self.dims = int(shape[1])
+
+        # np.memmap refuses to map an empty region
+        if shape[0] * shape[1] == 0:
+            return
+
+        self._embeddings = np.memmap(
+            self.embeddings_path, dtype="<f4", mode="r", offset=offset, shape=shape
+        )
+
+    def _write_rows(self, matrix: np.ndarray) -> None:
+        """
+        Write rows right after the last row recorded in metadata. Rows of an interrupted
+        previous append are beyond that offset and are overwritten here.
+        """
+        # release the memory map before the file is modified
+        self._embeddings = None
+
+        if not os.path.exists(self.embeddings_path) or self._rows_on_disk() == 0:
+            _write_npy(self.embeddings_path, matrix)
+            return
+
+        _, stored_dims = _read_npy_header(self.embeddings_path)[0]
+        if stored_dims != matrix.shape[1]:
+            # store has faceless rows only so far, re-layout them with actual dimensions
+            previous = np.zeros((self.size, matrix.shape[1]), dtype=np.float32)
+            _write_npy(self.embeddings_path, np.concatenate([previous, matrix]))
+            return
+
+        row_bytes = matrix.shape[1] * np.dtype(np.float32).itemsize
+        offset = NPY_HEADER_SIZE + self.size * row_bytes
+        total_rows = self.size + matrix.shape[0]
+
+        with open(self.embeddings_path, "r+b") as f:
+            f.seek(offset)
+            f.write(np.ascontiguousarray(matrix, dtype="<f4").tobytes())
+            f.truncate()
+            f.seek(0)
+            f.write(_npy_header((total_rows, matrix.shape[1])))
+
+    def _save_metadata(self) -> None:
+        # write to a temporary file first so that readers never see a partial table
+        tmp_path = self.metadata_path + ".tmp.npz"
+        np.savez(tmp_path, **self._metadata)
+        os.replace(tmp_path, self.metadata_path)
+
+
+def _empty_metadata() -> Dict[str, np.ndarray]:
+    metadata = {
+        "identity": np.array([], dtype=str),
+        "hash": np.array([], dtype=str),
+        "has_embedding": np.array([], dtype=bool),
+        "alive": np.array([], dtype=bool),
+        "norm": np.array([], dtype=np.float32),
+    }
+    for column in TARGET_COLUMNS:
+        metadata[column] = np.array([], dtype=np.int32)
+    return metadata
+
+
+def _find_norms(embeddings: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+    """
+    Find l2 norms of the rows of a memory mapped matrix chunk by chunk
+    """
+    norms = np.zeros(embeddings.shape[0], dtype=np.float32)
+    for start in range(0, embeddings.shape[0], chunk_size):
+        chunk = np.asarray(embeddings[start : start + chunk_size])
+        norms[start : start + chunk_size] = np.linalg.norm(chunk, axis=1)
+    return norms
+
+
+def _npy_header(shape: tuple) -> bytes:
+    """
+    Build a fixed size .npy v1.0 header for a little-endian float32 C-order matrix
+    """
+    header = str({"descr": "<f4", "fortran_order": False, "shape": shape})
+    header_len = NPY_HEADER_SIZE - len(NPY_MAGIC) - 2
+    return NPY_MAGIC + struct.pack("<H", header_len) + header.ljust(header_len - 1).encode() + b"\n"
+
+
+def _write_npy(file_path: str, matrix: np.ndarray) -> None:
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_npy_header(matrix.shape))
+        f.write(np.ascontiguousarray(matrix, dtype="<f4").tobytes())
+    os.replace(tmp_path, file_path)
+
+
+def _copy_npy_rows(
+    file_path: str, embeddings: np.ndarray, rows: np.ndarray, chunk_size: int = 65536
+) -> None:
+    """
+    Write given rows of a memory mapped matrix to a new .npy file chunk by chunk
+    """
+    with open(file_path, "wb") as f:
+        f.write(_npy_header((rows.shape[0], embeddings.shape[1])))
+        for start in range(0, rows.shape[0], chunk_size):
+            chunk = embeddings[rows[start : start + chunk_size]]
+            f.write(np.ascontiguousarray(chunk, dtype="<f4").tobytes())
+
+
+def _read_npy_header(file_path: str) -> Tuple[Tuple[int, int], int]:
+    """
+    Read shape and data offset of a .npy file without loading it
+    """
+    with open(file_path, "rb") as f:
+        version = np.lib.format.read_magic(f)
+        if version != (1, 0):
+            raise ValueError(f"Unexpected .npy format version {version} in {file_path}")
+        shape, _, _ = np.lib.format.read_array_header_1_0(f)
+        return shape, f.tell()
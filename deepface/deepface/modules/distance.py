@@ -0,0 +1,302 @@
+# built-in dependencies
+from typing import Optional, Union
+
+# 3rd party dependencies
+import numpy as np
+
+# number of vectors of a batch compared with the other batch at once
+DISTANCE_CHUNK_SIZE = 4096
+
+
+def find_cosine_distance(
+    source_representation: Union[np.ndarray, list],
+    test_representation: Union[np.ndarray, list],
+    source_normalized: bool = False,
+    chunk_size: int = DISTANCE_CHUNK_SIZE,
+    source_norms: Optional[np.ndarray] = None,
+) -> Union[np.float64, np.ndarray]:
+    """
+    Find cosine distance between two given vectors or batches of vectors.
+    Args:
+        source_representation (np.ndarray or list): 1st vector or batch of vectors.
+        test_representation (np.ndarray or list): 2nd vector or batch of vectors.
+        source_normalized (bool): batch of 1st vectors is l2 normalized already,
+            so it is not normalized again (default is False).
+        chunk_size (int): number of 1st vectors compared at once in batch mode (default is 4096).
+        source_norms (np.ndarray): pre-calculated (N,) l2 norms of the 1st batch, so that
+            similarities are found with a single matrix product (default is None).
+    Returns
+        np.float64 or np.ndarray: Calculated cosine distance(s).
+        It returns a np.float64 for single embeddings and np.ndarray for batch embeddings.
+    """
+    # Convert inputs to numpy arrays if necessary
+    source_representation = np.asarray(source_representation)
+    test_representation = np.asarray(test_representation)
+
+    if source_representation.ndim == 1 and test_representation.ndim == 1:
+        # single embedding
+        dot_product = np.dot(source_representation, test_representation)
+        source_norm = np.linalg.norm(source_representation)
+        test_norm = np.linalg.norm(test_representation)
+        distances = 1 - dot_product / (source_norm * test_norm)
+    elif source_representation.ndim == 2 and test_representation.ndim == 2:
+        # list of embeddings (batch)
+        similarities = find_cosine_similarities(
+            source_representation,
+            test_representation,
+            source_normalized,
+            chunk_size,
+            source_norms,
+        )  # (M, N)
+        distances = np.subtract(1, similarities, out=similarities)
+    else:
+        raise ValueError(
+            f"Embeddings must be 1D or 2D, but received "
+            f"source shape: {source_representation.shape}, test shape: {test_representation.shape}"
+        )
+    return distances
+
+def find_angular_distance(
+    source_representation: Union[np.ndarray, list],
+    test_representation: Union[np.ndarray, list],
+    source_normalized: bool = False,
+    chunk_size: int = DISTANCE_CHUNK_SIZE,
+    source_norms: Optional[np.ndarray] = None,
+) -> Union[np.float64, np.ndarray]:
+    """
+    Find angular distance between two vectors or batches of vectors.
+
+    Args:
+        source_representation (np.ndarray or list): 1st vector or batch of vectors.
+        test_representation (np.ndarray or list): 2nd vector or batch of vectors.
+        source_normalized (bool): batch of 1st vectors is l2 normalized already,
+            so it is not normalized again (default is False).
+        chunk_size (int): number of 1st vectors compared at once in batch mode (default is 4096).
+        source_norms (np.ndarray): pre-calculated (N,) l2 norms of the 1st batch, so that
+            similarities are found with a single matrix product (default is None).
+
+    Returns:
+        np.float64 or np.ndarray: angular distance(s).
+            Returns a np.float64 for single embeddings and np.ndarray for batch embeddings.
+    """
+
+    # calculate cosine similarity first
+    # then convert to angular distance
+    source_representation = np.asarray(source_representation)
+    test_representation = np.asarray(test_representation)
+
+    if source_representation.ndim == 1 and test_representation.ndim == 1:
+        # single embedding
+        dot_product = np.dot(source_representation, test_representation)
+        source_norm = np.linalg.norm(source_representation)
+        test_norm = np.linalg.norm(test_representation)
+        similarity = dot_product / (source_norm * test_norm)
+        distances = np.arccos(similarity) / np.pi
+    elif source_representation.ndim == 2 and test_representation.ndim == 2:
+        # list of embeddings (batch)
+        similarity = find_cosine_similarities(
+            source_representation,
+            test_representation,
+            source_normalized,
+            chunk_size,
+            source_norms,
+        )  # (M, N)
+        # similarities of identical vectors may slightly exceed 1
+        np.clip(similarity, -1, 1, out=similarity)
+        distances = np.arccos(similarity, out=similarity) / np.pi
+    else:
+        raise ValueError(
+            f"Embeddings must be 1D or 2D, but received "
+            f"source shape: {source_representation.shape}, test shape: {test_representation.shape}"
+        )
+    return distances
+
+def find_euclidean_distance(
+    source_representation: Union[np.ndarray, list],
+    test_representation: Union[np.ndarray, list],
+    chunk_size: int = DISTANCE_CHUNK_SIZE,
+    source_norms: Optional[np.ndarray] = None,
+) -> Union[np.float64, np.ndarray]:
+    """
+    Find Euclidean distance between two vectors or batches of vectors.
+
+    Args:
+        source_representation (np.ndarray or list): 1st vector or batch of vectors.
+        test_representation (np.ndarray or list): 2nd vector or batch of vectors.
+        chunk_size (int): number of 1st vectors compared at once in batch mode (default is 4096).
+        source_norms (np.ndarray): pre-calculated (N,) l2 norms of the 1st batch, so that
+            squared norms are not found again for each comparison (default is None).
+
+    Returns:
+        np.float64 or np.ndarray: Euclidean distance(s).
+            Returns a np.float64 for single embeddings and np.ndarray for batch embeddings.
+    """
+    # Convert inputs to numpy arrays if necessary
+    source_representation = np.asarray(source_representation)
+    test_representation = np.asarray(test_representation)
+
+    # Single embedding case (1D arrays)
+    if source_representation.ndim == 1 and test_representation.ndim == 1:
+        distances = np.linalg.norm(source_representation - test_representation)
+    # Batch embeddings case (2D arrays)
+    elif source_representation.ndim == 2 and test_representation.ndim == 2:
+        # ||a - b||^2 = ||a||^2 + ||b||^2 - 2ab found chunk by chunk instead of
+        # broadcasting a (M, N, D) difference tensor
+        dtype = __find_batch_dtype(source_representation)
+        test = np.asarray(test_representation, dtype=dtype)  # (M, D)
+        test_norms = np.sum(test**2, axis=1)[:, None]  # (M, 1)
+        distances = np.empty((test.shape[0], source_representation.shape[0]), dtype=dtype)
+        for start in range(0, source_representation.shape[0], chunk_size):
+            end = min(start + chunk_size, source_representation.shape[0])
+            source = np.asarray(source_representation[start:end], dtype=dtype)
+            if source_norms is None:
+                source_squared = np.sum(source**2, axis=1)
+            else:
+                source_squared = np.asarray(source_norms[start:end], dtype=dtype) ** 2
+            squared = test_norms - 2 * (test @ source.T) + source_squared[None, :]
+            distances[:, start:end] = np.sqrt(np.maximum(squared, 0))
+    else:
+        raise ValueError(
+            f"Embeddings must be 1D or 2D, but received "
+            f"source shape: {source_representation.shape}, test shape: {test_representation.shape}"
+        )
+    return distances
+
+
+def find_cosine_similarities(
+    source_representation: np.ndarray,
+    test_representation: np.ndarray,
+    source_normalized: bool = False,
+    chunk_size: int = DISTANCE_CHUNK_SIZE,
+    source_norms: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Find cosine similarities of batches of vectors chunk by chunk, so that only a chunk
+    of the 1st batch is normalized and kept in memory at once. If norms of the 1st batch
+    are known, raw dot products are divided by them instead of normalizing each chunk.
+    Args:
+        source_representation (np.ndarray): (N, D) 1st batch of vectors.
+        test_representation (np.ndarray): (M, D) 2nd batch of vectors.
+        source_normalized (bool): 1st batch is l2 normalized already (default is False).
+        chunk_size (int): number of 1st vectors compared at once (default is 4096).
+        source_norms (np.ndarray): pre-calculated (N,) l2 norms of the 1st batch
+            (default is None).
+    Returns:
+        np.ndarray: (M, N) cosine similarities
+    """
+    dtype = __find_batch_dtype(source_representation)
+    test_normed = l2_normalize(np.asarray(test_representation, dtype=dtype), axis=1)
+    similarities = np.empty((test_normed.shape[0], source_representation.shape[0]), dtype=dtype)
+    for start in range(0, source_representation.shape[0], chunk_size):
+        end = min(start + chunk_size, source_representation.shape[0])
+        source = np.asarray(source_representation[start:end], dtype=dtype)
+        if source_normalized:
+            np.matmul(test_normed, source.T, out=similarities[:, start:end])
+        elif source_norms is not None:
+            np.matmul(test_normed, source.T, out=similarities[:, start:end])
+            norms = np.asarray(source_norms[start:end], dtype=dtype)
+            similarities[:, start:end] /= norms[None, :] + 1e-10
+        else:
+            source = l2_normalize(source, axis=1)
+            np.matmul(test_normed, source.T, out=similarities[:, start:end])
+    return similarities
+
+
+def __find_batch_dtype(source_representation: np.ndarray) -> np.dtype:
+    """
+    Float type of batch distances, it follows the 1st batch, e.g. a gallery, so that
+    a float32 gallery is never upcasted
+    """
+    return np.result_type(source_representation.dtype, np.float32)
+
+
+def l2_normalize(
+    x: Union[np.ndarray, list], axis: Union[int, None] = None, epsilon: float = 1e-10
+) -> np.ndarray:
+    """
+    Normalize input vector with l2
+    Args:
+        x (np.ndarray or list): given vector
+        axis (int): axis along which to normalize
+    Returns:
+        np.ndarray: l2 normalized vector
+    """
+    # Convert inputs to numpy arrays if necessary
+    x = np.asarray(x)
+    norm = np.linalg.norm(x, axis=axis, keepdims=True)
+    return x / (norm + epsilon)
+
+
+def find_distance(
+    alpha_embedding: Union[np.ndarray, list],
+    beta_embedding: Union[np.ndarray, list],
+    distance_metric: str,
+    alpha_normalized: bool = False,
+    rounded: bool = True,
+    chunk_size: int = DISTANCE_CHUNK_SIZE,
+    alpha_norms: Optional[np.ndarray] = None,
+) -> Union[np.float64, np.ndarray]:
+    """
+    Wrapper to find the distance between vectors based on the specified distance metric.
+
+    Batches are compared chunk by chunk, so that peak memory is bound to the number of
+    2nd vectors times the chunk size besides the returned distances. Float32 batches,
+    e.g. of npy datastores, are compared in float32 without upcasting.
+
+    Args:
+        alpha_embedding (np.ndarray or list): 1st vector or batch of vectors.
+        beta_embedding (np.ndarray or list): 2nd vector or batch of vectors.
+        distance_metric (str): The type of distance to compute
+            ('cosine', 'euclidean', 'euclidean_l2', or 'angular').
+        alpha_normalized (bool): batch of 1st vectors is l2 normalized already, so it is not
+            normalized again for cosine, angular and euclidean_l2 (default is False).
+        rounded (bool): round distances to 6 decimals (default is True).
+        chunk_size (int): number of 1st vectors compared at once in batch mode (default is 4096).
+        alpha_norms (np.ndarray): pre-calculated (N,) l2 norms of the batch of 1st vectors,
+            e.g. stored in a datastore, so that every metric reduces to a single matrix
+            product of each chunk (default is None).
+
+    Returns:
+        np.float64 or np.ndarray: The calculated distance(s).
+    """
+    # Convert inputs to numpy arrays if necessary
+    alpha_embedding = np.asarray(alpha_embedding)
+    beta_embedding = np.asarray(beta_embedding)
+
+    # Ensure that both embeddings are either 1D or 2D
+    if alpha_embedding.ndim != beta_embedding.ndim or alpha_embedding.ndim not in (1, 2):
+        raise ValueError(
+            f"Both embeddings must be either 1D or 2D, but received "
+            f"alpha shape: {alpha_embedding.shape}, beta shape: {beta_embedding.shape}"
+        )
+
+    if distance_metric == "cosine":
+        distance = find_cosine_distance(
+            alpha_embedding, beta_embedding, alpha_normalized, chunk_size, alpha_norms
+        )
+    elif distance_metric == "angular":
+        distance = find_angular_distance(
+            alpha_embedding, beta_embedding, alpha_normalized, chunk_size, alpha_norms
+        )
+    elif distance_metric == "euclidean":
+        distance = find_euclidean_distance(
+            alpha_embedding, beta_embedding, chunk_size, alpha_norms
+        )
+    elif distance_metric == "euclidean_l2" and alpha_embedding.ndim == 2:
+        # euclidean distance of unit vectors is sqrt(2 - 2 * cosine similarity)
+        similarities = find_cosine_similarities(
+            alpha_embedding, beta_embedding, alpha_normalized, chunk_size, alpha_norms
+        )
+        distance = np.sqrt(np.maximum(2 - 2 * similarities, 0, out=similarities))
+    elif distance_metric == "euclidean_l2":
+        normalized_alpha = l2_normalize(alpha_embedding)
+        normalized_beta = l2_normalize(beta_embedding)
+        distance = find_euclidean_distance(normalized_alpha, normalized_beta)
+    else:
+        raise ValueError("Invalid distance_metric passed - ", distance_metric)
+
+    if not rounded:
+        return distance
+    if isinstance(distance, np.ndarray):
+        return np.round(distance, 6, out=distance)
+    return np.round(distance, 6)
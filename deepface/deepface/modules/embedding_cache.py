@@ -0,0 +1,246 @@
+# built-in dependencies
+import io
+import os
+import pickle
+import hashlib
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import IO, Any, Dict, List, Optional, Tuple, Union
+
+# 3rd party dependencies
+import numpy as np
+
+# project dependencies
+from deepface.commons import image_utils
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+# bytes of embeddings kept in memory by default
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# approximate bytes of a cached face besides its embedding
+FACE_OVERHEAD = 512
+
+shared_cache: Optional["EmbeddingCache"] = None
+shared_cache_lock = threading.Lock()
+
+
+class EmbeddingCache:
+    """
+    Content-addressed cache of the faces and embeddings found in an image.
+
+    Entries are keyed by the hash of the image content and the settings that change the
+    result, so that a changed image never hits a stale one. Files, file objects and base64
+    strings are addressed by their raw bytes, so that a hit does not decode them, and numpy
+    arrays and urls by their decoded pixels. Recently used entries are kept in memory up to
+    a byte budget. If a directory is given, entries are also written to disk, and entries
+    evicted from memory are loaded from there again.
+
+    Attributes:
+        max_bytes (int): memory budget of cached embeddings
+        path (str): directory of the on-disk tier, None to keep entries in memory only
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, path: Optional[str] = None):
+        if max_bytes < 0:
+            raise ValueError(f"max_bytes must be a non-negative integer but it is {max_bytes}")
+
+        self.max_bytes = max_bytes
+        self.path = path
+        self.nbytes = 0
+        self._entries: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Find the faces of a given key in memory first, and on disk then
+        Args:
+            key (str): key found with find_cache_key
+        Returns:
+            faces (list): copy of the cached faces, None if the key is not cached
+        """
+        with self._lock:
+            faces = self._entries.get(key)
+            if faces is not None:
+                self._entries.move_to_end(key)
+                return _copy_faces(faces)
+
+        entry_path = self._find_entry_path(key)
+        if entry_path is None or not os.path.exists(entry_path):
+            return None
+        try:
+            with open(entry_path, "rb") as f:
+                faces = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError) as err:
+            logger.debug(f"ignoring broken cache entry {entry_path} - {err}")
+            return None
+
+        self._remember(key, faces)
+        return _copy_faces(faces)
+
+    def put(self, key: str, faces: List[Dict[str, Any]]) -> None:
+        """
+        Cache the faces of a given key
+        Args:
+            key (str): key found with find_cache_key
+            faces (list): dicts with embedding and facial_area of each face,
+                and any other items of the face
+        """
+        faces = _copy_faces(faces)
+        self._remember(key, faces)
+
+        entry_path = self._find_entry_path(key)
+        if entry_path is not None:
+            # write to a temporary file first so that readers never see partial entries
+            tmp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(faces, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, entry_path)
+
+    def clear(self) -> None:
+        """
+        Drop in-memory entries, on-disk entries are kept
+        """
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.nbytes = 0
+
+    def _remember(self, key: str, faces: List[Dict[str, Any]]) -> None:
+        size = sum(np.asarray(face["embedding"]).nbytes + FACE_OVERHEAD for face in faces)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._sizes[key]
+            self._entries[key] = faces
+            self._entries.move_to_end(key)
+            self._sizes[key] = size
+            self.nbytes += size
+
+            # least recently used entries are evicted first
+            while self.nbytes > self.max_bytes:
+                evicted, _ = self._entries.popitem(last=False)
+                self.nbytes -= self._sizes.pop(evicted)
+
+    def _find_entry_path(self, key: str) -> Optional[str]:
+        if self.path is None:
+            return None
+        return os.path.join(self.path, f"{key}.pkl")
+
+
+def read_image_content(
+    img: Union[str, np.ndarray, IO[bytes]],
+) -> Tuple[Union[bytes, np.ndarray], Union[str, np.ndarray, IO[bytes]]]:
+    """
+    Read the content to address an image by, without decoding it if possible
+    Args:
+        img: a path, url, file object, base64 or numpy array
+    Returns:
+        content (bytes or np.ndarray): raw bytes of a file, file object or base64 string,
+            decoded pixels of a numpy array or url
+        img: image to load on a cache miss, file objects are replaced by their bytes
+            because they are consumed, and urls by their decoded pixels
+    """
+    if isinstance(img, np.ndarray):
+        return img, img
+
+    if hasattr(img, "read") and callable(img.read) and not isinstance(img, io.StringIO):
+        try:
+            img.seek(0)
+        except (AttributeError, TypeError, io.UnsupportedOperation):
+            pass
+        content = img.read()
+        return content, io.BytesIO(content)
+
+    if isinstance(img, Path):
+        img = str(img)
+
+    if isinstance(img, str) and img.startswith("data:image/"):
+        return img.encode("utf-8"), img
+
+    if (
+        isinstance(img, str)
+        and not img.lower().startswith(("http://", "https://"))
+        and os.path.isfile(img)
+    ):
+        with open(img, "rb") as f:
+            return f.read(), img
+
+    # urls are fetched once, invalid inputs raise here as they would on load
+    decoded, _ = image_utils.load_image(img)
+    return decoded, decoded
+
+
+def find_cache_key(content: Union[bytes, np.ndarray], **settings: Any) -> str:
+    """
+    Find the content address of an image for given settings
+    Args:
+        content (bytes or np.ndarray): raw bytes or decoded pixels, see read_image_content
+        settings: model, detector and preprocessing settings changing the result
+    Returns:
+        key (str): digest with sha1 algorithm
+    """
+    hasher = hashlib.sha1()
+    if isinstance(content, np.ndarray):
+        hasher.update(f"{content.shape}-{content.dtype.str}".encode("utf-8"))
+        hasher.update(np.ascontiguousarray(content).data)
+    else:
+        hasher.update(b"raw-")
+        hasher.update(content)
+    hasher.update(repr(sorted(settings.items())).encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """
+    Get the embedding cache shared by represent and verify
+    Returns:
+        cache (EmbeddingCache): shared cache
+    """
+    global shared_cache  # pylint: disable=global-statement
+    with shared_cache_lock:
+        if shared_cache is None:
+            shared_cache = EmbeddingCache()
+        return shared_cache
+
+
+def configure_embedding_cache(
+    max_bytes: int = DEFAULT_MAX_BYTES, path: Optional[str] = None
+) -> EmbeddingCache:
+    """
+    Replace the embedding cache shared by represent and verify
+    Args:
+        max_bytes (int): memory budget of cached embeddings (default is 64 MB)
+        path (str): directory of the on-disk tier, None to keep entries in memory only
+            (default is None)
+    Returns:
+        cache (EmbeddingCache): new shared cache
+    """
+    global shared_cache  # pylint: disable=global-statement
+    with shared_cache_lock:
+        shared_cache = EmbeddingCache(max_bytes=max_bytes, path=path)
+        return shared_cache
+
+
+def _copy_faces(faces: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Copy cached faces, so that callers modifying results do not change the cache
+    """
+    copied = []
+    for face in faces:
+        face = dict(face)
+        face["embedding"] = face["embedding"].copy()
+        face["facial_area"] = dict(face["facial_area"])
+        copied.append(face)
+    return copied
@@ -0,0 +1,384 @@
+# built-in dependencies
+import os
+import pickle
+import multiprocessing
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Generator, List, Optional, Set, Tuple, Union
+
+# 3rd party dependencies
+import numpy as np
+from tqdm import tqdm
+
+# project dependencies
+from deepface.commons import image_utils
+from deepface.modules import representation, detection
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+# number of images hashed, decoded or detected ahead of recognition per worker
+PREFETCH_PER_WORKER = 4
+
+
+def find_bulk_embeddings(
+    employees: Set[str],
+    model_name: str = "VGG-Face",
+    detector_backend: str = "opencv",
+    enforce_detection: bool = True,
+    align: bool = True,
+    expand_percentage: int = 0,
+    normalization: str = "base",
+    silent: bool = False,
+    workers: int = 1,
+    batch_size: int = 32,
+    use_processes: bool = False,
+    checkpoint_path: Optional[str] = None,
+) -> List[Dict["str", Any]]:
+    """
+    Find embeddings of a list of images with a pipelined enrollment engine.
+
+    Images are hashed and decoded in a thread pool, faces are detected in a thread or process
+    pool, and aligned faces are grouped into fixed-size batches for the recognition model.
+    Representations of completed images are appended to a checkpoint file, so that an
+    interrupted run resumes from where it stopped. Images failing to load or detect,
+    including on a crashed detection process, are recorded without an embedding.
+
+    Args:
+        employees (list): list of exact image paths
+
+        model_name (str): Model for face recognition. Options: VGG-Face, Facenet, Facenet512,
+            OpenFace, DeepFace, DeepID, Dlib, ArcFace, SFace and GhostFaceNet (default is VGG-Face).
+
+        detector_backend (str): face detector model name
+
+        enforce_detection (bool): set this to False if you
+            want to proceed when you cannot detect any face
+
+        align (bool): enable or disable alignment of image
+            before feeding to facial recognition model
+
+        expand_percentage (int): expand detected facial area with a
+            percentage (default is 0).
+
+        normalization (bool): normalization technique
+
+        silent (bool): enable or disable informative logging
+
+        workers (int): number of decoding and detection workers (default is 1).
+
+        batch_size (int): number of faces fed to the recognition model at once (default is 32).
+
+        use_processes (bool): detect faces in a process pool instead of a thread pool.
+            Each process decodes its images and builds its own detector (default is False).
+
+        checkpoint_path (str): file to keep representations of completed images.
+            It is not removed here, delete it once the representations are persisted
+            (default is None).
+    Returns:
+        representations (list): pivot list of dict with
+            image name, hash, embedding and detected face area's coordinates
+    """
+    workers = max(1, workers)
+    batch_size = max(1, batch_size)
+
+    representations: List[Dict[str, Any]] = []
+
+    checkpointed, checkpoint_size = _load_checkpoint(checkpoint_path)
+    if len(checkpointed) > 0 and not silent:
+        logger.info(f"Resuming from {checkpoint_path}, {len(checkpointed)} images checkpointed")
+
+    detection_args = {
+        "detector_backend": detector_backend,
+        "enforce_detection": enforce_detection,
+        "align": align,
+        "expand_percentage": expand_percentage,
+    }
+
+    checkpoint = None
+    if checkpoint_path is not None:
+        os.makedirs(os.path.dirname(checkpoint_path) or ".", exist_ok=True)
+        # pylint: disable=consider-using-with
+        checkpoint = open(checkpoint_path, "ab")
+        # drop a record cut off by an interruption, so that appended records are readable
+        checkpoint.truncate(checkpoint_size)
+
+    # faces waiting for recognition, and images whose faces are all waiting
+    queued_faces: List[Dict[str, Any]] = []
+    queued_images: List[Tuple[str, str, List[Dict[str, Any]]]] = []
+
+    def flush() -> None:
+        if len(queued_faces) > 0:
+            embeddings = __represent(
+                faces=[face["face"] for face in queued_faces],
+                model_name=model_name,
+                enforce_detection=enforce_detection,
+                align=align,
+                normalization=normalization,
+                batch_size=batch_size,
+            )
+            for face, embedding in zip(queued_faces, embeddings):
+                face["representation"]["embedding"] = embedding
+
+        for employee, file_hash, image_representations in queued_images:
+            representations.extend(image_representations)
+            if checkpoint is not None:
+                pickle.dump(
+                    (employee, file_hash, image_representations),
+                    checkpoint,
+                    pickle.HIGHEST_PROTOCOL,
+                )
+        if checkpoint is not None:
+            checkpoint.flush()
+
+        queued_faces.clear()
+        queued_images.clear()
+
+    detected = __detect_in_pipeline(
+        employees=sorted(employees),
+        checkpointed=checkpointed,
+        workers=workers,
+        use_processes=use_processes,
+        detection_args=detection_args,
+        max_in_flight=workers * PREFETCH_PER_WORKER,
+    )
+    try:
+        for employee, file_hash, img_objs in tqdm(
+            detected,
+            total=len(employees),
+            desc="Finding representations",
+            disable=silent,
+        ):
+            if img_objs is None:
+                # completed by an interrupted run and unchanged since then
+                representations += checkpointed[employee][1]
+                continue
+
+            if isinstance(img_objs, Exception):
+                logger.error(f"Exception while extracting faces from {employee}: {str(img_objs)}")
+                img_objs = []
+
+            image_representations = []
+            if len(img_objs) == 0:
+                image_representations.append(
+                    {
+                        "identity": employee,
+                        "hash": file_hash,
+                        "embedding": None,
+                        "target_x": 0,
+                        "target_y": 0,
+                        "target_w": 0,
+                        "target_h": 0,
+                    }
+                )
+
+            for img_obj in img_objs:
+                img_region = img_obj["facial_area"]
+                image_representation = {
+                    "identity": employee,
+                    "hash": file_hash,
+                    "embedding": None,
+                    "target_x": img_region["x"],
+                    "target_y": img_region["y"],
+                    "target_w": img_region["w"],
+                    "target_h": img_region["h"],
+                }
+                image_representations.append(image_representation)
+                queued_faces.append(
+                    {"face": img_obj["face"], "representation": image_representation}
+                )
+
+            queued_images.append((employee, file_hash, image_representations))
+
+            if len(queued_faces) >= batch_size:
+                flush()
+        flush()
+    finally:
+        # shuts the pools down
+        detected.close()
+        if checkpoint is not None:
+            checkpoint.close()
+
+    return representations
+
+
+def __detect_in_pipeline(
+    employees: List[str],
+    checkpointed: Dict[str, Tuple[str, list]],
+    workers: int,
+    use_processes: bool,
+    detection_args: Dict[str, Any],
+    max_in_flight: int,
+) -> Generator[Tuple[str, str, Optional[Union[List[Dict[str, Any]], Exception]]], None, None]:
+    """
+    Detect faces of images concurrently. Images are hashed in a thread pool, so that
+    detection starts with the first hashed image, and images checkpointed with the same
+    hash are skipped. With threads, images are decoded in the same pool and passed to the
+    detection threads. With processes, each process decodes its images itself, so that
+    only paths are pickled to it instead of decoded pixels.
+    At most max_in_flight images are hashed, decoded or detected at once to bound memory.
+    A crashed process breaks its pool, the images in flight on it fail and a new pool
+    detects the rest.
+    Yields:
+        employee (str), hash (str) and detected faces or the exception raised for that image,
+            None if the image is checkpointed already
+    """
+    decoder = ThreadPoolExecutor(max_workers=workers)
+    detector = __create_detector(workers=workers, use_processes=use_processes)
+
+    items = iter(employees)
+    hashing: Dict[Future, str] = {}
+    decoding: Dict[Future, Tuple[str, str]] = {}
+    detecting: Dict[Future, Tuple[Tuple[str, str], Executor]] = {}
+
+    def detect(img: Union[str, np.ndarray], item: Tuple[str, str]) -> None:
+        nonlocal detector
+        try:
+            future = detector.submit(_detect_faces, img, detection_args)
+        except BrokenProcessPool:
+            detector = __replace_detector(detector, workers=workers)
+            future = detector.submit(_detect_faces, img, detection_args)
+        detecting[future] = (item, detector)
+
+    def fill() -> None:
+        while len(hashing) + len(decoding) + len(detecting) < max_in_flight:
+            employee = next(items, None)
+            if employee is None:
+                return
+            hashing[decoder.submit(image_utils.find_image_hash, employee)] = employee
+
+    try:
+        fill()
+        while len(hashing) > 0 or len(decoding) > 0 or len(detecting) > 0:
+            done, _ = wait(
+                list(hashing) + list(decoding) + list(detecting), return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                if future in hashing:
+                    employee = hashing.pop(future)
+                    # an image which cannot be hashed fails the enrollment as a whole
+                    item = (employee, future.result())
+                    if employee in checkpointed and checkpointed[employee][0] == item[1]:
+                        yield item[0], item[1], None
+                    elif use_processes:
+                        detect(employee, item)
+                    else:
+                        decoding[decoder.submit(_decode_image, employee)] = item
+                elif future in decoding:
+                    item = decoding.pop(future)
+                    try:
+                        img = future.result()
+                    except Exception as err:  # pylint: disable=broad-except
+                        yield item[0], item[1], err
+                        continue
+                    detect(img, item)
+                else:
+                    item, pool = detecting.pop(future)
+                    try:
+                        img_objs = future.result()
+                    except BrokenProcessPool as err:
+                        # other images in flight on the broken pool fail the same way
+                        if pool is detector:
+                            detector = __replace_detector(detector, workers=workers)
+                        yield item[0], item[1], err
+                        continue
+                    except Exception as err:  # pylint: disable=broad-except
+                        yield item[0], item[1], err
+                        continue
+                    yield item[0], item[1], img_objs
+            fill()
+    finally:
+        decoder.shutdown()
+        detector.shutdown()
+
+
+def __create_detector(workers: int, use_processes: bool) -> Executor:
+    if use_processes:
+        # forking a process after tensorflow is initialized is not safe
+        return ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+def __replace_detector(detector: Executor, workers: int) -> Executor:
+    logger.warn("A face detection process crashed, restarting the process pool")
+    detector.shutdown(wait=False)
+    return __create_detector(workers=workers, use_processes=True)
+
+
+def __represent(
+    faces: List[np.ndarray],
+    model_name: str,
+    enforce_detection: bool,
+    align: bool,
+    normalization: str,
+    batch_size: int,
+) -> List[List[float]]:
+    """
+    Find embeddings of extracted faces in fixed-size batches
+    """
+    embeddings = []
+    for offset in range(0, len(faces), batch_size):
+        batch = faces[offset : offset + batch_size]
+        embedding_objs = representation.represent(
+            img_path=batch,
+            model_name=model_name,
+            enforce_detection=enforce_detection,
+            detector_backend="skip",
+            align=align,
+            normalization=normalization,
+        )
+        # represent unwraps the result of a single image batch
+        if len(batch) == 1:
+            embedding_objs = [embedding_objs]
+        embeddings += [embedding_obj[0]["embedding"] for embedding_obj in embedding_objs]
+    return embeddings
+
+
+def _decode_image(file_path: str) -> np.ndarray:
+    img, _ = image_utils.load_image(file_path)
+    if img is None:
+        raise ValueError(f"Exception while loading {file_path}")
+    return img
+
+
+def _detect_faces(
+    img: Union[str, np.ndarray], detection_args: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    # runs in the worker, so it must be a picklable module level function
+    # a path is decoded in the worker, so that pixels are not pickled to a process
+    return detection.extract_faces(
+        img_path=img,
+        grayscale=False,
+        color_face="bgr",  # `represent` expects images in bgr format.
+        **detection_args,
+    )
+
+
+def _load_checkpoint(
+    checkpoint_path: Optional[str],
+) -> Tuple[Dict[str, Tuple[str, list]], int]:
+    """
+    Load representations of completed images from a checkpoint file. A record
+    cut off by an interruption ends the file, it is ignored.
+    Returns:
+        checkpointed (dict): hash and representations of each completed image
+        size (int): offset of the end of the last complete record, the file should be
+            truncated to it before appending
+    """
+    checkpointed: Dict[str, Tuple[str, list]] = {}
+    size = 0
+    if checkpoint_path is None or not os.path.exists(checkpoint_path):
+        return checkpointed, size
+
+    with open(checkpoint_path, "rb") as f:
+        while True:
+            try:
+                employee, file_hash, image_representations = pickle.load(f)
+            except (EOFError, pickle.UnpicklingError):
+                break
+            checkpointed[employee] = (file_hash, image_representations)
+            size = f.tell()
+    return checkpointed, size
@@ -0,0 +1,636 @@
+# built-in dependencies
+import os
+import pickle
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# 3rd party dependencies
+import numpy as np
+
+# project dependencies
+from deepface.commons import image_utils, folder_utils
+from deepface.modules import enrollment
+from deepface.modules.datastore import EmbeddingStore, TARGET_COLUMNS
+from deepface.modules.ann import IVFIndex, NORMALIZED_METRICS
+from deepface.modules.quantization import QuantizedIndex
+from deepface.modules.manifest import ScanManifest
+from deepface.modules.search import ShardedGallery, assign_shards
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+# required columns for representations
+REPRESENTATION_COLUMNS = {"identity", "hash", "embedding", *TARGET_COLUMNS}
+
+cached_indexes: Dict[Tuple[Any, ...], "GalleryIndex"] = {}
+cached_indexes_lock = threading.Lock()
+
+
+# pylint: disable=too-many-instance-attributes
+class GalleryIndex:
+    """
+    Long-lived in-process index of a facial database.
+
+    The index keeps the representations of db_path in memory and synchronizes them with
+    the datastore and the directory incrementally. Image files of db_path are tracked with
+    a persistent scan manifest, so that only the directories whose modification time
+    changed are listed again, even across processes, and only the images whose size or
+    modification time changed are hashed again. Repeated searches against an unchanged
+    database cost the distance computation and a stat per directory. If db_path is watched
+    for changes, they cost the distance computation only until a change is reported.
+
+    Attributes:
+        db_path (str): path to the folder containing image files
+        datastore_path (str): exact path of the pkl file or npy store directory
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        model_name: str = "VGG-Face",
+        detector_backend: str = "opencv",
+        align: bool = True,
+        normalization: str = "base",
+        expand_percentage: int = 0,
+        datastore_format: str = "pickle",
+    ):
+        self.db_path = db_path
+        self.model_name = model_name
+        self.detector_backend = detector_backend
+        self.align = align
+        self.normalization = normalization
+        self.expand_percentage = expand_percentage
+        self.datastore_format = datastore_format
+
+        file_parts = [
+            "ds",
+            "model",
+            model_name,
+            "detector",
+            detector_backend,
+            "aligned" if align else "unaligned",
+            "normalization",
+            normalization,
+            "expand",
+            str(expand_percentage),
+        ]
+        self.file_name = "_".join(file_parts).replace("-", "").lower()
+        self.pickle_path = os.path.join(db_path, f"{self.file_name}.pkl")
+        # representations of an interrupted enrollment are kept out of db_path to resume it,
+        # so that writing them does not change the modification time of db_path
+        db_hash = hashlib.sha1(os.path.abspath(db_path).encode("utf-8")).hexdigest()[:16]
+        self.checkpoint_path = os.path.join(
+            folder_utils.get_deepface_home(),
+            ".deepface",
+            "checkpoints",
+            f"{self.file_name}_{db_hash}.pkl",
+        )
+        # the manifest tells which images changed since this datastore was synchronized,
+        # so it is kept per datastore
+        self.manifest_path = os.path.join(
+            folder_utils.get_deepface_home(),
+            ".deepface",
+            "manifests",
+            f"{self.file_name}_{db_hash}.pkl",
+        )
+
+        if datastore_format == "pickle":
+            self.datastore_path = self.pickle_path
+        elif datastore_format == "npy":
+            self.datastore_path = os.path.join(db_path, self.file_name)
+        else:
+            raise ValueError(f"unimplemented datastore format - {datastore_format}")
+
+        self._lock = threading.RLock()
+        self._store: Optional[EmbeddingStore] = None
+        self._representations: List[Dict[str, Any]] = []
+        self._arrays: Optional[
+            Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray], np.ndarray]
+        ] = None
+        self._loaded = False
+        self._datastore_signature: Optional[Tuple[int, int]] = None
+        self._manifest = ScanManifest(root=db_path, path=self.manifest_path)
+        self._synced = False
+        self._ann_indexes: Dict[Tuple[str, bool], IVFIndex] = {}
+        self._quantized_indexes: Dict[Tuple[str, bool], QuantizedIndex] = {}
+        # embeddings of a pickle datastore moved out of memory once they are quantized
+        self._spilled: Optional[np.ndarray] = None
+        self._sharded: Optional[Tuple[Tuple[int, str], ShardedGallery]] = None
+
+    def __len__(self) -> int:
+        if self._store is not None:
+            return len(self._store)
+        return len(self._representations)
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        """
+        (N, D) matrix of embeddings, rows without a face are zero filled
+        """
+        if self._store is not None:
+            return self._store.embeddings
+        return self._build_arrays()[0]
+
+    @property
+    def valid_mask(self) -> np.ndarray:
+        """
+        (N,) boolean mask of the rows having an embedding
+        """
+        if self._store is not None:
+            return self._store.valid_mask
+        return self._build_arrays()[1]
+
+    @property
+    def alive_mask(self) -> np.ndarray:
+        """
+        (N,) boolean mask of the rows still in the database
+        """
+        if self._store is not None:
+            return self._store.alive_mask
+        return np.ones(len(self._representations), dtype=bool)
+
+    @property
+    def metadata(self) -> Dict[str, np.ndarray]:
+        """
+        Columns of identity, hash and target box, each of them has N items
+        """
+        if self._store is not None:
+            return self._store.metadata
+        return self._build_arrays()[2]
+
+    @property
+    def norms(self) -> np.ndarray:
+        """
+        (N,) l2 norm of each embedding, found once when the gallery is loaded
+        """
+        if self._store is not None:
+            return self._store.norms
+        return self._build_arrays()[3]
+
+    def snapshot(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Get the arrays of the gallery at once, a concurrent refresh replaces the arrays
+        instead of modifying them so that rows of the returned ones always match
+        Returns:
+            embeddings (np.ndarray): (N, D) matrix of embeddings
+            valid_mask (np.ndarray): (N,) boolean mask of the rows having an embedding
+            norms (np.ndarray): (N,) l2 norm of each embedding
+            metadata (dict): columns of identity, hash and target box
+        """
+        with self._lock:
+            return self.embeddings, self.valid_mask, self.norms, self.metadata
+
+    def watch(self) -> None:
+        """
+        Watch db_path for changes with watchdog, so that refreshes skip scanning it until a
+        change is reported. Changes made by other hosts of a network filesystem are not seen.
+        """
+        with self._lock:
+            self._manifest.watch()
+
+    def refresh(
+        self,
+        refresh_database: bool = True,
+        enforce_detection: bool = True,
+        silent: bool = False,
+        enrollment_workers: int = 1,
+        enrollment_batch_size: int = 32,
+        enrollment_processes: bool = False,
+        check_files: bool = False,
+    ) -> None:
+        """
+        Synchronize the in-memory representations with the datastore and db_path
+        Args:
+            refresh_database (boolean): Synchronizes the images representation with the
+                directory/db files, if set to false, it will ignore any file changes
+                inside the db_path directory (default is True).
+            enforce_detection (boolean): If no face is detected in an image, raise an exception.
+            silent (boolean): Suppress or allow some log messages (default is False).
+            enrollment_workers (int): number of workers decoding new images and detecting
+                their faces (default is 1).
+            enrollment_batch_size (int): number of faces of new images embedded at once
+                (default is 32).
+            enrollment_processes (boolean): detect faces of new images in processes instead
+                of threads (default is False).
+            check_files (boolean): stat images of unchanged directories to find the ones
+                overwritten in place (default is False).
+        """
+        with self._lock:
+            # datastore may be updated by another process
+            if not self._loaded or self._datastore_signature != self._find_datastore_signature():
+                self._load()
+
+            if not refresh_database:
+                logger.info(
+                    f"Could be some changes in {self.db_path} not tracked."
+                    "Set refresh_database to true to assure that any changes will be tracked."
+                )
+                if len(self) == 0:
+                    raise ValueError(f"Nothing is found in {self.datastore_path}")
+                return
+
+            changed, modified_images = self._manifest.refresh(check_files=check_files)
+            if self._synced and not changed:
+                return
+
+            try:
+                self._sync(
+                    modified_images=modified_images,
+                    enforce_detection=enforce_detection,
+                    silent=silent,
+                    workers=enrollment_workers,
+                    batch_size=enrollment_batch_size,
+                    use_processes=enrollment_processes,
+                )
+            except Exception:
+                # forget the changes seen in this refresh, so that they are synced next time
+                self._manifest.load()
+                raise
+            self._manifest.save()
+            self._synced = True
+
+    def ann_index(self, kind: str = "ivf", distance_metric: str = "cosine") -> IVFIndex:
+        """
+        Get the approximate nearest neighbour index of the gallery, it is loaded from
+        next to the datastore or built for the first time
+        Args:
+            kind (str): index type. Options: ivf
+            distance_metric (str): cosine, euclidean, euclidean_l2 or angular. Metrics except
+                euclidean share the same index built on l2 normalized vectors.
+        Returns:
+            index (IVFIndex): up to date index of the gallery
+        """
+        if kind != "ivf":
+            raise ValueError(f"unimplemented index - {kind}")
+
+        normalized = distance_metric in NORMALIZED_METRICS
+        key = (kind, normalized)
+        with self._lock:
+            if key not in self._ann_indexes:
+                suffix = f"{kind}_{'normalized' if normalized else 'raw'}.npz"
+                if self._store is not None:
+                    index_path = os.path.join(self.datastore_path, suffix)
+                else:
+                    index_path = os.path.join(self.db_path, f"{self.file_name}_{suffix}")
+                ann = IVFIndex(path=index_path, normalized=normalized)
+                ann.sync(self.embeddings, self.valid_mask, self.metadata["identity"])
+                self._ann_indexes[key] = ann
+            return self._ann_indexes[key]
+
+    def quantized_index(self, kind: str, distance_metric: str = "cosine") -> QuantizedIndex:
+        """
+        Get the compressed copy of the gallery embeddings, it is loaded from next to the
+        datastore or encoded for the first time
+        Args:
+            kind (str): float16, int8 or pq
+            distance_metric (str): cosine, euclidean, euclidean_l2 or angular. Metrics except
+                euclidean share the same codes of l2 normalized vectors.
+        Returns:
+            index (QuantizedIndex): up to date codes of the gallery
+        """
+        normalized = distance_metric in NORMALIZED_METRICS
+        key = (kind, normalized)
+        with self._lock:
+            if key not in self._quantized_indexes:
+                suffix = f"{kind}_{'normalized' if normalized else 'raw'}.npz"
+                if self._store is not None:
+                    index_path = os.path.join(self.datastore_path, suffix)
+                else:
+                    index_path = os.path.join(self.db_path, f"{self.file_name}_{suffix}")
+                quantized = QuantizedIndex(path=index_path, kind=kind, normalized=normalized)
+                quantized.sync(self.embeddings, self.valid_mask, self.metadata["identity"])
+                self._quantized_indexes[key] = quantized
+                self._spill_embeddings()
+            return self._quantized_indexes[key]
+
+    def sharded_gallery(self, num_shards: int, shard_by: str = "identity") -> ShardedGallery:
+        """
+        Get the gallery split into shards searched in worker processes. It is built once
+        and kept until the representations change.
+        Args:
+            num_shards (int): number of shards and worker processes
+            shard_by (str): identity or directory, see `search.assign_shards`
+        Returns:
+            sharded (ShardedGallery): gallery split into shards
+        """
+        key = (num_shards, shard_by)
+        with self._lock:
+            if self._sharded is None or self._sharded[0] != key:
+                self._release_sharded_gallery()
+                shard_ids = assign_shards(
+                    identities=self.metadata["identity"],
+                    num_shards=num_shards,
+                    db_path=self.db_path,
+                    shard_by=shard_by,
+                )
+                sharded = ShardedGallery(
+                    embeddings=self.embeddings,
+                    valid_mask=self.valid_mask,
+                    shard_ids=shard_ids,
+                    num_shards=num_shards,
+                    norms=self.norms,
+                )
+                self._sharded = (key, sharded)
+            return self._sharded[1]
+
+    def close(self) -> None:
+        """
+        Stop shard worker processes and release their shared memory block, and stop watching
+        db_path. The index is still usable and starts them again on demand.
+        """
+        with self._lock:
+            self._release_sharded_gallery()
+            self._manifest.unwatch()
+
+    def _load(self) -> None:
+        self._arrays = None
+        self._spilled = None
+        self._release_sharded_gallery()
+        # indexes may be updated along with the datastore, load them lazily again
+        self._ann_indexes = {}
+        self._quantized_indexes = {}
+        if self.datastore_format == "pickle":
+            self._representations = _load_pickle(self.pickle_path)
+        else:
+            self._store = EmbeddingStore(self.datastore_path)
+            if self._store.size == 0 and os.path.exists(self.pickle_path):
+                # migrate representations of the legacy datastore once
+                self._store.append(_load_pickle(self.pickle_path))
+        self._loaded = True
+        self._datastore_signature = self._find_datastore_signature()
+        # the datastore may be synced by another process along with its manifest
+        self._manifest.load()
+        self._synced = False
+
+    def _sync(
+        self,
+        modified_images: Set[str],
+        enforce_detection: bool,
+        silent: bool,
+        workers: int = 1,
+        batch_size: int = 32,
+        use_processes: bool = False,
+    ) -> None:
+        """
+        Enforce data consistency amongst on disk images and datastore. Only images
+        modified since the last refresh of the manifest are checked for replacement.
+        """
+        if self._store is not None:
+            stored_hashes = self._store.hashes()
+        else:
+            stored_hashes = {rep["identity"]: rep["hash"] for rep in self._representations}
+
+        # Get the list of images on storage
+        storage_images = self._manifest.images()
+
+        if len(storage_images) == 0:
+            raise ValueError(f"No item found in {self.db_path}")
+
+        # embedded images
+        pickled_images = set(stored_hashes.keys())
+
+        new_images = storage_images - pickled_images  # images added to storage
+        old_images = pickled_images - storage_images  # images removed from storage
+        replaced_images = set()
+
+        # detect replaced images
+        for identity in modified_images & pickled_images:
+            alpha_hash = stored_hashes[identity]
+            beta_hash = image_utils.find_image_hash(identity)
+            if alpha_hash != beta_hash:
+                logger.debug(f"Even though {identity} represented before, it's replaced later.")
+                replaced_images.add(identity)
+
+        if not silent and (
+            len(new_images) > 0 or len(old_images) > 0 or len(replaced_images) > 0
+        ):
+            logger.info(
+                f"Found {len(new_images)} newly added image(s)"
+                f", {len(old_images)} removed image(s)"
+                f", {len(replaced_images)} replaced image(s)."
+            )
+
+        # append replaced images into both old and new images. these will be dropped and re-added.
+        new_images.update(replaced_images)
+        old_images.update(replaced_images)
+
+        if len(new_images) == 0 and len(old_images) == 0:
+            return
+
+        new_representations = []
+        if len(new_images) > 0:
+            new_representations = enrollment.find_bulk_embeddings(
+                employees=new_images,
+                model_name=self.model_name,
+                detector_backend=self.detector_backend,
+                enforce_detection=enforce_detection,
+                align=self.align,
+                expand_percentage=self.expand_percentage,
+                normalization=self.normalization,
+                silent=silent,
+                workers=workers,
+                batch_size=batch_size,
+                use_processes=use_processes,
+                checkpoint_path=self.checkpoint_path,
+            )
+
+        self._apply(old_images=old_images, new_representations=new_representations)
+
+        # representations are persisted, an interrupted enrollment has nothing left to resume
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+        if not silent:
+            logger.info(f"There are now {len(self)} representations in {self.datastore_path}")
+
+    def _apply(self, old_images: Set[str], new_representations: List[Dict[str, Any]]) -> None:
+        """
+        Drop representations of old images, add new ones and persist the datastore
+        """
+        self._restore_embeddings()
+        self._arrays = None
+        self._release_sharded_gallery()
+        if self._store is not None:
+            self._store.remove(old_images)
+            self._store.append(new_representations)
+        else:
+            # remove old images first
+            self._representations = [
+                rep for rep in self._representations if rep["identity"] not in old_images
+            ]
+            self._representations += new_representations
+            with open(self.pickle_path, "wb") as f:
+                pickle.dump(self._representations, f, pickle.HIGHEST_PROTOCOL)
+        self._datastore_signature = self._find_datastore_signature()
+
+        # add new rows to the approximate nearest neighbour indexes and codes in use
+        for ann in self._ann_indexes.values():
+            ann.sync(self.embeddings, self.valid_mask, self.metadata["identity"])
+        for quantized in self._quantized_indexes.values():
+            quantized.sync(self.embeddings, self.valid_mask, self.metadata["identity"])
+        if len(self._quantized_indexes) > 0:
+            self._spill_embeddings()
+
+    def _spill_embeddings(self) -> None:
+        """
+        Keep only the codes of quantized indexes in memory for a pickle datastore. Its exact
+        embeddings are written to a memory mapped npy file next to it and dropped from the
+        representations, so that re-ranking pages in the rows of candidates only.
+        """
+        if self._store is not None or self._spilled is not None:
+            return
+
+        embeddings, valid_mask, metadata, norms = self._build_arrays()
+        spill_path = os.path.join(self.db_path, f"{self.file_name}_embeddings.npy")
+        # write to a temporary file first so that other processes never map a partial file
+        tmp_path = f"{spill_path}.{os.getpid()}.tmp.npy"
+        np.save(tmp_path, embeddings)
+        os.replace(tmp_path, spill_path)
+
+        self._spilled = np.load(spill_path, mmap_mode="r")
+        self._arrays = (self._spilled, valid_mask, metadata, norms)
+        for rep in self._representations:
+            rep.pop("embedding", None)
+
+    def _restore_embeddings(self) -> None:
+        """
+        Put spilled embeddings back into the representations, e.g. to persist them again
+        """
+        if self._spilled is None:
+            return
+
+        valid_mask = self._arrays[1]
+        for i, rep in enumerate(self._representations):
+            rep["embedding"] = self._spilled[i].tolist() if valid_mask[i] else None
+        self._spilled = None
+
+    def _release_sharded_gallery(self) -> None:
+        if self._sharded is not None:
+            self._sharded[1].close()
+            self._sharded = None
+
+    def _build_arrays(
+        self,
+    ) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray], np.ndarray]:
+        """
+        Convert pickled representations to columns once, and keep them until they change
+        """
+        if self._arrays is not None:
+            return self._arrays
+
+        with self._lock:
+            representations = self._representations
+            valid_mask = np.array(
+                [rep["embedding"] is not None for rep in representations], dtype=bool
+            )
+            dims = next(
+                (len(rep["embedding"]) for rep in representations if rep["embedding"] is not None),
+                0,
+            )
+            embeddings = np.zeros((len(representations), dims), dtype=np.float32)
+            for i in np.flatnonzero(valid_mask):
+                embeddings[i] = representations[i]["embedding"]
+
+            metadata = {
+                key: np.array([rep[key] for rep in representations])
+                for key in ["identity", "hash"] + TARGET_COLUMNS
+            }
+            norms = np.linalg.norm(embeddings, axis=1)
+            self._arrays = (embeddings, valid_mask, metadata, norms)
+            return self._arrays
+
+    def _find_datastore_signature(self) -> Optional[Tuple[int, int]]:
+        if self._store is not None:
+            signature_path = self._store.metadata_path
+        else:
+            signature_path = self.pickle_path
+        if not os.path.exists(signature_path):
+            return None
+        stats = os.stat(signature_path)
+        return stats.st_mtime_ns, stats.st_size
+
+
+def get_gallery_index(
+    db_path: str,
+    model_name: str = "VGG-Face",
+    detector_backend: str = "opencv",
+    align: bool = True,
+    normalization: str = "base",
+    expand_percentage: int = 0,
+    datastore_format: str = "pickle",
+) -> GalleryIndex:
+    """
+    Get the gallery index of a facial database as singletonish way
+    Args:
+        db_path (str): path to the folder containing image files
+        model_name (str): model for face recognition
+        detector_backend (str): face detector backend
+        align (bool): alignment of the faces
+        normalization (str): normalization of the faces
+        expand_percentage (int): expansion percentage of the detected facial areas
+        datastore_format (str): pickle or npy
+    Returns:
+        index (GalleryIndex): long-lived index of the database
+    """
+    key = (
+        os.path.abspath(db_path),
+        model_name,
+        detector_backend,
+        align,
+        normalization,
+        expand_percentage,
+        datastore_format,
+    )
+    with cached_indexes_lock:
+        if key not in cached_indexes:
+            cached_indexes[key] = GalleryIndex(
+                db_path=db_path,
+                model_name=model_name,
+                detector_backend=detector_backend,
+                align=align,
+                normalization=normalization,
+                expand_percentage=expand_percentage,
+                datastore_format=datastore_format,
+            )
+        return cached_indexes[key]
+
+
+def clear_gallery_indexes() -> None:
+    """
+    Release all cached gallery indexes
+    """
+    with cached_indexes_lock:
+        indexes = list(cached_indexes.values())
+        cached_indexes.clear()
+    for index in indexes:
+        index.close()
+
+
+def _load_pickle(datastore_path: str) -> List[Dict[str, Any]]:
+    """
+    Load representations from a pickle datastore, create it if it does not exist
+    Args:
+        datastore_path (str): exact path of the pkl file
+    Returns:
+        representations (list): list of dict with identity, hash, embedding and target box
+    """
+    # Ensure the proper pickle file exists
+    if not os.path.exists(datastore_path):
+        with open(datastore_path, "wb") as f:
+            pickle.dump([], f, pickle.HIGHEST_PROTOCOL)
+
+    # Load the representations from the pickle file
+    with open(datastore_path, "rb") as f:
+        representations = pickle.load(f)
+
+    # check each item of representations list has required keys
+    for i, current_representation in enumerate(representations):
+        missing_keys = REPRESENTATION_COLUMNS - set(current_representation.keys())
+        if len(missing_keys) > 0:
+            raise ValueError(
+                f"{i}-th item does not have some required keys - {missing_keys}."
+                f"Consider to delete {datastore_path}"
+            )
+
+    return representations
@@ -0,0 +1,327 @@
+# built-in dependencies
+import os
+import pickle
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+# project dependencies
+from deepface.commons import image_utils
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+# bump when the layout of the persisted manifest changes
+MANIFEST_VERSION = 1
+
+# datastores are kept in db_path, their names start with this prefix
+DATASTORE_PREFIX = "ds_model_"
+
+# (size, modification time in nanoseconds, lower cased image format) of an image file
+FileRecord = Tuple[int, int, str]
+
+
+class ScanManifest:
+    """
+    Persistent record of the image files in a directory tree.
+
+    The manifest keeps the modification time, sub directories and image files of each
+    directory. Adding, removing or renaming a file changes the modification time of its
+    directory, so a refresh lists only the directories whose modification time changed
+    and re-uses the records of the others without touching their files. Overwriting a file
+    in place does not change the modification time of its directory, so the recorded files
+    of unchanged directories are stated for their size and modification time only if it is
+    asked for. Image format is checked with PIL only for new or modified files.
+
+    The tree can also be watched for changes, then a refresh returns at once until a
+    change is reported, and images reported as modified are stated for their size and
+    modification time.
+
+    Attributes:
+        root (str): root directory of the tree
+        path (str): exact path of the pkl file keeping the manifest
+    """
+
+    def __init__(self, root: str, path: str):
+        self.root = root
+        self.path = path
+        # directory -> (modification time, sub directories, image files)
+        self._directories: Dict[str, Tuple[int, List[str], Dict[str, FileRecord]]] = {}
+        self._watcher: Optional[TreeWatcher] = None
+        # paths reported by the watcher for the last refresh, until they are saved
+        self._watched_paths: Set[str] = set()
+        self.load()
+
+    def __len__(self) -> int:
+        return sum(len(files) for _, _, files in self._directories.values())
+
+    def images(self) -> Set[str]:
+        """
+        Exact paths of the jpg and png images in the tree
+        """
+        return {
+            file_path
+            for _, _, files in self._directories.values()
+            for file_path, (_, _, file_format) in files.items()
+            if file_format in image_utils.PIL_EXTS
+        }
+
+    def refresh(self, check_files: bool = False) -> Tuple[bool, Set[str]]:
+        """
+        Synchronize the manifest with the directory tree, it is not persisted until
+        `save` is called.
+        Args:
+            check_files (bool): stat recorded files of unchanged directories to find the ones
+                overwritten in place, it costs a stat per image (default is False).
+        Returns:
+            changed (bool): whether any directory of the tree has changed
+            modified_files (set): images added or modified since the last refresh
+        """
+        watched_paths: Optional[Set[str]] = None
+        if self._watcher is not None:
+            watched_paths = self._watcher.drain()
+            if watched_paths is None:
+                return False, set()
+            self._watched_paths |= watched_paths
+
+        directories = {}
+        modified_files: Set[str] = set()
+        changed = False
+
+        stack = [self.root]
+        while stack:
+            current = stack.pop()
+            # taken before listing so that changes while listing are caught next time
+            mtime = os.stat(current).st_mtime_ns
+            previous = self._directories.get(current)
+
+            files = None
+            if previous is not None and previous[0] == mtime:
+                files = _stat_files(previous[2], modified_files) if check_files else previous[2]
+
+            if files is not None:
+                changed = changed or files is not previous[2]
+                directories[current] = (mtime, previous[1], files)
+            else:
+                changed = True
+                previous_files = previous[2] if previous is not None else {}
+                subdirs, files = _scan_directory(current, previous_files, modified_files)
+                directories[current] = (mtime, subdirs, files)
+
+            stack.extend(directories[current][1])
+
+        if directories.keys() != self._directories.keys():
+            changed = True  # some directories are removed
+
+        # images reported as modified by the watcher may be overwritten in place
+        for file_path in watched_paths or set():
+            directory = directories.get(os.path.dirname(file_path))
+            if directory is None or file_path not in directory[2]:
+                continue
+            files = _stat_files({file_path: directory[2][file_path]}, modified_files)
+            if files is not None and file_path in modified_files:
+                changed = True
+                directory[2][file_path] = files[file_path]
+
+        self._directories = directories
+        return changed, modified_files
+
+    def watch(self) -> None:
+        """
+        Watch the tree for changes, it requires watchdog. Changes are reported by the local
+        kernel, so changes made by other hosts of a network filesystem are not seen.
+        """
+        if self._watcher is None:
+            self._watcher = TreeWatcher(self.root)
+
+    def unwatch(self) -> None:
+        """
+        Stop watching the tree, refreshes list changed directories again
+        """
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+    def load(self) -> None:
+        """
+        Load the persisted manifest, an empty one is used if it does not exist
+        """
+        self._directories = {}
+        if self._watcher is not None:
+            # changes reported for unsaved refreshes are reported again for the next one
+            self._watcher.report(self._watched_paths)
+        self._watched_paths = set()
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, "rb") as f:
+                content = pickle.load(f)
+        except (pickle.UnpicklingError, EOFError) as err:
+            logger.warn(f"Ignoring unreadable scan manifest {self.path}: {err}")
+            return
+
+        if content.get("version") == MANIFEST_VERSION and content.get("root") == self.root:
+            self._directories = content["directories"]
+
+    def save(self) -> None:
+        """
+        Persist the manifest
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        content = {
+            "version": MANIFEST_VERSION,
+            "root": self.root,
+            "directories": self._directories,
+        }
+        # write to a temporary file first so that readers never see a partial manifest
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(content, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+        self._watched_paths = set()
+
+
+class TreeWatcher:
+    """
+    Watcher of the changes in a directory tree with watchdog. Paths of datastores are
+    ignored because they are written while the tree is synchronized.
+    """
+
+    def __init__(self, root: str):
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ModuleNotFoundError as err:
+            raise ImportError(
+                "watchdog is an optional dependency to watch db_path for changes. "
+                "Please install it with: pip install watchdog"
+            ) from err
+
+        self._lock = threading.Lock()
+        # nothing is known about the tree before the first refresh
+        self._changed = True
+        self._paths: Set[str] = set()
+
+        watcher = self
+
+        class EventHandler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.event_type in ("opened", "closed_no_write"):
+                    return
+                # entries added to or removed from a directory are reported on their own
+                if event.is_directory and event.event_type == "modified":
+                    return
+                paths = {
+                    os.fsdecode(path)
+                    for path in [event.src_path, getattr(event, "dest_path", "")]
+                    if path and not _in_datastore(os.fsdecode(path))
+                }
+                if len(paths) > 0:
+                    watcher.report(paths)
+
+        self._observer = Observer()
+        self._observer.schedule(EventHandler(), root, recursive=True)
+        self._observer.daemon = True
+        self._observer.start()
+
+    def report(self, paths: Set[str]) -> None:
+        """
+        Mark the tree as changed along with the given paths
+        """
+        with self._lock:
+            self._changed = True
+            self._paths |= paths
+
+    def drain(self) -> Optional[Set[str]]:
+        """
+        Get the paths changed since the last drain
+        Returns:
+            paths (set): changed paths, None if nothing has changed
+        """
+        with self._lock:
+            if not self._changed:
+                return None
+            paths = self._paths
+            self._changed = False
+            self._paths = set()
+            return paths
+
+    def stop(self) -> None:
+        """
+        Stop the observer thread
+        """
+        self._observer.stop()
+        self._observer.join()
+
+
+def _in_datastore(path: str) -> bool:
+    return any(part.startswith(DATASTORE_PREFIX) for part in path.split(os.sep))
+
+
+def _stat_files(
+    previous_files: Dict[str, FileRecord], modified_files: Set[str]
+) -> Optional[Dict[str, FileRecord]]:
+    """
+    Check recorded image files of a directory for in place modifications
+    Args:
+        previous_files (dict): records of its image files in the last refresh
+        modified_files (set): modified image files are added into this
+    Returns:
+        files (dict): previous_files itself if none of them is modified, record of each
+            image file otherwise. None if a file is removed, so the directory must be listed.
+    """
+    files = previous_files
+    for file_path, record in previous_files.items():
+        try:
+            stats = os.stat(file_path)
+        except FileNotFoundError:
+            return None
+
+        if record[:2] != (stats.st_size, stats.st_mtime_ns):
+            if files is previous_files:
+                files = dict(previous_files)
+            files[file_path] = (
+                stats.st_size,
+                stats.st_mtime_ns,
+                image_utils.find_image_format(file_path),
+            )
+            modified_files.add(file_path)
+    return files
+
+
+def _scan_directory(
+    path: str, previous_files: Dict[str, FileRecord], modified_files: Set[str]
+) -> Tuple[List[str], Dict[str, FileRecord]]:
+    """
+    List sub directories and image files of a directory
+    Args:
+        path (str): directory to list
+        previous_files (dict): records of its image files in the last refresh
+        modified_files (set): new or modified image files are added into this
+    Returns:
+        subdirs (list): sub directories to scan
+        files (dict): record of each image file
+    """
+    subdirs = []
+    files = {}
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                if not entry.is_symlink() and not entry.name.startswith(DATASTORE_PREFIX):
+                    subdirs.append(entry.path)
+                continue
+
+            if os.path.splitext(entry.name)[1].lower() not in image_utils.IMAGE_EXTS:
+                continue
+
+            stats = entry.stat()
+            record = previous_files.get(entry.path)
+            if record is None or record[:2] != (stats.st_size, stats.st_mtime_ns):
+                record = (
+                    stats.st_size,
+                    stats.st_mtime_ns,
+                    image_utils.find_image_format(entry.path),
+                )
+                modified_files.add(entry.path)
+            files[entry.path] = record
+    return subdirs, files
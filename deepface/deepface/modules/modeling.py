@@ -1,5 +1,12 @@
 # built-in dependencies
-from typing import Any
+import os
+import gc
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# 3rd party dependencies
+import numpy as np
 
 # project dependencies
 from deepface.models.facial_recognition import (
@@ -12,7 +19,8 @@ from deepface.models.facial_recognition import (
     Dlib,
     Facenet,
     GhostFaceNet,
-    Buffalo_L
+    Buffalo_L,
+    ONNX,
 )
 from deepface.models.face_detection import (
     FastMtCnn,
@@ -28,11 +36,42 @@ from deepface.models.face_detection import (
 )
 from deepface.models.demography import Age, Gender, Race, Emotion
 from deepface.models.spoofing import FasNet
+from deepface.modules import batching, compilation
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+# runtimes facial recognition models can be run with
+BACKENDS = {"tensorflow", "onnx"}
 
+# built models by task and cache key, least recently used ones come first
+cached_models: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+# parameter bytes of built models
+model_sizes: Dict[Tuple[str, str], int] = {}
+# preloaded models are not evicted until they are unloaded
+pinned_models: Set[Tuple[str, str]] = set()
+# each model is built by a single thread while others wait for it
+build_locks: Dict[Tuple[str, str], threading.Lock] = {}
+registry_lock = threading.Lock()
+
+# parameter bytes of built models at most, None keeps every model built
+memory_budget: Optional[int] = (
+    int(os.environ["DEEPFACE_MODEL_MEMORY_BUDGET"])
+    if os.getenv("DEEPFACE_MODEL_MEMORY_BUDGET")
+    else None
+)
 
-def build_model(task: str, model_name: str) -> Any:
+
+def build_model(
+    task: str,
+    model_name: str,
+    backend: Optional[str] = None,
+    quantization: Optional[str] = None,
+) -> Any:
     """
-    This function loads a pre-trained models as singletonish way
+    This function loads a pre-trained models as singletonish way. A model is built once
+    even if concurrent callers request it, and least recently used models are evicted once
+    built models exceed the memory budget, see set_memory_budget.
     Parameters:
         task (str): facial_recognition, facial_attribute, face_detector, spoofing
         model_name (str): model identifier
@@ -42,13 +81,19 @@ def build_model(task: str, model_name: str) -> Any:
             - opencv, mtcnn, ssd, dlib, retinaface, mediapipe, yolov8, 'yolov11n',
                 'yolov11s', 'yolov11m', yunet, fastmtcnn or centerface for face detectors
             - Fasnet for spoofing
+        backend (str): runtime of facial recognition models, tensorflow or onnx. Keras
+            models are exported to onnx once and run with onnx runtime then, other models
+            keep their own runtime. Default is DEEPFACE_BACKEND environment variable or
+            tensorflow if it is not set.
+        quantization (str): dynamic or static to run an int8 variant of a keras facial
+            recognition model with onnx runtime, None for the float model. Static variants
+            must be calibrated with DeepFace.quantize_model first. It cannot be requested
+            with the tensorflow backend. If neither backend nor quantization is given, default
+            is DEEPFACE_QUANTIZATION environment variable for keras facial recognition models.
     Returns:
             built model class
     """
 
-    # singleton design pattern
-    global cached_models
-
     models = {
         "facial_recognition": {
             "VGG-Face": VGGFace.VggFaceClient,
@@ -92,14 +137,290 @@ def build_model(task: str, model_name: str) -> Any:
     if models.get(task) is None:
         raise ValueError(f"unimplemented task - {task}")
 
-    if not "cached_models" in globals():
-        cached_models = {current_task: {} for current_task in models.keys()}
+    model = models[task].get(model_name)
+    if not model:
+        raise ValueError(f"Invalid model_name passed - {task}/{model_name}")
+
+    key = (task, __find_cache_key(task, model_name, backend, quantization))
+
+    client = __find_cached_model(key)
+    if client is not None:
+        return client
 
-    if cached_models[task].get(model_name) is None:
-        model = models[task].get(model_name)
-        if model:
-            cached_models[task][model_name] = model()
+    with registry_lock:
+        build_lock = build_locks.setdefault(key, threading.Lock())
+
+    with build_lock:
+        # another thread may have built the model while this one was waiting
+        client = __find_cached_model(key)
+        if client is not None:
+            return client
+
+        if key[1] != model_name:
+            client = ONNX.ONNXRecognitionClient(
+                model_name=model_name, build_client=model, quantization=quantization
+            )
         else:
-            raise ValueError(f"Invalid model_name passed - {task}/{model_name}")
+            client = model()
+        size = find_model_size(client)
+        # models are traced and warmed up before other callers can use them
+        compilation.find_compiled_model(client)
+
+        with registry_lock:
+            cached_models[key] = client
+            model_sizes[key] = size
+            evicted = __evict(keep=key)
+
+    __release(evicted)
+    return client
+
+
+def preload(
+    task: str,
+    model_names: List[str],
+    backend: Optional[str] = None,
+    quantization: Optional[str] = None,
+) -> List[Any]:
+    """
+    Build models ahead of the first request and keep them built until they are unloaded,
+    regardless of the memory budget
+    Args:
+        task (str): facial_recognition, facial_attribute, face_detector, spoofing
+        model_names (list): model identifiers, see build_model
+        backend (str): runtime of facial recognition models, see build_model
+        quantization (str): int8 variant of keras facial recognition models, see build_model
+    Returns:
+        clients (list): built models in the order of model_names
+    """
+    clients = []
+    for model_name in model_names:
+        key = (task, __find_cache_key(task, model_name, backend, quantization))
+        # pin before building so that concurrent builds cannot evict it meanwhile
+        with registry_lock:
+            pinned = key in pinned_models
+            pinned_models.add(key)
+        try:
+            clients.append(
+                build_model(
+                    task=task, model_name=model_name, backend=backend, quantization=quantization
+                )
+            )
+        except Exception:
+            if not pinned:
+                with registry_lock:
+                    pinned_models.discard(key)
+            raise
+
+    with registry_lock:
+        if memory_budget is not None and sum(model_sizes.values()) > memory_budget:
+            logger.warn(
+                f"built models take {sum(model_sizes.values())} bytes, "
+                f"exceeding the memory budget of {memory_budget} bytes"
+            )
+    return clients
+
+
+def unload(
+    task: str,
+    model_name: str,
+    backend: Optional[str] = None,
+    quantization: Optional[str] = None,
+) -> bool:
+    """
+    Drop a built model from the registry, and stop its micro batching scheduler. Memory of
+    the model is released once callers drop their references to it as well.
+    Args:
+        task (str): facial_recognition, facial_attribute, face_detector, spoofing
+        model_name (str): model identifier, see build_model
+        backend (str): runtime of facial recognition models, see build_model
+        quantization (str): int8 variant of keras facial recognition models, see build_model
+    Returns:
+        unloaded (bool): True if the model was built before, False otherwise
+    """
+    key = (task, __find_cache_key(task, model_name, backend, quantization))
+
+    with registry_lock:
+        pinned_models.discard(key)
+        client = cached_models.pop(key, None)
+        model_sizes.pop(key, None)
+
+    if client is None:
+        return False
+    __release([(key, client)])
+    return True
+
+
+def find_model_variant(
+    task: str,
+    model_name: str,
+    backend: Optional[str] = None,
+    quantization: Optional[str] = None,
+) -> str:
+    """
+    Find which variant of a model build_model serves for given arguments, e.g. results of
+    keras, onnx runtime and int8 variants of the same facial recognition model differ
+    Args:
+        task (str): facial_recognition, facial_attribute, face_detector, spoofing
+        model_name (str): model identifier, see build_model
+        backend (str): runtime of facial recognition models, see build_model
+        quantization (str): int8 variant of keras facial recognition models, see build_model
+    Returns:
+        variant (str): model name, followed by its runtime and quantization if it is run
+            with onnx runtime
+    """
+    return __find_cache_key(task, model_name, backend, quantization)
+
+
+def set_memory_budget(max_bytes: Optional[int]) -> None:
+    """
+    Limit parameter bytes of built models. Least recently used models are evicted once it is
+    exceeded, except preloaded ones.
+    Args:
+        max_bytes (int): memory budget in bytes, None keeps every model built
+    """
+    global memory_budget  # pylint: disable=global-statement
+    if max_bytes is not None and max_bytes < 0:
+        raise ValueError(f"max_bytes must be non-negative but it is {max_bytes}")
+
+    with registry_lock:
+        memory_budget = max_bytes
+        evicted = __evict()
+    __release(evicted)
+
+
+def compile_models() -> None:
+    """
+    Trace and warm up compiled inference of the models built so far
+    """
+    with registry_lock:
+        clients = list(cached_models.values())
+    for client in clients:
+        compilation.find_compiled_model(client)
+
+
+def get_loaded_models() -> Dict[str, Dict[str, Any]]:
+    """
+    Models built so far
+    Returns:
+        models (dict): models by task and cache key, e.g. facial_recognition/Facenet or
+            facial_recognition/Facenet/onnx, from the least to the most recently used one.
+            Each one has bytes as its parameter bytes and pinned as whether it is preloaded.
+    """
+    with registry_lock:
+        return {
+            f"{task}/{cache_key}": {
+                "bytes": model_sizes[(task, cache_key)],
+                "pinned": (task, cache_key) in pinned_models,
+            }
+            for task, cache_key in cached_models.keys()
+        }
+
+
+def find_model_size(client: Any) -> int:
+    """
+    Find parameter bytes of a built model. Graphs run with onnx runtime are measured by
+    their file size, keras models by their weights. Models of other frameworks are not
+    measured and count as 0 bytes.
+    Args:
+        client (Any): built model
+    Returns:
+        size (int): parameter bytes
+    """
+    model_path = getattr(client, "model_path", None)
+    if isinstance(model_path, str) and os.path.isfile(model_path):
+        return os.path.getsize(model_path)
+
+    weights = getattr(getattr(client, "model", None), "weights", None)
+    if weights is None:
+        return 0
 
-    return cached_models[task][model_name]
+    size = 0
+    for weight in weights:
+        # tf 1 variables have reference dtypes, keras 3 variables have string dtypes
+        dtype = getattr(weight.dtype, "base_dtype", weight.dtype)
+        dtype = np.dtype(getattr(dtype, "name", dtype))
+        size += int(np.prod(weight.shape)) * dtype.itemsize
+    return size
+
+
+def __find_cache_key(
+    task: str, model_name: str, backend: Optional[str], quantization: Optional[str]
+) -> str:
+    """
+    Find the registry key of a model, keras and onnx runtime variants of the same facial
+    recognition model are built separately
+    """
+    if quantization is not None and backend == "tensorflow":
+        raise ValueError(
+            "quantized models run with onnx runtime, "
+            "quantization cannot be requested with the tensorflow backend"
+        )
+    if backend is None and quantization is None:
+        quantization = os.getenv("DEEPFACE_QUANTIZATION") or None
+        if quantization is not None and (
+            task != "facial_recognition" or model_name not in ONNX.EXPORTABLE_MODELS
+        ):
+            # the variable applies to every model, others keep running as they are
+            quantization = None
+    if backend is None:
+        backend = os.getenv("DEEPFACE_BACKEND", "tensorflow")
+    if backend not in BACKENDS:
+        raise ValueError(f"unimplemented backend - {backend}")
+
+    if quantization is not None:
+        if task != "facial_recognition" or model_name not in ONNX.EXPORTABLE_MODELS:
+            raise ValueError(f"{task}/{model_name} cannot be quantized")
+        if quantization not in ONNX.QUANTIZATIONS:
+            raise ValueError(f"unimplemented quantization - {quantization}")
+        return f"{model_name}/onnx-{quantization}"
+    if backend == "onnx" and task == "facial_recognition" and model_name in ONNX.EXPORTABLE_MODELS:
+        return f"{model_name}/onnx"
+    return model_name
+
+
+def __find_cached_model(key: Tuple[str, str]) -> Optional[Any]:
+    with registry_lock:
+        client = cached_models.get(key)
+        if client is not None:
+            cached_models.move_to_end(key)
+        return client
+
+
+def __evict(keep: Optional[Tuple[str, str]] = None) -> List[Tuple[Tuple[str, str], Any]]:
+    """
+    Drop least recently used models until the memory budget is met. Must be called while
+    holding registry_lock.
+    Args:
+        keep (tuple): task and cache key of the model which must not be evicted
+    Returns:
+        evicted (list): task and cache keys and clients of evicted models
+    """
+    evicted: List[Tuple[Tuple[str, str], Any]] = []
+    if memory_budget is None:
+        return evicted
+
+    total = sum(model_sizes.values())
+    for key in list(cached_models.keys()):
+        if total <= memory_budget:
+            break
+        if key == keep or key in pinned_models:
+            continue
+        evicted.append((key, cached_models.pop(key)))
+        total -= model_sizes.pop(key)
+    return evicted
+
+
+def __release(evicted: List[Tuple[Tuple[str, str], Any]]) -> None:
+    """
+    Stop micro batching schedulers of dropped models, which keep references to them
+    """
+    if len(evicted) == 0:
+        return
+    for (task, cache_key), client in evicted:
+        if task == "facial_recognition":
+            # pylint: disable=protected-access
+            batching.release_batcher(client._batching_name(), owner=client)
+        else:
+            batching.release_batcher(f"{task}/{cache_key}", owner=client)
+        logger.debug(f"{task}/{cache_key} is unloaded")
+    gc.collect()
@@ -0,0 +1,293 @@
+# built-in dependencies
+import os
+from typing import List, Optional, Tuple
+
+# 3rd party dependencies
+import numpy as np
+
+# project dependencies
+from deepface.modules import search
+from deepface.modules.ann import RETRAIN_GROWTH, closest, identities_checksum, kmeans
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+QUANTIZATION_KINDS = {"float16", "int8", "pq"}
+
+# number of dimensions of each product quantization sub vector
+PQ_SUBVECTOR_SIZE = 8
+
+# number of centroids of each product quantization sub space, codes fit in a byte
+PQ_CENTROIDS = 256
+
+# maximum number of vectors sampled while training int8 ranges or pq codebooks
+TRAINING_SAMPLES = 65536
+
+# number of rows encoded at once
+ENCODING_CHUNK = 65536
+
+
+# pylint: disable=too-many-instance-attributes
+class QuantizedIndex:
+    """
+    Compressed in-memory copy of the gallery embeddings.
+
+    Vectors are stored as float16, as uint8 codes with per-dimension offset and scale
+    (int8), or as product quantization codes of one byte per sub vector (pq). Distances
+    of a query to the codes are found with a dot product against the decoded codes, and
+    pq uses asymmetric distance tables of the query against each codebook instead of
+    decoding. Compressed distances are approximate, the closest candidates can be
+    re-ranked with the original vectors. New gallery rows are encoded incrementally and
+    int8 ranges and pq codebooks are re-trained once the gallery grows enough.
+
+    Attributes:
+        path (str): exact path of the npz file keeping the codes
+        kind (str): float16, int8 or pq
+        normalized (bool): vectors are l2 normalized before encoding
+    """
+
+    def __init__(self, path: str, kind: str, normalized: bool):
+        if kind not in QUANTIZATION_KINDS:
+            raise ValueError(f"unimplemented quantization - {kind}")
+
+        self.path = path
+        self.kind = kind
+        self.normalized = normalized
+        self.dims = 0
+        self.codes = np.zeros((0, 0), dtype=np.uint8)
+        # squared norms of the decoded vectors
+        self.norms = np.zeros(0, dtype=np.float32)
+        self.offset = np.zeros(0, dtype=np.float32)
+        self.scale = np.zeros(0, dtype=np.float32)
+        self.codebooks = np.zeros((0, PQ_CENTROIDS, PQ_SUBVECTOR_SIZE), dtype=np.float32)
+        self.trained_size = 0
+        self.checksum = ""
+
+        if os.path.exists(path):
+            with np.load(path, allow_pickle=False) as data:
+                self.dims = int(data["dims"])
+                self.codes = data["codes"]
+                self.norms = data["norms"]
+                self.offset = data["offset"]
+                self.scale = data["scale"]
+                self.codebooks = data["codebooks"]
+                self.trained_size = int(data["trained_size"])
+                self.checksum = str(data["checksum"])
+
+    def sync(
+        self, embeddings: np.ndarray, valid_mask: np.ndarray, identities: np.ndarray
+    ) -> None:
+        """
+        Bring the codes up to date with the gallery
+        Args:
+            embeddings (np.ndarray): (N, D) gallery matrix
+            valid_mask (np.ndarray): (N,) mask of the rows having an embedding
+            identities (np.ndarray): (N,) identity of each row, used to detect re-layouts
+        """
+        num_valid = int(valid_mask.sum())
+        encoded = self.codes.shape[0]
+
+        if (
+            self.dims != embeddings.shape[1]
+            or self.trained_size == 0
+            or (self.kind != "float16" and num_valid > RETRAIN_GROWTH * self.trained_size)
+        ):
+            self._train(embeddings, valid_mask)
+            self.codes, self.norms = self._encode(embeddings, valid_mask, 0)
+        elif encoded > embeddings.shape[0] or self.checksum != identities_checksum(
+            identities[:encoded]
+        ):
+            # existing rows moved, keep the quantizer but encode all rows again
+            self.codes, self.norms = self._encode(embeddings, valid_mask, 0)
+        elif encoded < embeddings.shape[0]:
+            codes, norms = self._encode(embeddings, valid_mask, encoded)
+            self.codes = np.concatenate([self.codes, codes])
+            self.norms = np.concatenate([self.norms, norms])
+        else:
+            return
+
+        self.checksum = identities_checksum(identities)
+        self._save()
+
+    def search(
+        self,
+        queries: np.ndarray,
+        thresholds: np.ndarray,
+        valid_mask: np.ndarray,
+        distance_metric: str,
+        top_k: Optional[int],
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Find matches of queries with approximate distances to the codes
+        Args:
+            queries (np.ndarray): (M, D) query matrix
+            thresholds (np.ndarray): (M,) threshold of each query
+            valid_mask (np.ndarray): (N,) mask of the rows having an embedding
+            distance_metric (str): distance metric name
+            top_k (int): maximum number of matches kept per query
+        Returns:
+            matches (list): M tuples of matched row indices and their approximate
+                distances, sorted by distance
+        """
+        prepared = self._prepare(queries)
+        tables = None
+        if self.kind == "pq":
+            # asymmetric distance tables, dot product of each query sub vector
+            # with each centroid of its sub space as (M, num_subspaces, PQ_CENTROIDS)
+            subvectors = prepared.reshape(prepared.shape[0], -1, PQ_SUBVECTOR_SIZE)
+            tables = np.einsum("qms,mks->qmk", subvectors, self.codebooks)
+
+        def find_chunk_distances(start: int, end: int) -> np.ndarray:
+            dots = self._find_dots(prepared, tables, start, end)
+            return _to_distances(dots, prepared, self.norms[start:end], distance_metric)
+
+        return search.search_chunks(
+            num_rows=self.codes.shape[0],
+            find_chunk_distances=find_chunk_distances,
+            valid_mask=valid_mask[: self.codes.shape[0]],
+            target_thresholds=thresholds,
+            top_k=top_k,
+        )
+
+    def _find_dots(
+        self, prepared: np.ndarray, tables: Optional[np.ndarray], start: int, end: int
+    ) -> np.ndarray:
+        """
+        Dot products of prepared queries with the decoded codes of rows in [start, end)
+        """
+        codes = self.codes[start:end]
+        if self.kind == "float16":
+            return prepared @ codes.astype(np.float32).T
+        if self.kind == "int8":
+            return (prepared * self.scale) @ codes.astype(np.float32).T + (
+                prepared @ self.offset
+            )[:, None]
+        # look up every query at once, sub space by sub space, so that memory is bound to
+        # (M, end - start) instead of gathering (M, end - start, num_subspaces) entries
+        dots = np.zeros((tables.shape[0], codes.shape[0]), dtype=tables.dtype)
+        for m in range(codes.shape[1]):
+            dots += tables[:, m, codes[:, m]]
+        return dots
+
+    def _train(self, embeddings: np.ndarray, valid_mask: np.ndarray) -> None:
+        valid_rows = np.flatnonzero(valid_mask)
+        self.dims = embeddings.shape[1]
+        self.trained_size = valid_rows.shape[0]
+        if self.kind == "float16" or valid_rows.shape[0] == 0:
+            return
+
+        rng = np.random.default_rng(seed=len(valid_rows))
+        sample_size = min(valid_rows.shape[0], TRAINING_SAMPLES)
+        sample_rows = np.sort(rng.choice(valid_rows, size=sample_size, replace=False))
+        sample = self._prepare(np.asarray(embeddings[sample_rows]))
+
+        if self.kind == "int8":
+            self.offset = sample.min(axis=0)
+            scale = (sample.max(axis=0) - self.offset) / 255
+            self.scale = np.where(scale > 0, scale, 1).astype(np.float32)
+        else:
+            subvectors = sample.reshape(sample_size, -1, PQ_SUBVECTOR_SIZE)
+            num_centroids = min(PQ_CENTROIDS, sample_size)
+            self.codebooks = np.stack(
+                [
+                    kmeans(subvectors[:, m], num_centroids, rng)
+                    for m in range(subvectors.shape[1])
+                ]
+            )
+        logger.debug(f"{self.kind} quantizer trained on {sample_size} vectors")
+
+    def _encode(
+        self, embeddings: np.ndarray, valid_mask: np.ndarray, start: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Encode rows starting from given index, rows without an embedding are zero filled
+        Returns:
+            codes (np.ndarray): codes of the rows
+            norms (np.ndarray): squared norms of the decoded rows
+        """
+        num_rows = embeddings.shape[0] - start
+        if self.kind == "float16":
+            codes = np.zeros((num_rows, self.dims), dtype=np.float16)
+        elif self.kind == "int8":
+            codes = np.zeros((num_rows, self.dims), dtype=np.uint8)
+        else:
+            codes = np.zeros((num_rows, self.codebooks.shape[0]), dtype=np.uint8)
+        norms = np.zeros(num_rows, dtype=np.float32)
+
+        for offset in range(start, embeddings.shape[0], ENCODING_CHUNK):
+            end = min(offset + ENCODING_CHUNK, embeddings.shape[0])
+            rows = np.flatnonzero(valid_mask[offset:end]) + offset
+            if rows.shape[0] == 0:
+                continue
+            chunk = self._prepare(np.asarray(embeddings[rows]))
+
+            if self.kind == "float16":
+                chunk_codes = chunk.astype(np.float16)
+                decoded = chunk_codes.astype(np.float32)
+            elif self.kind == "int8":
+                chunk_codes = np.clip(np.round((chunk - self.offset) / self.scale), 0, 255)
+                chunk_codes = chunk_codes.astype(np.uint8)
+                decoded = self.offset + self.scale * chunk_codes
+            else:
+                subvectors = chunk.reshape(chunk.shape[0], -1, PQ_SUBVECTOR_SIZE)
+                chunk_codes = np.stack(
+                    [
+                        closest(subvectors[:, m], self.codebooks[m])
+                        for m in range(subvectors.shape[1])
+                    ],
+                    axis=1,
+                ).astype(np.uint8)
+                decoded = self.codebooks[np.arange(chunk_codes.shape[1]), chunk_codes]
+
+            codes[rows - start] = chunk_codes
+            norms[rows - start] = np.sum(decoded.reshape(rows.shape[0], -1) ** 2, axis=1)
+        return codes, norms
+
+    def _prepare(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.normalized:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / (norms + 1e-10)
+        if self.kind == "pq" and vectors.shape[1] % PQ_SUBVECTOR_SIZE != 0:
+            # zero padding does not change dot products and norms
+            padding = PQ_SUBVECTOR_SIZE - vectors.shape[1] % PQ_SUBVECTOR_SIZE
+            vectors = np.pad(vectors, ((0, 0), (0, padding)))
+        return vectors
+
+    def _save(self) -> None:
+        # write to a temporary file first so that readers never see partial codes
+        tmp_path = self.path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            dims=self.dims,
+            codes=self.codes,
+            norms=self.norms,
+            offset=self.offset,
+            scale=self.scale,
+            codebooks=self.codebooks,
+            trained_size=self.trained_size,
+            checksum=self.checksum,
+        )
+        os.replace(tmp_path, self.path)
+
+
+def _to_distances(
+    dots: np.ndarray, queries: np.ndarray, norms: np.ndarray, distance_metric: str
+) -> np.ndarray:
+    """
+    Convert (M, N) dot products of queries and decoded vectors to distances
+    """
+    query_norms = np.sum(queries**2, axis=1)[:, None]
+    if distance_metric == "euclidean":
+        distances = np.sqrt(np.maximum(query_norms - 2 * dots + norms[None, :], 0))
+    else:
+        similarity = dots / (np.sqrt(query_norms) * np.sqrt(norms)[None, :] + 1e-10)
+        if distance_metric == "cosine":
+            distances = 1 - similarity
+        elif distance_metric == "angular":
+            distances = np.arccos(np.clip(similarity, -1, 1)) / np.pi
+        elif distance_metric == "euclidean_l2":
+            distances = np.sqrt(np.maximum(2 - 2 * similarity, 0))
+        else:
+            raise ValueError("Invalid distance_metric passed - ", distance_metric)
+    return np.round(distances, 6)
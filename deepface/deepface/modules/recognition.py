@@ -1,24 +1,40 @@
 # built-in dependencies
 import os
-import pickle
-from typing import List, Union, Optional, Dict, Any, Set
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, List, Union, Optional, Dict, Any, Tuple
 import time
 
 # 3rd party dependencies
 import numpy as np
 import pandas as pd
-from tqdm import tqdm
 
 # project dependencies
 from deepface.commons import image_utils
-from deepface.modules import representation, detection, verification
+from deepface.modules import representation, detection, verification, gallery, search
+from deepface.modules.datastore import EmbeddingStore
 from deepface.commons.logger import Logger
 
 logger = Logger()
 
+# columns of the dataframes returned by find
+DATAFRAME_COLUMNS = [
+    "identity",
+    "hash",
+    "target_x",
+    "target_y",
+    "target_w",
+    "target_h",
+    "source_x",
+    "source_y",
+    "source_w",
+    "source_h",
+    "threshold",
+    "distance",
+]
+
 
 def find(
-    img_path: Union[str, np.ndarray],
+    img_path: Union[str, np.ndarray, IO[bytes], List[Union[str, np.ndarray, IO[bytes]]]],
     db_path: str,
     model_name: str = "VGG-Face",
     distance_metric: str = "cosine",
@@ -32,14 +48,36 @@ def find(
     refresh_database: bool = True,
     anti_spoofing: bool = False,
     batched: bool = False,
-) -> Union[List[pd.DataFrame], List[List[Dict[str, Any]]]]:
+    datastore_format: str = "pickle",
+    index: Optional[str] = None,
+    nprobe: int = 8,
+    enrollment_workers: int = 1,
+    enrollment_batch_size: int = 32,
+    enrollment_processes: bool = False,
+    top_k: Optional[int] = None,
+    max_results: Optional[int] = None,
+    shards: int = 1,
+    shard_by: str = "identity",
+    compression: Optional[str] = None,
+    rerank: Optional[int] = None,
+    detection_workers: int = 4,
+    check_modified_images: bool = False,
+    watch_database: bool = False,
+) -> Union[
+    List[pd.DataFrame],
+    List[List[Dict[str, Any]]],
+    List[List[pd.DataFrame]],
+    List[List[List[Dict[str, Any]]]],
+]:
     """
     Identify individuals in a database
 
     Args:
-        img_path (str or np.ndarray): The exact path to the image, a numpy array in BGR format,
-            or a base64 encoded image. If the source image contains multiple faces, the result will
-            include information for each detected face.
+        img_path (str or np.ndarray or list): The exact path to the image, a numpy array in BGR
+            format, or a base64 encoded image. If the source image contains multiple faces, the
+            result will include information for each detected face. A list of images or a 4D
+            numpy array of images can be passed to search many images in one call, then faces
+            of all images are embedded and compared with the database at once.
 
         db_path (string): Path to the folder containing image files. All detected faces
             in the database will be considered in the decision-making process.
@@ -73,10 +111,75 @@ def find(
 
         refresh_database (boolean): Synchronizes the images representation (pkl) file with the
             directory/db files, if set to false, it will ignore any file changes inside the db_path
-            directory (default is True).
+            directory (default is True). Representations are kept in memory between calls, and
+            the directory is re-scanned only if one of its folders is modified.
 
         anti_spoofing (boolean): Flag to enable anti spoofing (default is False).
 
+        batched (boolean): Return a list of dicts per detected face instead of dataframes.
+            It is optimized for large batch processing (default is False).
+
+        datastore_format (string): How representations of db_path are stored. Options: 'pickle'
+            keeps a list of dicts in a single pkl file, 'npy' keeps a contiguous float32
+            embedding matrix opened with memory mapping next to a compact metadata table.
+            Prefer 'npy' for large galleries, it is opened without loading it into memory
+            (default is pickle).
+
+        index (string): Approximate nearest neighbour index to search the database with.
+            Options: None for exhaustive search or 'ivf' for an inverted file index with k-means
+            coarse quantization. Candidates found by the index are re-ranked with exact
+            distances. The index is stored next to the datastore and updated incrementally
+            (default is None).
+
+        nprobe (int): Number of inverted lists probed per face if index is 'ivf'. Higher values
+            increase recall at the cost of speed (default is 8).
+
+        enrollment_workers (int): Number of workers decoding images newly added to db_path and
+            detecting their faces concurrently (default is 1).
+
+        enrollment_batch_size (int): Number of faces of newly added images fed to the facial
+            recognition model at once (default is 32).
+
+        enrollment_processes (boolean): Detect faces of newly added images in a process pool
+            instead of a thread pool. Each process loads its own detector (default is False).
+
+        top_k (int): Maximum number of closest matches returned per detected face. Candidates
+            are picked with partial selection instead of sorting the whole database.
+            None returns all matches under the threshold (default is None).
+
+        max_results (int): Maximum number of closest matches returned in total across all
+            detected faces. None returns all matches (default is None).
+
+        shards (int): Number of shards the database is split into for exhaustive search.
+            Each shard is searched in its own worker process on a shared memory copy of
+            the embeddings, and the closest matches of the shards are merged (default is 1).
+
+        shard_by (string): How the database is split into shards. Options: 'identity' hashes
+            the image path, 'directory' keeps all images of a top level directory of db_path,
+            e.g. a person, in the same shard (default is identity).
+
+        compression (string): Search a compressed copy of the database embeddings kept in
+            memory. Options: None for the original vectors, 'float16', 'int8' for uint8 codes
+            with per-dimension scale or 'pq' for product quantization. Distances are
+            approximate unless rerank is set. The codes are stored next to the datastore
+            and updated incrementally (default is None).
+
+        rerank (int): Number of closest candidates per detected face found with compressed
+            distances that are re-ranked with exact distances of the original vectors.
+            None returns compressed distances as they are (default is None).
+
+        detection_workers (int): Number of threads detecting faces of the images concurrently
+            if a list of images or a 4D numpy array is passed (default is 4).
+
+        check_modified_images (boolean): Stat every image of the folders that are not
+            modified to find images overwritten in place, which does not change the
+            modification time of their folder. It costs a stat per image of the database
+            on each call, otherwise only the folders are stated (default is False).
+
+        watch_database (boolean): Watch db_path for changes with watchdog, an optional
+            dependency, so that calls skip scanning db_path until a change is reported.
+            Changes made by other hosts of a network filesystem are not reported
+            (default is False).
 
     Returns:
         results (List[pd.DataFrame] or List[List[Dict[str, Any]]]):
@@ -85,6 +188,9 @@ def find(
             Each dataframe or dict corresponds to the identity information for
             an individual detected in the source image.
 
+            If a list of images or a 4D numpy array is passed, one such list is returned
+            for each image in the same order.
+
             Note: If you have a large database and/or a source photo with many faces,
             use `batched=True`, as it is optimized for large batch processing.
             Please pay attention that when using `batched=True`, the function returns
@@ -112,134 +218,40 @@ def find(
     if not os.path.isdir(db_path):
         raise ValueError(f"Passed path {db_path} does not exist!")
 
-    img, _ = image_utils.load_image(img_path)
-    if img is None:
-        raise ValueError(f"Passed image path {img_path} does not exist!")
-
-    file_parts = [
-        "ds",
-        "model",
-        model_name,
-        "detector",
-        detector_backend,
-        "aligned" if align else "unaligned",
-        "normalization",
-        normalization,
-        "expand",
-        str(expand_percentage),
-    ]
-
-    file_name = "_".join(file_parts) + ".pkl"
-    file_name = file_name.replace("-", "").lower()
-
-    datastore_path = os.path.join(db_path, file_name)
-    representations = []
-
-    # required columns for representations
-    df_cols = {
-        "identity",
-        "hash",
-        "embedding",
-        "target_x",
-        "target_y",
-        "target_w",
-        "target_h",
-    }
-
-    # Ensure the proper pickle file exists
-    if not os.path.exists(datastore_path):
-        with open(datastore_path, "wb") as f:
-            pickle.dump([], f, pickle.HIGHEST_PROTOCOL)
-
-    # Load the representations from the pickle file
-    with open(datastore_path, "rb") as f:
-        representations = pickle.load(f)
-
-    # check each item of representations list has required keys
-    for i, current_representation in enumerate(representations):
-        missing_keys = df_cols - set(current_representation.keys())
-        if len(missing_keys) > 0:
-            raise ValueError(
-                f"{i}-th item does not have some required keys - {missing_keys}."
-                f"Consider to delete {datastore_path}"
-            )
-
-    # Get the list of images on storage
-    storage_images = set(image_utils.yield_images(path=db_path))
-
-    if len(storage_images) == 0 and refresh_database is True:
-        raise ValueError(f"No item found in {db_path}")
-    if len(representations) == 0 and refresh_database is False:
-        raise ValueError(f"Nothing is found in {datastore_path}")
-
-    must_save_pickle = False
-    new_images, old_images, replaced_images = set(), set(), set()
-
-    if not refresh_database:
-        logger.info(
-            f"Could be some changes in {db_path} not tracked."
-            "Set refresh_database to true to assure that any changes will be tracked."
-        )
-
-    # Enforce data consistency amongst on disk images and pickle file
-    if refresh_database:
-        # embedded images
-        pickled_images = {
-            representation["identity"] for representation in representations
-        }
-
-        new_images = storage_images - pickled_images  # images added to storage
-        old_images = pickled_images - storage_images  # images removed from storage
-
-        # detect replaced images
-        for current_representation in representations:
-            identity = current_representation["identity"]
-            if identity in old_images:
-                continue
-            alpha_hash = current_representation["hash"]
-            beta_hash = image_utils.find_image_hash(identity)
-            if alpha_hash != beta_hash:
-                logger.debug(f"Even though {identity} represented before, it's replaced later.")
-                replaced_images.add(identity)
-
-    if not silent and (len(new_images) > 0 or len(old_images) > 0 or len(replaced_images) > 0):
-        logger.info(
-            f"Found {len(new_images)} newly added image(s)"
-            f", {len(old_images)} removed image(s)"
-            f", {len(replaced_images)} replaced image(s)."
-        )
-
-    # append replaced images into both old and new images. these will be dropped and re-added.
-    new_images.update(replaced_images)
-    old_images.update(replaced_images)
-
-    # remove old images first
-    if len(old_images) > 0:
-        representations = [rep for rep in representations if rep["identity"] not in old_images]
-        must_save_pickle = True
-
-    # find representations for new images
-    if len(new_images) > 0:
-        representations += __find_bulk_embeddings(
-            employees=new_images,
-            model_name=model_name,
-            detector_backend=detector_backend,
-            enforce_detection=enforce_detection,
-            align=align,
-            expand_percentage=expand_percentage,
-            normalization=normalization,
-            silent=silent,
-        )  # add new images
-        must_save_pickle = True
-
-    if must_save_pickle:
-        with open(datastore_path, "wb") as f:
-            pickle.dump(representations, f, pickle.HIGHEST_PROTOCOL)
-        if not silent:
-            logger.info(f"There are now {len(representations)} representations in {file_name}")
+    # Handle list of images or 4D numpy array
+    images: Optional[List[Union[str, np.ndarray, IO[bytes]]]] = None
+    if isinstance(img_path, list):
+        images = img_path
+    elif isinstance(img_path, np.ndarray) and img_path.ndim == 4:
+        images = [img_path[i] for i in range(img_path.shape[0])]
+    else:
+        img, _ = image_utils.load_image(img_path)
+        if img is None:
+            raise ValueError(f"Passed image path {img_path} does not exist!")
+
+    gallery_index = gallery.get_gallery_index(
+        db_path=db_path,
+        model_name=model_name,
+        detector_backend=detector_backend,
+        align=align,
+        normalization=normalization,
+        expand_percentage=expand_percentage,
+        datastore_format=datastore_format,
+    )
+    if watch_database:
+        gallery_index.watch()
+    gallery_index.refresh(
+        refresh_database=refresh_database,
+        enforce_detection=enforce_detection,
+        silent=silent,
+        enrollment_workers=enrollment_workers,
+        enrollment_batch_size=enrollment_batch_size,
+        enrollment_processes=enrollment_processes,
+        check_files=check_modified_images,
+    )
 
     # Should we have no representations bailout
-    if len(representations) == 0:
+    if len(gallery_index) == 0:
         if not silent:
             toc = time.time()
             logger.info(f"find function duration {toc - tic} seconds")
@@ -248,206 +260,73 @@ def find(
     # ----------------------------
     # now, we got representations for facial database
 
-    # img path might have more than once face
-    source_objs = detection.extract_faces(
-        img_path=img_path,
-        detector_backend=detector_backend,
-        grayscale=False,
-        enforce_detection=enforce_detection,
-        align=align,
-        expand_percentage=expand_percentage,
-        anti_spoofing=anti_spoofing,
-    )
-
-    if batched:
-        return find_batched(
-            representations,
-            source_objs,
-            model_name,
-            distance_metric,
-            enforce_detection,
-            align,
-            threshold,
-            normalization,
-            anti_spoofing,
-        )
-
-    df = pd.DataFrame(representations)
-
-    if silent is False:
-        logger.info(f"Searching {img_path} in {df.shape[0]} length datastore")
-
-    resp_obj = []
-
-    for source_obj in source_objs:
-        if anti_spoofing is True and source_obj.get("is_real", True) is False:
-            raise ValueError("Spoof detected in the given image.")
-        source_img = source_obj["face"]
-        source_region = source_obj["facial_area"]
-        target_embedding_obj = representation.represent(
-            img_path=source_img,
-            model_name=model_name,
+    def extract_faces(image: Union[str, np.ndarray, IO[bytes]]) -> List[Dict[str, Any]]:
+        # img path might have more than once face
+        return detection.extract_faces(
+            img_path=image,
+            detector_backend=detector_backend,
+            grayscale=False,
             enforce_detection=enforce_detection,
-            detector_backend="skip",
             align=align,
-            normalization=normalization,
+            expand_percentage=expand_percentage,
+            anti_spoofing=anti_spoofing,
         )
 
-        target_representation = target_embedding_obj[0]["embedding"]
-
-        result_df = df.copy()  # df will be filtered in each img
-        result_df["source_x"] = source_region["x"]
-        result_df["source_y"] = source_region["y"]
-        result_df["source_w"] = source_region["w"]
-        result_df["source_h"] = source_region["h"]
-
-        distances = []
-        for _, instance in df.iterrows():
-            source_representation = instance["embedding"]
-            if source_representation is None:
-                distances.append(float("inf"))  # no representation for this image
-                continue
-
-            target_dims = len(list(target_representation))
-            source_dims = len(list(source_representation))
-            if target_dims != source_dims:
-                raise ValueError(
-                    "Source and target embeddings must have same dimensions but "
-                    + f"{target_dims}:{source_dims}. Model structure may change"
-                    + " after pickle created. Delete the {file_name} and re-run."
-                )
-
-            distance = verification.find_distance(
-                source_representation, target_representation, distance_metric
-            )
-
-            distances.append(distance)
-
-            # ---------------------------
-        target_threshold = threshold or verification.find_threshold(model_name, distance_metric)
-
-        result_df["threshold"] = target_threshold
-        result_df["distance"] = distances
-
-        result_df = result_df.drop(columns=["embedding"])
-        # pylint: disable=unsubscriptable-object
-        result_df = result_df[result_df["distance"] <= target_threshold]
-        result_df = result_df.sort_values(by=["distance"], ascending=True).reset_index(drop=True)
+    if images is None:
+        source_groups = [extract_faces(img_path)]
+    else:
+        with ThreadPoolExecutor(max_workers=max(1, detection_workers)) as executor:
+            source_groups = list(executor.map(extract_faces, images))
 
-        resp_obj.append(result_df)
+    if silent is False:
+        probe = img_path if images is None else f"{len(images)} images"
+        logger.info(f"Searching {probe} in {len(gallery_index)} length datastore")
+
+    # faces of all images are searched at once
+    matches = __find_matches(
+        representations=gallery_index,
+        source_objs=[source_obj for source_objs in source_groups for source_obj in source_objs],
+        model_name=model_name,
+        distance_metric=distance_metric,
+        enforce_detection=enforce_detection,
+        align=align,
+        threshold=threshold,
+        normalization=normalization,
+        anti_spoofing=anti_spoofing,
+        index=index,
+        nprobe=nprobe,
+        top_k=top_k,
+        max_results=max_results,
+        shards=shards,
+        shard_by=shard_by,
+        compression=compression,
+        rerank=rerank,
+        group_sizes=[len(source_objs) for source_objs in source_groups],
+    )
 
-    # -----------------------------------
+    if batched:
+        face_results = [__to_dicts(columns) for columns in matches]
+    else:
+        # a dataframe is built once per source face from its matching columns
+        face_results = [pd.DataFrame(columns, columns=DATAFRAME_COLUMNS) for columns in matches]
 
     if not silent:
         toc = time.time()
         logger.info(f"find function duration {toc - tic} seconds")
 
-    return resp_obj
+    if images is None:
+        return face_results
 
-
-def __find_bulk_embeddings(
-    employees: Set[str],
-    model_name: str = "VGG-Face",
-    detector_backend: str = "opencv",
-    enforce_detection: bool = True,
-    align: bool = True,
-    expand_percentage: int = 0,
-    normalization: str = "base",
-    silent: bool = False,
-) -> List[Dict["str", Any]]:
-    """
-    Find embeddings of a list of images
-
-    Args:
-        employees (list): list of exact image paths
-
-        model_name (str): Model for face recognition. Options: VGG-Face, Facenet, Facenet512,
-            OpenFace, DeepFace, DeepID, Dlib, ArcFace, SFace and GhostFaceNet (default is VGG-Face).
-
-        detector_backend (str): face detector model name
-
-        enforce_detection (bool): set this to False if you
-            want to proceed when you cannot detect any face
-
-        align (bool): enable or disable alignment of image
-            before feeding to facial recognition model
-
-        expand_percentage (int): expand detected facial area with a
-            percentage (default is 0).
-
-        normalization (bool): normalization technique
-
-        silent (bool): enable or disable informative logging
-    Returns:
-        representations (list): pivot list of dict with
-            image name, hash, embedding and detected face area's coordinates
-    """
-    representations = []
-    for employee in tqdm(
-        employees,
-        desc="Finding representations",
-        disable=silent,
-    ):
-        file_hash = image_utils.find_image_hash(employee)
-
-        try:
-            img_objs = detection.extract_faces(
-                img_path=employee,
-                detector_backend=detector_backend,
-                grayscale=False,
-                enforce_detection=enforce_detection,
-                align=align,
-                expand_percentage=expand_percentage,
-                color_face='bgr'  # `represent` expects images in bgr format.
-            )
-
-        except ValueError as err:
-            logger.error(f"Exception while extracting faces from {employee}: {str(err)}")
-            img_objs = []
-
-        if len(img_objs) == 0:
-            representations.append(
-                {
-                    "identity": employee,
-                    "hash": file_hash,
-                    "embedding": None,
-                    "target_x": 0,
-                    "target_y": 0,
-                    "target_w": 0,
-                    "target_h": 0,
-                }
-            )
-        else:
-            for img_obj in img_objs:
-                img_content = img_obj["face"]
-                img_region = img_obj["facial_area"]
-                embedding_obj = representation.represent(
-                    img_path=img_content,
-                    model_name=model_name,
-                    enforce_detection=enforce_detection,
-                    detector_backend="skip",
-                    align=align,
-                    normalization=normalization,
-                )
-
-                img_representation = embedding_obj[0]["embedding"]
-                representations.append(
-                    {
-                        "identity": employee,
-                        "hash": file_hash,
-                        "embedding": img_representation,
-                        "target_x": img_region["x"],
-                        "target_y": img_region["y"],
-                        "target_w": img_region["w"],
-                        "target_h": img_region["h"],
-                    }
-                )
-
-    return representations
+    results = []
+    start = 0
+    for source_objs in source_groups:
+        results.append(face_results[start : start + len(source_objs)])
+        start += len(source_objs)
+    return results
 
 
 def find_batched(
-    representations: List[Dict[str, Any]],
+    representations: Union[List[Dict[str, Any]], EmbeddingStore, gallery.GalleryIndex],
     source_objs: List[Dict[str, Any]],
     model_name: str = "VGG-Face",
     distance_metric: str = "cosine",
@@ -456,6 +335,14 @@ def find_batched(
     threshold: Optional[float] = None,
     normalization: str = "base",
     anti_spoofing: bool = False,
+    index: Optional[str] = None,
+    nprobe: int = 8,
+    top_k: Optional[int] = None,
+    max_results: Optional[int] = None,
+    shards: int = 1,
+    shard_by: str = "identity",
+    compression: Optional[str] = None,
+    rerank: Optional[int] = None,
 ) -> List[List[Dict[str, Any]]]:
     """
     Perform batched face recognition by comparing source face embeddings with a set of
@@ -464,9 +351,11 @@ def find_batched(
     The function uses batch processing for efficient computation of distances.
 
     Args:
-        representations (List[Dict[str, Any]]):
+        representations (List[Dict[str, Any]] or EmbeddingStore or GalleryIndex):
             A list of dictionaries containing precomputed target embeddings and associated metadata.
-            Each dictionary should have at least the key `embedding`.
+            Each dictionary should have at least the key `embedding`. An embedding store or
+            a gallery index can be passed instead, then its embedding matrix is searched
+            without copying.
 
         source_objs (List[Dict[str, Any]]):
             A list of dictionaries representing the source images to compare against
@@ -504,64 +393,182 @@ def find_batched(
 
         anti_spoofing (boolean): Flag to enable anti spoofing (default is False).
 
+        index (string): Approximate nearest neighbour index to search the database with.
+            Options: None for exhaustive search or 'ivf'. It requires a gallery index
+            to be passed as representations (default is None).
+
+        nprobe (int): Number of inverted lists probed per face if index is 'ivf' (default is 8).
+
+        top_k (int): Maximum number of closest matches returned per source face.
+            None returns all matches under the threshold (default is None).
+
+        max_results (int): Maximum number of closest matches returned in total across all
+            source faces. None returns all matches (default is None).
+
+        shards (int): Number of shards searched in worker processes. It requires a gallery
+            index to be passed as representations (default is 1).
+
+        shard_by (string): How the database is split into shards. Options: 'identity' or
+            'directory' (default is identity).
+
+        compression (string): Search a compressed copy of the embeddings. Options: None,
+            'float16', 'int8' or 'pq'. It requires a gallery index to be passed as
+            representations (default is None).
+
+        rerank (int): Number of closest candidates per source face re-ranked with exact
+            distances if compression is set (default is None).
+
     Returns:
         List[List[Dict[str, Any]]]:
             A list where each element corresponds to a source face and
             contains a list of dictionaries with matching faces.
     """
-    embeddings_list = []
-    valid_mask = []
-    metadata = set()
-
-    for item in representations:
-        emb = item.get("embedding")
-        if emb is not None:
-            embeddings_list.append(emb)
-            valid_mask.append(True)
-        else:
-            embeddings_list.append(np.zeros_like(representations[0]["embedding"]))
-            valid_mask.append(False)
+    matches = __find_matches(
+        representations=representations,
+        source_objs=source_objs,
+        model_name=model_name,
+        distance_metric=distance_metric,
+        enforce_detection=enforce_detection,
+        align=align,
+        threshold=threshold,
+        normalization=normalization,
+        anti_spoofing=anti_spoofing,
+        index=index,
+        nprobe=nprobe,
+        top_k=top_k,
+        max_results=max_results,
+        shards=shards,
+        shard_by=shard_by,
+        compression=compression,
+        rerank=rerank,
+    )
 
-        metadata.update(item.keys())
+    return [__to_dicts(columns) for columns in matches]
 
-    # remove embedding key from other keys
-    metadata.discard("embedding")
-    metadata = list(metadata)
 
-    embeddings = np.array(embeddings_list)  # (N, D)
-    valid_mask = np.array(valid_mask)  # (N,)
+def __to_dicts(columns: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """
+    Convert matching columns of a source face to a list of dicts, one per match
+    """
+    num_results = len(columns["distance"])
+    return [{key: columns[key][i] for key in columns} for i in range(num_results)]
+
 
-    data = {key: np.array([item.get(key, None) for item in representations]) for key in metadata}
+def __find_matches(
+    representations: Union[List[Dict[str, Any]], EmbeddingStore, gallery.GalleryIndex],
+    source_objs: List[Dict[str, Any]],
+    model_name: str,
+    distance_metric: str,
+    enforce_detection: bool,
+    align: bool,
+    threshold: Optional[float],
+    normalization: str,
+    anti_spoofing: bool,
+    index: Optional[str],
+    nprobe: int,
+    top_k: Optional[int],
+    max_results: Optional[int],
+    shards: int,
+    shard_by: str,
+    compression: Optional[str],
+    rerank: Optional[int],
+    group_sizes: Optional[List[int]] = None,
+) -> List[Dict[str, np.ndarray]]:
+    """
+    Find matches of source faces in the gallery. See `find_batched` for arguments.
+    Source faces of many images can be searched at once, then group_sizes is the number
+    of faces of each image and max_results is applied per image.
+    Returns:
+        matches (list): columns of the matching rows of each source face sorted by distance,
+            built from the matching rows only
+    """
+    if top_k is not None and top_k < 1:
+        raise ValueError(f"top_k must be a positive integer but it is {top_k}")
+    if max_results is not None and max_results < 1:
+        raise ValueError(f"max_results must be a positive integer but it is {max_results}")
+    if shards < 1:
+        raise ValueError(f"shards must be a positive integer but it is {shards}")
+    if shards > 1 and index is not None:
+        raise ValueError("Sharded search is not supported with an approximate index")
+    if compression is not None and (index is not None or shards > 1):
+        raise ValueError("Compressed search is not supported with an index or shards")
+    if rerank is not None and rerank < 1:
+        raise ValueError(f"rerank must be a positive integer but it is {rerank}")
+
+    if isinstance(representations, gallery.GalleryIndex):
+        # rows of all arrays must match even if another thread refreshes the gallery
+        embeddings, valid_mask, norms, data = representations.snapshot()
+    elif isinstance(representations, EmbeddingStore):
+        embeddings = representations.embeddings  # (N, D)
+        valid_mask = representations.valid_mask  # (N,)
+        norms = representations.norms  # (N,)
+        data = representations.metadata
+    else:
+        embeddings_list = []
+        valid_mask = []
+        metadata = set()
+
+        for item in representations:
+            emb = item.get("embedding")
+            if emb is not None:
+                embeddings_list.append(emb)
+                valid_mask.append(True)
+            else:
+                embeddings_list.append(np.zeros_like(representations[0]["embedding"]))
+                valid_mask.append(False)
+
+            metadata.update(item.keys())
+
+        # remove embedding key from other keys
+        metadata.discard("embedding")
+        metadata = list(metadata)
+
+        embeddings = np.array(embeddings_list)  # (N, D)
+        valid_mask = np.array(valid_mask)  # (N,)
+        norms = None
+
+        data = {
+            key: np.array([item.get(key, None) for item in representations]) for key in metadata
+        }
 
-    target_embeddings = []
-    source_regions = []
-    target_thresholds = []
+    if len(source_objs) == 0:
+        return []
 
     for source_obj in source_objs:
         if anti_spoofing and not source_obj.get("is_real", True):
             raise ValueError("Spoof detected in the given image.")
 
-        source_img = source_obj["face"]
-        source_region = source_obj["facial_area"]
+    # all detected faces are fed to the model in one batch
+    target_embedding_objs = representation.represent(
+        img_path=[source_obj["face"] for source_obj in source_objs],
+        model_name=model_name,
+        enforce_detection=enforce_detection,
+        detector_backend="skip",
+        align=align,
+        normalization=normalization,
+        output="numpy",
+    )
+    if len(source_objs) == 1:
+        target_embedding_objs = [target_embedding_objs]
 
-        target_embedding_obj = representation.represent(
-            img_path=source_img,
-            model_name=model_name,
-            enforce_detection=enforce_detection,
-            detector_backend="skip",
-            align=align,
-            normalization=normalization,
+    # it is safe to access 0 index because we already fed detected face to represent function
+    target_embeddings = [
+        embedding_objs[0]["embedding"] for embedding_objs in target_embedding_objs
+    ]
+    source_regions = [source_obj["facial_area"] for source_obj in source_objs]
+
+    target_threshold = threshold or verification.find_threshold(model_name, distance_metric)
+    target_thresholds = [target_threshold] * len(source_objs)
+
+    target_embeddings = np.stack(target_embeddings)  # (M, D)
+    if valid_mask.any() and embeddings.shape[1] != target_embeddings.shape[1]:
+        datastore_path = getattr(representations, "datastore_path", "datastore")
+        raise ValueError(
+            "Source and target embeddings must have same dimensions but "
+            + f"{target_embeddings.shape[1]}:{embeddings.shape[1]}. Model structure may change"
+            + " after pickle created."
+            + f" Delete the {datastore_path} and re-run."
         )
-        # it is safe to access 0 index because we already fed detected face to represent function
-        target_representation = target_embedding_obj[0]["embedding"]
-
-        target_embeddings.append(target_representation)
-        source_regions.append(source_region)
-
-        target_threshold = threshold or verification.find_threshold(model_name, distance_metric)
-        target_thresholds.append(target_threshold)
-
-    target_embeddings = np.array(target_embeddings)  # (M, D)
     target_thresholds = np.array(target_thresholds)  # (M,)
     source_regions_arr = {
         "source_x": np.array([region["x"] for region in source_regions]),
@@ -570,37 +577,147 @@ def find_batched(
         "source_h": np.array([region["h"] for region in source_regions]),
     }
 
-    distances = verification.find_distance(embeddings, target_embeddings, distance_metric)  # (M, N)
-    distances[:, ~valid_mask] = np.inf
-
-    resp_obj = []
+    if compression is not None:
+        if not isinstance(representations, gallery.GalleryIndex):
+            raise ValueError("Compressed search requires a gallery index")
+        quantized_index = representations.quantized_index(
+            kind=compression, distance_metric=distance_metric
+        )
+        if rerank is None:
+            matches = quantized_index.search(
+                target_embeddings, target_thresholds, valid_mask, distance_metric, top_k
+            )
+        else:
+            # closest candidates by approximate distance, then exact re-rank
+            candidates = quantized_index.search(
+                target_embeddings,
+                np.full(target_embeddings.shape[0], np.inf),
+                valid_mask,
+                distance_metric,
+                rerank,
+            )
+            matches = __rerank(
+                candidates=[rows for rows, _ in candidates],
+                embeddings=embeddings,
+                valid_mask=valid_mask,
+                target_embeddings=target_embeddings,
+                target_thresholds=target_thresholds,
+                distance_metric=distance_metric,
+                top_k=top_k,
+                norms=norms,
+            )
+    elif index is None and shards > 1:
+        if not isinstance(representations, gallery.GalleryIndex):
+            raise ValueError("Sharded search requires a gallery index")
+        sharded_gallery = representations.sharded_gallery(num_shards=shards, shard_by=shard_by)
+        matches = sharded_gallery.search(
+            target_embeddings=target_embeddings,
+            target_thresholds=target_thresholds,
+            distance_metric=distance_metric,
+            top_k=top_k,
+        )
+    elif index is None:
+        matches = search.search_exhaustive(
+            embeddings=embeddings,
+            valid_mask=valid_mask,
+            target_embeddings=target_embeddings,
+            target_thresholds=target_thresholds,
+            distance_metric=distance_metric,
+            top_k=top_k,
+            norms=norms,
+        )
+    else:
+        if not isinstance(representations, gallery.GalleryIndex):
+            raise ValueError("Approximate nearest neighbour search requires a gallery index")
+        ann_index = representations.ann_index(kind=index, distance_metric=distance_metric)
+        candidates = ann_index.search(target_embeddings, nprobe=nprobe)
+        matches = __rerank(
+            candidates=candidates,
+            embeddings=embeddings,
+            valid_mask=valid_mask,
+            target_embeddings=target_embeddings,
+            target_thresholds=target_thresholds,
+            distance_metric=distance_metric,
+            top_k=top_k,
+            norms=norms,
+        )
 
-    for i in range(len(target_embeddings)):
-        target_distances = distances[i]  # (N,)
-        target_threshold = target_thresholds[i]
+    if max_results is not None:
+        limited_matches = []
+        start = 0
+        for group_size in group_sizes or [len(matches)]:
+            limited_matches += __limit_matches(matches[start : start + group_size], max_results)
+            start += group_size
+        matches = limited_matches
 
-        N = embeddings.shape[0]
-        result_data = dict(data)
-        result_data.update(
+    resp_obj = []
+    for i, (rows, target_distances) in enumerate(matches):
+        num_results = rows.shape[0]
+        columns = {key: value[rows] for key, value in data.items()}
+        columns.update(
             {
-                "source_x": np.full(N, source_regions_arr["source_x"][i]),
-                "source_y": np.full(N, source_regions_arr["source_y"][i]),
-                "source_w": np.full(N, source_regions_arr["source_w"][i]),
-                "source_h": np.full(N, source_regions_arr["source_h"][i]),
-                "threshold": np.full(N, target_threshold),
+                "source_x": np.full(num_results, source_regions_arr["source_x"][i]),
+                "source_y": np.full(num_results, source_regions_arr["source_y"][i]),
+                "source_w": np.full(num_results, source_regions_arr["source_w"][i]),
+                "source_h": np.full(num_results, source_regions_arr["source_h"][i]),
+                "threshold": np.full(num_results, target_thresholds[i]),
                 "distance": target_distances,
             }
         )
+        resp_obj.append(columns)
+    return resp_obj
 
-        mask = target_distances <= target_threshold
-        filtered_data = {key: value[mask] for key, value in result_data.items()}
 
-        sorted_indices = np.argsort(filtered_data["distance"])
-        sorted_data = {key: value[sorted_indices] for key, value in filtered_data.items()}
+def __rerank(
+    candidates: List[np.ndarray],
+    embeddings: np.ndarray,
+    valid_mask: np.ndarray,
+    target_embeddings: np.ndarray,
+    target_thresholds: np.ndarray,
+    distance_metric: str,
+    top_k: Optional[int],
+    norms: Optional[np.ndarray] = None,
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Find exact distances of candidate rows of each source face with the original vectors,
+    and keep the ones under threshold sorted by distance
+    """
+    matches = []
+    for i, rows in enumerate(candidates):
+        rows = np.sort(rows[valid_mask[rows]])
+        candidate_distances = verification.find_distance(
+            np.asarray(embeddings[rows]),
+            target_embeddings[i : i + 1],
+            distance_metric,
+            alpha_norms=None if norms is None else norms[rows],
+        )[0]
+        selected = search.select_matches(candidate_distances, target_thresholds[i], top_k)
+        matches.append((rows[selected], candidate_distances[selected]))
+    return matches
 
-        num_results = len(sorted_data["distance"])
-        result_dicts = [
-            {key: sorted_data[key][i] for key in sorted_data} for i in range(num_results)
-        ]
-        resp_obj.append(result_dicts)
-    return resp_obj
+
+def __limit_matches(
+    matches: List[Tuple[np.ndarray, np.ndarray]], max_results: int
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Keep the closest max_results matches in total across all source faces, max_results is
+    validated to be positive by __find_matches
+    """
+    total = sum(len(target_distances) for _, target_distances in matches)
+    if total <= max_results:
+        return matches
+
+    sources = np.concatenate(
+        [np.full(len(target_distances), i) for i, (_, target_distances) in enumerate(matches)]
+    )
+    all_distances = np.concatenate([target_distances for _, target_distances in matches])
+
+    kept = np.zeros(total, dtype=bool)
+    kept[np.argpartition(all_distances, max_results - 1)[:max_results]] = True
+
+    limited = []
+    for i, (rows, target_distances) in enumerate(matches):
+        # matches of each source face are sorted already, so keeping a prefix is enough
+        num_kept = int(kept[sources == i].sum())
+        limited.append((rows[:num_kept], target_distances[:num_kept]))
+    return limited
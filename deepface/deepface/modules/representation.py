@@ -7,8 +7,8 @@ import numpy as np
 
 # project dependencies
 from deepface.commons import image_utils
-from deepface.modules import modeling, detection, preprocessing
-from deepface.models.FacialRecognition import FacialRecognition
+from deepface.modules import modeling, detection, preprocessing, embedding_cache
+from deepface.models.FacialRecognition import FacialRecognition, OUTPUTS
 
 
 def represent(
@@ -21,6 +21,8 @@ def represent(
     normalization: str = "base",
     anti_spoofing: bool = False,
     max_faces: Optional[int] = None,
+    use_cache: bool = False,
+    output: str = "list",
 ) -> Union[List[Dict[str, Any]], List[List[Dict[str, Any]]]]:
     """
     Represent facial images as multi-dimensional vector embeddings.
@@ -53,12 +55,21 @@ def represent(
 
         max_faces (int): Set a limit on the number of faces to be processed (default is None).
 
+        use_cache (boolean): Look up results in the shared embedding cache by the content hash
+            of each image and the given settings, and cache the results of new images, so
+            that repeated images skip detection and the forward pass (default is False).
+
+        output (string): Format of the embeddings. Options: list or numpy. numpy keeps each
+            embedding as a float32 array instead of converting its items to python floats
+            (default is list).
+
     Returns:
         results (List[Dict[str, Any]] or List[Dict[str, Any]]): A list of dictionaries.
             Result type becomes List of List of Dict if batch input passed.
             Each containing the following fields:
 
-        - embedding (List[float]): Multidimensional vector representing facial features.
+        - embedding (List[float] or np.ndarray): Multidimensional vector representing facial
+            features, as a float32 array if output is numpy.
             The number of dimensions varies based on the reference model
             (e.g., FaceNet returns 128 dimensions, VGG-Face returns 4096 dimensions).
         - facial_area (dict): Detected facial area by face detection in dictionary format.
@@ -68,6 +79,9 @@ def represent(
         - face_confidence (float): Confidence score of face detection. If `detector_backend` is set
             to 'skip', the confidence will be 0 and is nonsensical.
     """
+    if output not in OUTPUTS:
+        raise ValueError(f"unimplemented output - {output}")
+
     resp_objs = []
 
     model: FacialRecognition = modeling.build_model(
@@ -83,8 +97,36 @@ def represent(
         images = [img_path]
 
     batch_images, batch_regions, batch_confidences, batch_indexes = [], [], [], []
+    resp_objs_dict = defaultdict(list)
+
+    cache = embedding_cache.get_embedding_cache() if use_cache else None
+    cache_keys: Dict[int, str] = {}
+    # keras, onnx runtime and int8 variants of a model find different embeddings
+    model_variant = modeling.find_model_variant(task="facial_recognition", model_name=model_name)
 
     for idx, single_img_path in enumerate(images):
+        if cache is not None:
+            # raw content is hashed, so that the image is decoded on a miss only
+            content, single_img_path = embedding_cache.read_image_content(single_img_path)
+            cache_key = embedding_cache.find_cache_key(
+                content,
+                task="represent",
+                model_name=model_name,
+                model_variant=model_variant,
+                enforce_detection=enforce_detection,
+                detector_backend=detector_backend,
+                align=align,
+                expand_percentage=expand_percentage,
+                normalization=normalization,
+                anti_spoofing=anti_spoofing,
+                max_faces=max_faces,
+            )
+            cached_objs = cache.get(cache_key)
+            if cached_objs is not None:
+                resp_objs_dict[idx] = cached_objs
+                continue
+            cache_keys[idx] = cache_key
+
         # we have run pre-process in verification. so, skip if it is coming from verify.
         target_size = model.input_shape
         if detector_backend != "skip":
@@ -156,22 +198,39 @@ def represent(
             batch_confidences.append(confidence)
             batch_indexes.append(idx)
 
-    # Convert list of images to a numpy array for batch processing
-    batch_images = np.concatenate(batch_images, axis=0)
+    if len(batch_images) > 0:
+        # Convert list of images to a numpy array for batch processing
+        batch_images = np.concatenate(batch_images, axis=0)
 
-    # Forward pass through the model for the entire batch
-    embeddings = model.forward(batch_images)
+        # Forward pass through the model for the entire batch
+        embeddings = model.forward(batch_images, output="numpy")
 
-    resp_objs_dict = defaultdict(list)
     for idy, batch_index in enumerate(batch_indexes):
         resp_objs_dict[batch_index].append(
             {
-                "embedding": embeddings if len(batch_images) == 1 else embeddings[idy],
+                "embedding": embeddings[idy],
                 "facial_area": batch_regions[idy],
                 "face_confidence": batch_confidences[idy],
             }
         )
 
+    for idx, cache_key in cache_keys.items():
+        cache.put(cache_key, resp_objs_dict[idx])
+
     resp_objs = [resp_objs_dict[idx] for idx in range(len(images))]
+    for img_objs in resp_objs:
+        for img_obj in img_objs:
+            img_obj["embedding"] = __format_embedding(img_obj["embedding"], output)
 
     return resp_objs[0] if len(images) == 1 else resp_objs
+
+
+def __format_embedding(embedding: Union[np.ndarray, List[float]], output: str) -> Any:
+    """
+    Convert an embedding to the requested output, cached ones might be lists already
+    """
+    if output == "numpy":
+        return np.asarray(embedding, dtype=np.float32)
+    if isinstance(embedding, np.ndarray):
+        return embedding.tolist()
+    return embedding
@@ -0,0 +1,345 @@
+# built-in dependencies
+import os
+import sys
+import zlib
+import weakref
+import multiprocessing
+from multiprocessing import resource_tracker, shared_memory
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+# 3rd party dependencies
+import numpy as np
+
+# project dependencies
+# shard workers import this module, so it must not import models or tensorflow
+from deepface.modules import distance
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+# number of gallery rows compared with source faces at once in exhaustive search
+SEARCH_CHUNK_SIZE = 4096
+
+# how identities of a gallery are spread over shards
+SHARD_STRATEGIES = {"identity", "directory"}
+
+# gallery matrix and its row norms attached by a shard worker process
+worker_embeddings: Optional[np.ndarray] = None
+worker_norms: Optional[np.ndarray] = None
+worker_block: Optional[shared_memory.SharedMemory] = None
+
+
+def search_exhaustive(
+    embeddings: np.ndarray,
+    valid_mask: np.ndarray,
+    target_embeddings: np.ndarray,
+    target_thresholds: np.ndarray,
+    distance_metric: str,
+    top_k: Optional[int],
+    norms: Optional[np.ndarray] = None,
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Compare source faces with the gallery chunk by chunk. Only matches of each chunk are
+    kept and merged, so that memory is bound to the chunk size and the number of matches
+    instead of the gallery size.
+    Args:
+        embeddings (np.ndarray): (N, D) gallery matrix
+        valid_mask (np.ndarray): (N,) mask of the rows having an embedding
+        target_embeddings (np.ndarray): (M, D) embeddings of source faces
+        target_thresholds (np.ndarray): (M,) threshold of each source face
+        distance_metric (str): distance metric name
+        top_k (int): maximum number of matches kept per source face
+        norms (np.ndarray): pre-calculated (N,) l2 norms of the gallery rows, so that
+            each chunk is compared with a single matrix product
+    Returns:
+        matches (list): M tuples of matched row indices and their distances,
+            sorted by distance
+    """
+    return search_chunks(
+        num_rows=embeddings.shape[0],
+        find_chunk_distances=lambda start, end: distance.find_distance(
+            np.asarray(embeddings[start:end]),
+            target_embeddings,
+            distance_metric,
+            alpha_norms=None if norms is None else norms[start:end],
+        ),
+        valid_mask=valid_mask,
+        target_thresholds=target_thresholds,
+        top_k=top_k,
+    )
+
+
+def search_chunks(
+    num_rows: int,
+    find_chunk_distances: Callable[[int, int], np.ndarray],
+    valid_mask: np.ndarray,
+    target_thresholds: np.ndarray,
+    top_k: Optional[int],
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Select matches of source faces chunk by chunk with a given distance function.
+    Args:
+        num_rows (int): number of gallery rows
+        find_chunk_distances (callable): distances of source faces to the gallery rows
+            in [start, end) as (M, end - start) matrix
+        valid_mask (np.ndarray): (N,) mask of the rows having an embedding
+        target_thresholds (np.ndarray): (M,) threshold of each source face
+        top_k (int): maximum number of matches kept per source face
+    Returns:
+        matches (list): M tuples of matched row indices and their distances,
+            sorted by distance
+    """
+    num_sources = target_thresholds.shape[0]
+    rows: List[List[np.ndarray]] = [[] for _ in range(num_sources)]
+    distances: List[List[np.ndarray]] = [[] for _ in range(num_sources)]
+
+    for start in range(0, num_rows, SEARCH_CHUNK_SIZE):
+        end = min(start + SEARCH_CHUNK_SIZE, num_rows)
+        chunk_distances = find_chunk_distances(start, end)  # (M, chunk)
+        chunk_distances[:, ~valid_mask[start:end]] = np.inf
+
+        for i in range(num_sources):
+            selected = select_matches(chunk_distances[i], target_thresholds[i], top_k)
+            rows[i].append(selected + start)
+            distances[i].append(chunk_distances[i][selected])
+
+            if top_k is not None and len(rows[i]) > 1:
+                # merge best matches so far
+                merged_rows = np.concatenate(rows[i])
+                merged_distances = np.concatenate(distances[i])
+                selected = select_matches(merged_distances, np.inf, top_k)
+                rows[i] = [merged_rows[selected]]
+                distances[i] = [merged_distances[selected]]
+
+    matches = []
+    for i in range(num_sources):
+        if len(rows[i]) == 0:
+            matches.append((np.zeros(0, dtype=np.int64), np.zeros(0)))
+            continue
+        merged_rows = np.concatenate(rows[i])
+        merged_distances = np.concatenate(distances[i])
+        order = np.argsort(merged_distances, kind="stable")
+        matches.append((merged_rows[order], merged_distances[order]))
+    return matches
+
+
+def select_matches(distances: np.ndarray, threshold: float, top_k: Optional[int]) -> np.ndarray:
+    """
+    Find indices of distances under threshold, at most top_k smallest ones sorted by distance.
+    Partial selection is used instead of sorting all distances.
+    """
+    selected = np.flatnonzero(distances <= threshold)
+    if top_k is not None and selected.shape[0] > top_k:
+        partition = np.argpartition(distances[selected], top_k - 1)[:top_k]
+        selected = np.sort(selected[partition])
+    return selected[np.argsort(distances[selected], kind="stable")]
+
+
+def assign_shards(
+    identities: np.ndarray, num_shards: int, db_path: str, shard_by: str = "identity"
+) -> np.ndarray:
+    """
+    Assign each row of a gallery to a shard with a stable hash
+    Args:
+        identities (np.ndarray): (N,) exact image path of each row
+        num_shards (int): number of shards
+        db_path (str): path to the folder containing image files
+        shard_by (str): 'identity' hashes the image path, 'directory' hashes the top level
+            directory under db_path so that all images of a person stay in the same shard
+    Returns:
+        shard_ids (np.ndarray): (N,) shard of each row
+    """
+    if shard_by not in SHARD_STRATEGIES:
+        raise ValueError(f"unimplemented shard strategy - {shard_by}")
+
+    shard_ids = np.zeros(len(identities), dtype=np.int64)
+    for i, identity in enumerate(identities.tolist()):
+        key = identity
+        if shard_by == "directory":
+            key = os.path.relpath(identity, db_path).split(os.sep)[0]
+        shard_ids[i] = zlib.crc32(key.encode("utf-8")) % num_shards
+    return shard_ids
+
+
+class ShardedGallery:
+    """
+    Gallery matrix split into shards, each of them searched in a worker process.
+
+    Rows having an embedding and their l2 norms are copied once into a shared memory block,
+    grouped by shard, so that workers search their own contiguous slice without copying or
+    pickling the gallery, and compare it with a single matrix product. Matches of each shard
+    are merged into the closest ones of the whole gallery.
+
+    Attributes:
+        num_shards (int): number of shards and worker processes
+    """
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        valid_mask: np.ndarray,
+        shard_ids: np.ndarray,
+        num_shards: int,
+        norms: Optional[np.ndarray] = None,
+    ):
+        self.num_shards = num_shards
+
+        rows = np.flatnonzero(valid_mask)
+        # gallery rows of the shared matrix, grouped by shard
+        self._rows = rows[np.argsort(shard_ids[rows], kind="stable")]
+        self._bounds = np.searchsorted(shard_ids[self._rows], np.arange(self.num_shards + 1))
+
+        dtype = np.asarray(embeddings[:0]).dtype
+        shape = (self._rows.shape[0], embeddings.shape[1])
+        # norms follow the matrix in the same block, in its dtype to keep them aligned
+        self._block = shared_memory.SharedMemory(
+            create=True, size=max(1, (int(np.prod(shape)) + shape[0]) * dtype.itemsize)
+        )
+        matrix, matrix_norms = _find_block_arrays(self._block, shape, dtype)
+        for start in range(0, shape[0], SEARCH_CHUNK_SIZE):
+            end = min(start + SEARCH_CHUNK_SIZE, shape[0])
+            matrix[start:end] = embeddings[self._rows[start:end]]
+            if norms is None:
+                matrix_norms[start:end] = np.linalg.norm(matrix[start:end], axis=1)
+            else:
+                matrix_norms[start:end] = norms[self._rows[start:end]]
+        del matrix, matrix_norms
+
+        # forking a process after tensorflow is initialized is not safe
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.num_shards,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_attach_block,
+            initargs=(self._block.name, shape, dtype.str),
+        )
+        self._finalizer = weakref.finalize(self, _release, self._pool, self._block)
+
+    def search(
+        self,
+        target_embeddings: np.ndarray,
+        target_thresholds: np.ndarray,
+        distance_metric: str,
+        top_k: Optional[int],
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Search source faces in all shards concurrently. See `search_exhaustive` for arguments.
+        Returns:
+            matches (list): M tuples of matched gallery row indices and their distances,
+                sorted by distance
+        """
+        futures = []
+        for shard in range(self.num_shards):
+            start, end = int(self._bounds[shard]), int(self._bounds[shard + 1])
+            if start == end:
+                continue
+            future = self._pool.submit(
+                _search_shard,
+                start,
+                end,
+                target_embeddings,
+                target_thresholds,
+                distance_metric,
+                top_k,
+            )
+            futures.append((start, future))
+
+        num_sources = target_embeddings.shape[0]
+        rows: List[List[np.ndarray]] = [[] for _ in range(num_sources)]
+        distances: List[List[np.ndarray]] = [[] for _ in range(num_sources)]
+        for start, future in futures:
+            for i, (shard_rows, shard_distances) in enumerate(future.result()):
+                rows[i].append(self._rows[shard_rows + start])
+                distances[i].append(shard_distances)
+
+        matches = []
+        for i in range(num_sources):
+            if len(rows[i]) == 0:
+                matches.append((np.zeros(0, dtype=np.int64), np.zeros(0)))
+                continue
+            merged_rows = np.concatenate(rows[i])
+            merged_distances = np.concatenate(distances[i])
+            selected = select_matches(merged_distances, np.inf, top_k)
+            merged_rows = merged_rows[selected]
+            merged_distances = merged_distances[selected]
+            # ties are broken by gallery order as in exhaustive search
+            order = np.lexsort((merged_rows, merged_distances))
+            matches.append((merged_rows[order], merged_distances[order]))
+        return matches
+
+    def close(self) -> None:
+        """
+        Stop worker processes and release the shared memory block
+        """
+        self._finalizer()
+
+
+def _attach_block(block_name: str, shape: Tuple[int, int], dtype: str) -> None:
+    """
+    Attach the shared gallery matrix and its norms once per worker process
+    """
+    global worker_embeddings, worker_norms, worker_block  # pylint: disable=global-statement
+    worker_block = _attach_untracked(block_name)
+    worker_embeddings, worker_norms = _find_block_arrays(worker_block, shape, np.dtype(dtype))
+
+
+def _find_block_arrays(
+    block: shared_memory.SharedMemory, shape: Tuple[int, int], dtype: np.dtype
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the (N, D) gallery matrix and (N,) norms views of a shared memory block
+    """
+    matrix = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    norms = np.ndarray(
+        (shape[0],), dtype=dtype, buffer=block.buf, offset=int(np.prod(shape)) * dtype.itemsize
+    )
+    return matrix, norms
+
+
+def _attach_untracked(block_name: str) -> shared_memory.SharedMemory:
+    """
+    Attach a shared memory block without registering it to the resource tracker, since
+    the block is owned and unlinked by the parent process. Otherwise, the tracker unlinks
+    it once a worker exits, or warns about a leaked block.
+    """
+    if sys.version_info >= (3, 13):
+        # pylint: disable=unexpected-keyword-arg
+        return shared_memory.SharedMemory(name=block_name, track=False)
+
+    # unregistering after attaching would drop the registration of the parent as well if
+    # the tracker process is shared, so the block is never registered instead
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=block_name)
+    finally:
+        resource_tracker.register = register
+
+
+def _search_shard(
+    start: int,
+    end: int,
+    target_embeddings: np.ndarray,
+    target_thresholds: np.ndarray,
+    distance_metric: str,
+    top_k: Optional[int],
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Search source faces in the rows of a shard, row indices are relative to its start
+    """
+    shard = worker_embeddings[start:end]
+    return search_exhaustive(
+        embeddings=shard,
+        valid_mask=np.ones(shard.shape[0], dtype=bool),
+        target_embeddings=target_embeddings,
+        target_thresholds=target_thresholds,
+        distance_metric=distance_metric,
+        top_k=top_k,
+        norms=worker_norms[start:end],
+    )
+
+
+def _release(pool: ProcessPoolExecutor, block: shared_memory.SharedMemory) -> None:
+    pool.shutdown(wait=True)
+    block.close()
+    block.unlink()
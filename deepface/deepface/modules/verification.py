@@ -1,17 +1,38 @@
 # built-in dependencies
 import time
-from typing import Any, Dict, Optional, Union, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Union, List, Sequence, Tuple
 
 # 3rd party dependencies
 import numpy as np
 
 # project dependencies
-from deepface.modules import representation, detection, modeling
+from deepface.modules import representation, detection, modeling, embedding_cache
+# distance kernels live in a module without model dependencies, e.g. for search workers
+from deepface.modules.distance import (  # pylint: disable=unused-import
+    DISTANCE_CHUNK_SIZE,
+    find_angular_distance,
+    find_cosine_distance,
+    find_cosine_similarities,
+    find_distance,
+    find_euclidean_distance,
+    l2_normalize,
+)
 from deepface.models.FacialRecognition import FacialRecognition
 from deepface.commons.logger import Logger
 
 logger = Logger()
 
+# facial area of pre-calculated embeddings
+NO_FACIAL_AREA = {
+    "x": None,
+    "y": None,
+    "w": None,
+    "h": None,
+    "left_eye": None,
+    "right_eye": None,
+}
+
 
 def verify(
     img1_path: Union[str, np.ndarray, List[float]],
@@ -26,6 +47,7 @@ def verify(
     silent: bool = False,
     threshold: Optional[float] = None,
     anti_spoofing: bool = False,
+    use_cache: bool = False,
 ) -> Dict[str, Any]:
     """
     Verify if an image pair represents the same person or different persons.
@@ -37,11 +59,11 @@ def verify(
     Args:
         img1_path (str or np.ndarray or List[float]): Path to the first image.
             Accepts exact image path as a string, numpy array (BGR), base64 encoded images
-            or pre-calculated embeddings.
+            or pre-calculated embeddings as a list or a 1D numpy array.
 
         img2_path (str or np.ndarray or  or List[float]): Path to the second image.
             Accepts exact image path as a string, numpy array (BGR), base64 encoded images
-            or pre-calculated embeddings.
+            or pre-calculated embeddings as a list or a 1D numpy array.
 
         model_name (str): Model for face recognition. Options: VGG-Face, Facenet, Facenet512,
             OpenFace, DeepFace, DeepID, Dlib, ArcFace, SFace and GhostFaceNet (default is VGG-Face).
@@ -73,6 +95,10 @@ def verify(
 
         anti_spoofing (boolean): Flag to enable anti spoofing (default is False).
 
+        use_cache (boolean): Look up faces and embeddings of both images in the shared
+            embedding cache by their content hash and the given settings, so that a repeated
+            reference image costs only a hash and a lookup (default is False).
+
     Returns:
         result (dict): A dictionary containing verification results.
 
@@ -105,18 +131,9 @@ def verify(
     )
     dims = model.output_shape
 
-    no_facial_area = {
-        "x": None,
-        "y": None,
-        "w": None,
-        "h": None,
-        "left_eye": None,
-        "right_eye": None,
-    }
-
     def extract_embeddings_and_facial_areas(
         img_path: Union[str, np.ndarray, List[float]], index: int
-    ) -> Tuple[List[List[float]], List[dict]]:
+    ) -> Tuple[List[np.ndarray], List[dict]]:
         """
         Extracts facial embeddings and corresponding facial areas from an
         image or returns pre-calculated embeddings.
@@ -130,23 +147,18 @@ def verify(
             img_path (Union[str, np.ndarray, List[float]]):
                 - A string representing the file path to an image,
                 - A NumPy array containing the image data,
-                - Or a list of pre-calculated embedding values (of type `float`).
+                - Or pre-calculated embedding values as a list or a 1D numpy array.
             index (int): An index value used in error messages and logging
             to identify the number of the image.
 
         Returns:
-            Tuple[List[List[float]], List[dict]]:
-                - A list containing lists of facial embeddings for each detected face.
+            Tuple[List[np.ndarray], List[dict]]:
+                - A list containing facial embeddings for each detected face.
                 - A list of dictionaries where each dictionary contains facial area information.
         """
-        if isinstance(img_path, list):
+        if __is_embedding(img_path):
             # given image is already pre-calculated embedding
-            if not all(isinstance(dim, (float, int)) for dim in img_path):
-
-                raise ValueError(
-                    f"When passing img{index}_path as a list,"
-                    " ensure that all its items are of type float."
-                )
+            img_embedding = __validate_embedding(img_path, index, model_name, dims)
 
             if silent is False:
                 logger.warn(
@@ -155,14 +167,8 @@ def verify(
                     f" for the {model_name} model."
                 )
 
-            if len(img_path) != dims:
-                raise ValueError(
-                    f"embeddings of {model_name} should have {dims} dimensions,"
-                    f" but {index}-th image has {len(img_path)} dimensions input"
-                )
-
-            img_embeddings = [img_path]
-            img_facial_areas = [no_facial_area]
+            img_embeddings = [img_embedding]
+            img_facial_areas = [dict(NO_FACIAL_AREA)]
         else:
             try:
                 img_embeddings, img_facial_areas = __extract_faces_and_embeddings(
@@ -174,6 +180,7 @@ def verify(
                     expand_percentage=expand_percentage,
                     normalization=normalization,
                     anti_spoofing=anti_spoofing,
+                    use_cache=use_cache,
                 )
             except ValueError as err:
                 raise ValueError(f"Exception while processing img{index}_path") from err
@@ -193,8 +200,8 @@ def verify(
     threshold = threshold or find_threshold(model_name, distance_metric)
     distance = float(min_distance)
     facial_areas = (
-        no_facial_area if min_idx is None else img1_facial_areas[min_idx],
-        no_facial_area if min_idy is None else img2_facial_areas[min_idy],
+        dict(NO_FACIAL_AREA) if min_idx is None else img1_facial_areas[min_idx],
+        dict(NO_FACIAL_AREA) if min_idy is None else img2_facial_areas[min_idy],
     )
 
     toc = time.time()
@@ -213,224 +220,338 @@ def verify(
     return resp_obj
 
 
-def __extract_faces_and_embeddings(
-    img_path: Union[str, np.ndarray],
+def verify_many(
+    pairs: Sequence[Tuple[Any, Any]],
     model_name: str = "VGG-Face",
     detector_backend: str = "opencv",
+    distance_metric: str = "cosine",
     enforce_detection: bool = True,
     align: bool = True,
     expand_percentage: int = 0,
     normalization: str = "base",
+    silent: bool = False,
+    threshold: Optional[float] = None,
     anti_spoofing: bool = False,
-) -> Tuple[List[List[float]], List[dict]]:
+    batch_size: int = 32,
+    detection_workers: int = 4,
+) -> List[Dict[str, Any]]:
     """
-    Extract facial areas and find corresponding embeddings for given image
+    Verify many image pairs at once.
+
+    Images appearing in several pairs are detected and represented only once. Faces of all
+    unique images are represented in batches, and distances of all face pairs are found in
+    vectorized form. Each pair keeps the closest face pair as in `verify`.
+
+    Args:
+        pairs (sequence of tuples): Image pairs. Each item of a pair accepts exact image path
+            as a string, numpy array (BGR), a file object opened in binary mode, base64
+            encoded images or pre-calculated embeddings. Numpy arrays, file objects and
+            embeddings are deduplicated by identity, paths and base64 strings by value.
+
+        batch_size (int): Number of faces represented in a single forward pass (default is 32).
+
+        detection_workers (int): Number of threads detecting faces of the unique images
+            concurrently (default is 4).
+
+        See `verify` for the other arguments.
+
     Returns:
-        embeddings (List[float])
-        facial areas (List[dict])
+        results (List[Dict[str, Any]]): A verification result for each pair in the same order
+            with the keys of `verify`. 'time' is the duration of the whole call.
     """
-    embeddings = []
-    facial_areas = []
+    tic = time.time()
 
-    img_objs = detection.extract_faces(
-        img_path=img_path,
-        detector_backend=detector_backend,
-        grayscale=False,
-        enforce_detection=enforce_detection,
-        align=align,
-        expand_percentage=expand_percentage,
-        anti_spoofing=anti_spoofing,
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be a positive integer but it is {batch_size}")
+
+    model: FacialRecognition = modeling.build_model(
+        task="facial_recognition", model_name=model_name
     )
+    dims = model.output_shape
 
-    # find embeddings for each face
-    for img_obj in img_objs:
-        if anti_spoofing is True and img_obj.get("is_real", True) is False:
-            raise ValueError("Spoof detected in given image.")
-        img_embedding_obj = representation.represent(
-            img_path=img_obj["face"],
+    # unique images, and the pair and side that they are first seen in error messages
+    image_ids: Dict[Any, int] = {}
+    images: List[Any] = []
+    first_seen: List[Tuple[int, int]] = []
+    pair_images = np.zeros((len(pairs), 2), dtype=np.int64)
+    for i, pair in enumerate(pairs):
+        if len(pair) != 2:
+            raise ValueError(f"{i}-th pair must have 2 images but it has {len(pair)}")
+        for side, img_path in enumerate(pair):
+            key = img_path if isinstance(img_path, str) else id(img_path)
+            if key not in image_ids:
+                image_ids[key] = len(images)
+                images.append(img_path)
+                first_seen.append((i, side + 1))
+            pair_images[i, side] = image_ids[key]
+
+    if silent is False and any(__is_embedding(img_path) for img_path in images):
+        logger.warn(
+            "You passed some images as pre-calculated embeddings."
+            "Please ensure that embeddings have been calculated"
+            f" for the {model_name} model."
+        )
+
+    def extract_faces(image_index: int) -> List[Dict[str, Any]]:
+        img_path = images[image_index]
+        pair_index, side = first_seen[image_index]
+        if __is_embedding(img_path):
+            embedding = __validate_embedding(img_path, side, model_name, dims)
+            return [{"embedding": embedding, "facial_area": dict(NO_FACIAL_AREA)}]
+        try:
+            img_objs = detection.extract_faces(
+                img_path=img_path,
+                detector_backend=detector_backend,
+                grayscale=False,
+                enforce_detection=enforce_detection,
+                align=align,
+                expand_percentage=expand_percentage,
+                anti_spoofing=anti_spoofing,
+            )
+        except ValueError as err:
+            raise ValueError(
+                f"Exception while processing img{side}_path of {pair_index}-th pair"
+            ) from err
+        if anti_spoofing is True and any(not img_obj.get("is_real", True) for img_obj in img_objs):
+            raise ValueError(f"Spoof detected in img{side}_path of {pair_index}-th pair.")
+        return img_objs
+
+    with ThreadPoolExecutor(max_workers=max(1, detection_workers)) as executor:
+        face_groups = list(executor.map(extract_faces, range(len(images))))
+
+    face_objs = [face_obj for face_group in face_groups for face_obj in face_group]
+    face_counts = np.array([len(face_group) for face_group in face_groups], dtype=np.int64)
+    face_starts = np.cumsum(face_counts) - face_counts
+
+    # faces of all images are represented in batches
+    embeddings = np.zeros((len(face_objs), dims), dtype=np.float32)
+    pending = [i for i, face_obj in enumerate(face_objs) if "embedding" not in face_obj]
+    for i, face_obj in enumerate(face_objs):
+        if "embedding" in face_obj:
+            embeddings[i] = face_obj["embedding"]
+    for start in range(0, len(pending), batch_size):
+        rows = pending[start : start + batch_size]
+        embedding_objs = representation.represent(
+            img_path=[face_objs[row]["face"] for row in rows],
             model_name=model_name,
             enforce_detection=enforce_detection,
             detector_backend="skip",
             align=align,
             normalization=normalization,
+            output="numpy",
         )
-        # already extracted face given, safe to access its 1st item
-        img_embedding = img_embedding_obj[0]["embedding"]
-        embeddings.append(img_embedding)
-        facial_areas.append(img_obj["facial_area"])
+        if len(rows) == 1:
+            embedding_objs = [embedding_objs]
+        embeddings[rows] = np.stack([objs[0]["embedding"] for objs in embedding_objs])
+
+    # every face of the 1st image is compared with every face of the 2nd one
+    left_counts = face_counts[pair_images[:, 0]]
+    right_counts = face_counts[pair_images[:, 1]]
+    combinations = left_counts * right_counts
+    pair_ids = np.repeat(np.arange(len(pairs)), combinations)
+    local = np.arange(pair_ids.shape[0]) - np.repeat(
+        np.cumsum(combinations) - combinations, combinations
+    )
+    right_repeated = np.repeat(right_counts, combinations)
+    left_rows = np.repeat(face_starts[pair_images[:, 0]], combinations) + local // right_repeated
+    right_rows = np.repeat(face_starts[pair_images[:, 1]], combinations) + local % right_repeated
 
-    return embeddings, facial_areas
+    distances = __find_paired_distances(embeddings, left_rows, right_rows, distance_metric)
 
+    # closest face pair of each image pair, the first one on ties as in verify
+    order = np.lexsort((distances, pair_ids))
+    firsts = np.searchsorted(pair_ids[order], np.arange(len(pairs)))
+    closest = order[firsts[combinations > 0]]
 
-def find_cosine_distance(
-    source_representation: Union[np.ndarray, list], test_representation: Union[np.ndarray, list]
-) -> Union[np.float64, np.ndarray]:
-    """
-    Find cosine distance between two given vectors or batches of vectors.
-    Args:
-        source_representation (np.ndarray or list): 1st vector or batch of vectors.
-        test_representation (np.ndarray or list): 2nd vector or batch of vectors.
-    Returns
-        np.float64 or np.ndarray: Calculated cosine distance(s).
-        It returns a np.float64 for single embeddings and np.ndarray for batch embeddings.
-    """
-    # Convert inputs to numpy arrays if necessary
-    source_representation = np.asarray(source_representation)
-    test_representation = np.asarray(test_representation)
-
-    if source_representation.ndim == 1 and test_representation.ndim == 1:
-        # single embedding
-        dot_product = np.dot(source_representation, test_representation)
-        source_norm = np.linalg.norm(source_representation)
-        test_norm = np.linalg.norm(test_representation)
-        distances = 1 - dot_product / (source_norm * test_norm)
-    elif source_representation.ndim == 2 and test_representation.ndim == 2:
-        # list of embeddings (batch)
-        source_normed = l2_normalize(source_representation, axis=1)  # (N, D)
-        test_normed = l2_normalize(test_representation, axis=1)  # (M, D)
-        cosine_similarities = np.dot(test_normed, source_normed.T)  # (M, N)
-        distances = 1 - cosine_similarities
-    else:
-        raise ValueError(
-            f"Embeddings must be 1D or 2D, but received "
-            f"source shape: {source_representation.shape}, test shape: {test_representation.shape}"
+    threshold = threshold or find_threshold(model_name, distance_metric)
+    toc = time.time()
+
+    resp_objs = []
+    pair_closest = dict(zip(pair_ids[closest].tolist(), closest.tolist()))
+    for i in range(len(pairs)):
+        best = pair_closest.get(i)
+        if best is None:
+            distance = float("inf")
+            facial_areas = (dict(NO_FACIAL_AREA), dict(NO_FACIAL_AREA))
+        else:
+            distance = float(distances[best])
+            facial_areas = (
+                face_objs[left_rows[best]]["facial_area"],
+                face_objs[right_rows[best]]["facial_area"],
+            )
+        resp_objs.append(
+            {
+                "verified": distance <= threshold,
+                "distance": distance,
+                "threshold": threshold,
+                "model": model_name,
+                "detector_backend": detector_backend,
+                "similarity_metric": distance_metric,
+                "facial_areas": {"img1": facial_areas[0], "img2": facial_areas[1]},
+                "time": round(toc - tic, 2),
+            }
         )
-    return distances
 
-def find_angular_distance(
-    source_representation: Union[np.ndarray, list], test_representation: Union[np.ndarray, list]
-) -> Union[np.float64, np.ndarray]:
-    """
-    Find angular distance between two vectors or batches of vectors.
+    return resp_objs
 
-    Args:
-        source_representation (np.ndarray or list): 1st vector or batch of vectors.
-        test_representation (np.ndarray or list): 2nd vector or batch of vectors.
 
-    Returns:
-        np.float64 or np.ndarray: angular distance(s).
-            Returns a np.float64 for single embeddings and np.ndarray for batch embeddings.
+def __is_embedding(img_path: Any) -> bool:
     """
-
-    # calculate cosine similarity first
-    # then convert to angular distance
-    source_representation = np.asarray(source_representation)
-    test_representation = np.asarray(test_representation)
-
-    if source_representation.ndim == 1 and test_representation.ndim == 1:
-        # single embedding
-        dot_product = np.dot(source_representation, test_representation)
-        source_norm = np.linalg.norm(source_representation)
-        test_norm = np.linalg.norm(test_representation)
-        similarity = dot_product / (source_norm * test_norm)
-        distances = np.arccos(similarity) / np.pi
-    elif source_representation.ndim == 2 and test_representation.ndim == 2:
-        # list of embeddings (batch)
-        source_normed = l2_normalize(source_representation, axis=1)  # (N, D)
-        test_normed = l2_normalize(test_representation, axis=1)  # (M, D)
-        similarity = np.dot(test_normed, source_normed.T)  # (M, N)
-        distances = np.arccos(similarity) / np.pi
-    else:
-        raise ValueError(
-            f"Embeddings must be 1D or 2D, but received "
-            f"source shape: {source_representation.shape}, test shape: {test_representation.shape}"
-        )
-    return distances
-
-def find_euclidean_distance(
-    source_representation: Union[np.ndarray, list], test_representation: Union[np.ndarray, list]
-) -> Union[np.float64, np.ndarray]:
+    Check if a pre-calculated embedding is passed instead of an image
     """
-    Find Euclidean distance between two vectors or batches of vectors.
+    return isinstance(img_path, list) or (isinstance(img_path, np.ndarray) and img_path.ndim == 1)
 
-    Args:
-        source_representation (np.ndarray or list): 1st vector or batch of vectors.
-        test_representation (np.ndarray or list): 2nd vector or batch of vectors.
 
+def __validate_embedding(
+    embedding: Union[List[float], np.ndarray], index: int, model_name: str, dims: int
+) -> np.ndarray:
+    """
+    Validate a pre-calculated embedding passed instead of an image
     Returns:
-        np.float64 or np.ndarray: Euclidean distance(s).
-            Returns a np.float64 for single embeddings and np.ndarray for batch embeddings.
+        embedding (np.ndarray): given embedding as a numeric vector
     """
-    # Convert inputs to numpy arrays if necessary
-    source_representation = np.asarray(source_representation)
-    test_representation = np.asarray(test_representation)
-
-    # Single embedding case (1D arrays)
-    if source_representation.ndim == 1 and test_representation.ndim == 1:
-        distances = np.linalg.norm(source_representation - test_representation)
-    # Batch embeddings case (2D arrays)
-    elif source_representation.ndim == 2 and test_representation.ndim == 2:
-        diff = (
-            source_representation[None, :, :] - test_representation[:, None, :]
-        )  # (N, D) - (M, D)  = (M, N, D)
-        distances = np.linalg.norm(diff, axis=2)  # (M, N)
-    else:
+    # items are checked at once by the type of the array instead of one by one
+    try:
+        vector = np.asarray(embedding)
+    except ValueError:
+        # ragged nested lists
+        vector = np.zeros((0, 0))
+    if vector.ndim != 1 or vector.dtype.kind not in "biuf":
+        kind = "a list" if isinstance(embedding, list) else "a numpy array"
+        raise ValueError(
+            f"When passing img{index}_path as {kind},"
+            " ensure that all its items are of type float."
+        )
+
+    if vector.shape[0] != dims:
         raise ValueError(
-            f"Embeddings must be 1D or 2D, but received "
-            f"source shape: {source_representation.shape}, test shape: {test_representation.shape}"
+            f"embeddings of {model_name} should have {dims} dimensions,"
+            f" but {index}-th image has {vector.shape[0]} dimensions input"
         )
-    return distances
+    return vector
 
 
-def l2_normalize(
-    x: Union[np.ndarray, list], axis: Union[int, None] = None, epsilon: float = 1e-10
+def __find_paired_distances(
+    embeddings: np.ndarray,
+    left_rows: np.ndarray,
+    right_rows: np.ndarray,
+    distance_metric: str,
+    chunk_size: int = DISTANCE_CHUNK_SIZE,
 ) -> np.ndarray:
     """
-    Normalize input vector with l2
-    Args:
-        x (np.ndarray or list): given vector
-        axis (int): axis along which to normalize
+    Find distances of given row pairs of an embedding matrix chunk by chunk, norms of the
+    matrix are found once instead of once per pair
     Returns:
-        np.ndarray: l2 normalized vector
+        distances (np.ndarray): distance of each row pair rounded to 6 decimals
     """
-    # Convert inputs to numpy arrays if necessary
-    x = np.asarray(x)
-    norm = np.linalg.norm(x, axis=axis, keepdims=True)
-    return x / (norm + epsilon)
+    norms = np.linalg.norm(embeddings, axis=1)
+    distances = np.empty(left_rows.shape[0])
+    for start in range(0, left_rows.shape[0], chunk_size):
+        end = min(start + chunk_size, left_rows.shape[0])
+        left, right = embeddings[left_rows[start:end]], embeddings[right_rows[start:end]]
+        left_norms, right_norms = norms[left_rows[start:end]], norms[right_rows[start:end]]
+
+        if distance_metric == "euclidean":
+            distances[start:end] = np.linalg.norm(left - right, axis=1)
+        elif distance_metric == "euclidean_l2":
+            distances[start:end] = np.linalg.norm(
+                left / (left_norms[:, None] + 1e-10) - right / (right_norms[:, None] + 1e-10),
+                axis=1,
+            )
+        else:
+            similarities = np.einsum("ij,ij->i", left, right) / (left_norms * right_norms)
+            if distance_metric == "cosine":
+                distances[start:end] = 1 - similarities
+            elif distance_metric == "angular":
+                distances[start:end] = np.arccos(np.clip(similarities, -1, 1)) / np.pi
+            else:
+                raise ValueError("Invalid distance_metric passed - ", distance_metric)
+    return np.round(distances, 6)
 
 
-def find_distance(
-    alpha_embedding: Union[np.ndarray, list],
-    beta_embedding: Union[np.ndarray, list],
-    distance_metric: str,
-) -> Union[np.float64, np.ndarray]:
+def __extract_faces_and_embeddings(
+    img_path: Union[str, np.ndarray],
+    model_name: str = "VGG-Face",
+    detector_backend: str = "opencv",
+    enforce_detection: bool = True,
+    align: bool = True,
+    expand_percentage: int = 0,
+    normalization: str = "base",
+    anti_spoofing: bool = False,
+    use_cache: bool = False,
+) -> Tuple[List[np.ndarray], List[dict]]:
     """
-    Wrapper to find the distance between vectors based on the specified distance metric.
-
-    Args:
-        alpha_embedding (np.ndarray or list): 1st vector or batch of vectors.
-        beta_embedding (np.ndarray or list): 2nd vector or batch of vectors.
-        distance_metric (str): The type of distance to compute
-            ('cosine', 'euclidean', 'euclidean_l2', or 'angular').
-
+    Extract facial areas and find corresponding embeddings for given image
     Returns:
-        np.float64 or np.ndarray: The calculated distance(s).
+        embeddings (List[np.ndarray])
+        facial areas (List[dict])
     """
-    # Convert inputs to numpy arrays if necessary
-    alpha_embedding = np.asarray(alpha_embedding)
-    beta_embedding = np.asarray(beta_embedding)
+    embeddings = []
+    facial_areas = []
 
-    # Ensure that both embeddings are either 1D or 2D
-    if alpha_embedding.ndim != beta_embedding.ndim or alpha_embedding.ndim not in (1, 2):
-        raise ValueError(
-            f"Both embeddings must be either 1D or 2D, but received "
-            f"alpha shape: {alpha_embedding.shape}, beta shape: {beta_embedding.shape}"
+    cache_key = None
+    if use_cache is True:
+        # raw content is hashed, so that the image is decoded on a miss only
+        content, img_path = embedding_cache.read_image_content(img_path)
+        cache_key = embedding_cache.find_cache_key(
+            content,
+            task="verify",
+            model_name=model_name,
+            model_variant=modeling.find_model_variant(
+                task="facial_recognition", model_name=model_name
+            ),
+            detector_backend=detector_backend,
+            enforce_detection=enforce_detection,
+            align=align,
+            expand_percentage=expand_percentage,
+            normalization=normalization,
+            anti_spoofing=anti_spoofing,
         )
+        cached_faces = embedding_cache.get_embedding_cache().get(cache_key)
+        if cached_faces is not None:
+            return (
+                [face["embedding"] for face in cached_faces],
+                [face["facial_area"] for face in cached_faces],
+            )
+
+    img_objs = detection.extract_faces(
+        img_path=img_path,
+        detector_backend=detector_backend,
+        grayscale=False,
+        enforce_detection=enforce_detection,
+        align=align,
+        expand_percentage=expand_percentage,
+        anti_spoofing=anti_spoofing,
+    )
 
-    if distance_metric == "cosine":
-        distance = find_cosine_distance(alpha_embedding, beta_embedding)
-    elif distance_metric == "angular":
-        distance = find_angular_distance(alpha_embedding, beta_embedding)
-    elif distance_metric == "euclidean":
-        distance = find_euclidean_distance(alpha_embedding, beta_embedding)
-    elif distance_metric == "euclidean_l2":
-        axis = None if alpha_embedding.ndim == 1 else 1
-        normalized_alpha = l2_normalize(alpha_embedding, axis=axis)
-        normalized_beta = l2_normalize(beta_embedding, axis=axis)
-        distance = find_euclidean_distance(normalized_alpha, normalized_beta)
-    else:
-        raise ValueError("Invalid distance_metric passed - ", distance_metric)
-    return np.round(distance, 6)
+    # find embeddings for each face
+    for img_obj in img_objs:
+        if anti_spoofing is True and img_obj.get("is_real", True) is False:
+            raise ValueError("Spoof detected in given image.")
+        img_embedding_obj = representation.represent(
+            img_path=img_obj["face"],
+            model_name=model_name,
+            enforce_detection=enforce_detection,
+            detector_backend="skip",
+            align=align,
+            normalization=normalization,
+            output="numpy",
+        )
+        # already extracted face given, safe to access its 1st item
+        img_embedding = img_embedding_obj[0]["embedding"]
+        embeddings.append(img_embedding)
+        facial_areas.append(img_obj["facial_area"])
+
+    if cache_key is not None:
+        embedding_cache.get_embedding_cache().put(
+            cache_key,
+            [
+                {"embedding": embedding, "facial_area": facial_area}
+                for embedding, facial_area in zip(embeddings, facial_areas)
+            ],
+        )
+
+    return embeddings, facial_areas
 
 
 def find_threshold(model_name: str, distance_metric: str) -> float:
@@ -0,0 +1,205 @@
+# built-in dependencies
+import os
+import sys
+import time
+import subprocess
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# 3rd party dependencies
+import numpy as np
+
+# project dependencies
+from deepface.modules import modeling
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+# readiness of each model by task and model name, e.g. facial_recognition/Facenet
+readiness: Dict[str, Dict[str, Any]] = {}
+readiness_lock = threading.Lock()
+
+# shape of the blank frame detectors are warmed up with, as (height, width, channels)
+DETECTOR_FRAME_SHAPE = (480, 640, 3)
+
+
+def warmup(
+    models: Optional[List[str]] = None,
+    detectors: Optional[List[str]] = None,
+    batch_sizes: Sequence[int] = (1,),
+    background: bool = True,
+) -> Optional[threading.Thread]:
+    """
+    Build models and run dummy inference on them, so that the first request does not pay
+    for weight loading, graph construction and tracing. Models which are warming up or
+    ready in this process already are skipped, so that it can be called repeatedly.
+
+    Args:
+        models (list): models as task/model_name, or model_name for facial recognition
+            models, e.g. ["VGG-Face", "facial_attribute/Age"]
+        detectors (list): face detector backends, e.g. ["opencv", "retinaface"]
+        batch_sizes (list): number of faces dummy inference runs with (default is (1,))
+        background (bool): warm up in a daemon thread, otherwise block until models are
+            ready (default is True)
+
+    Returns:
+        thread (threading.Thread): background thread, None if background is False or every
+            model is warming up or ready already
+    """
+    keys = find_model_keys(models or []) + [
+        ("face_detector", detector) for detector in detectors or []
+    ]
+
+    pending = []
+    with readiness_lock:
+        for task, model_name in keys:
+            name = f"{task}/{model_name}"
+            if name in readiness and readiness[name]["state"] != "failed":
+                continue
+            readiness[name] = {"state": "pending", "error": None, "seconds": None}
+            pending.append((task, model_name))
+
+    if len(pending) == 0:
+        return None
+
+    if not background:
+        __warm_up(pending, batch_sizes)
+        return None
+
+    thread = threading.Thread(
+        target=__warm_up, args=(pending, batch_sizes), name="deepface-warmup", daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def download_weights(models: List[str]) -> bool:
+    """
+    Download the weights of models in a separate process, e.g. in a server master process
+    before its workers are forked. Tensorflow is not fork safe once its runtime is
+    initialized, so models built before the fork cannot be used by forked workers. Models
+    are built in a new interpreter instead, and this process only imports modules. Each
+    worker then builds its own copy of the models from the downloaded weights.
+    Args:
+        models (list): models as task/model_name, or model_name for facial recognition
+            models, e.g. ["VGG-Face", "facial_attribute/Age"]
+    Returns:
+        downloaded (bool): True if every model could be built, failures are logged and
+            reported by the warm up of the workers then
+    """
+    if len(find_model_keys(models)) == 0:
+        return True
+    script = "import sys; from deepface.modules import warmup; warmup.build_models(sys.argv[1:])"
+    result = subprocess.run([sys.executable, "-c", script, *models], check=False)
+    if result.returncode != 0:
+        logger.error(f"weights of {', '.join(models)} cannot be downloaded")
+        return False
+    logger.info(f"weights of {', '.join(models)} are downloaded")
+    return True
+
+
+def build_models(models: List[str]) -> None:
+    """
+    Build models in this process without running inference on them
+    Args:
+        models (list): models as task/model_name, or model_name for facial recognition
+            models, e.g. ["VGG-Face", "facial_attribute/Age"]
+    """
+    for task, model_name in find_model_keys(models):
+        modeling.build_model(task=task, model_name=model_name)
+
+
+def get_readiness() -> Dict[str, Dict[str, Any]]:
+    """
+    Readiness of the models warmed up in this process
+    Returns:
+        readiness (dict): state of each model by task and model name, with keys state as
+            pending, building, warming, ready or failed, error as the failure message and
+            seconds as the duration of building and warming up
+    """
+    with readiness_lock:
+        return {name: dict(state) for name, state in readiness.items()}
+
+
+def is_ready() -> bool:
+    """
+    Check if every model passed to warmup in this process is ready
+    Returns:
+        ready (bool): True if no model is pending, building, warming or failed
+    """
+    with readiness_lock:
+        return all(state["state"] == "ready" for state in readiness.values())
+
+
+def find_model_keys(models: List[str]) -> List[Tuple[str, str]]:
+    """
+    Parse models given as task/model_name, or model_name for facial recognition models
+    Args:
+        models (list): e.g. ["VGG-Face", "facial_attribute/Age"]
+    Returns:
+        keys (list): task and model name of each model
+    """
+    keys = []
+    for model in models:
+        model = model.strip()
+        if model == "":
+            continue
+        task, _, model_name = model.rpartition("/")
+        keys.append((task or "facial_recognition", model_name))
+    return keys
+
+
+def __warm_up(keys: List[Tuple[str, str]], batch_sizes: Sequence[int]) -> None:
+    for task, model_name in keys:
+        name = f"{task}/{model_name}"
+        tic = time.time()
+        try:
+            __set_state(name, "building")
+            client = modeling.build_model(task=task, model_name=model_name)
+            __set_state(name, "warming")
+            __run_dummy_inference(task, client, batch_sizes)
+        except Exception as err:  # pylint: disable=broad-except
+            logger.error(f"{name} cannot be warmed up: {err}")
+            __set_state(name, "failed", error=str(err), seconds=time.time() - tic)
+            continue
+
+        seconds = time.time() - tic
+        __set_state(name, "ready", seconds=seconds)
+        logger.info(f"{name} is warmed up in {seconds:.2f} seconds")
+
+
+def __run_dummy_inference(task: str, client: Any, batch_sizes: Sequence[int]) -> None:
+    if task == "face_detector":
+        client.detect_faces(np.zeros(DETECTOR_FRAME_SHAPE, dtype=np.uint8))
+        return
+
+    if task == "spoofing":
+        img = np.zeros(DETECTOR_FRAME_SHAPE, dtype=np.uint8)
+        client.analyze(img=img, facial_area=(0, 0, 224, 224))
+        return
+
+    for batch_size in batch_sizes:
+        if task == "facial_recognition":
+            width, height = client.input_shape
+            client.forward(np.zeros((batch_size, height, width, 3)), output="numpy")
+        elif task == "facial_attribute":
+            # attribute models take (224, 224, 3) shaped faces as analyze does
+            client.predict(np.zeros((batch_size, 224, 224, 3), dtype=np.uint8))
+
+
+def __set_state(
+    name: str, state: str, error: Optional[str] = None, seconds: Optional[float] = None
+) -> None:
+    with readiness_lock:
+        readiness[name] = {"state": state, "error": error, "seconds": seconds}
+
+
+def __reset_after_fork() -> None:
+    # warm up threads of the parent do not exist in forked children
+    global readiness_lock  # pylint: disable=global-statement
+    readiness_lock = threading.Lock()
+    readiness.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=__reset_after_fork)
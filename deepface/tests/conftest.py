@@ -0,0 +1,18 @@
+# 3rd party dependencies
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def build_gallery():
+    """
+    Build random embeddings of a gallery whose rows are all valid
+    """
+
+    def build(num_rows: int, dims: int = 32):
+        rng = np.random.default_rng(seed=0)
+        embeddings = rng.normal(size=(num_rows, dims)).astype(np.float32)
+        identities = np.array([f"img{i}.jpg" for i in range(num_rows)])
+        return embeddings, np.ones(num_rows, dtype=bool), identities
+
+    return build
@@ -0,0 +1,51 @@
+# 3rd party dependencies
+import numpy as np
+
+# project dependencies
+from deepface.modules.ann import IVFIndex
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+
+def test_probing_all_lists_returns_all_rows(tmp_path, build_gallery):
+    embeddings, valid_mask, identities = build_gallery(500)
+    valid_mask[7] = False
+
+    index = IVFIndex(path=str(tmp_path / "ivf.npz"), normalized=True)
+    index.sync(embeddings, valid_mask, identities)
+
+    nlist = index.centroids.shape[0]
+    candidates = index.search(embeddings[:3], nprobe=nlist)
+    for rows in candidates:
+        assert sorted(rows.tolist()) == [i for i in range(500) if i != 7]
+
+    # closest list of a gallery vector contains itself
+    candidates = index.search(embeddings[10:60], nprobe=1)
+    assert all(i + 10 in rows for i, rows in enumerate(candidates))
+
+    logger.info("✅ test ivf index search done")
+
+
+def test_incremental_sync_and_persistence(tmp_path, build_gallery):
+    embeddings, valid_mask, identities = build_gallery(600)
+
+    index = IVFIndex(path=str(tmp_path / "ivf.npz"), normalized=False)
+    index.sync(embeddings[:500], valid_mask[:500], identities[:500])
+    centroids = index.centroids.copy()
+
+    index.sync(embeddings, valid_mask, identities)
+    assert index.assignments.shape[0] == 600
+    # new rows are assigned to existing lists without re-training
+    assert np.array_equal(index.centroids, centroids)
+
+    reloaded = IVFIndex(path=str(tmp_path / "ivf.npz"), normalized=False)
+    assert np.array_equal(reloaded.assignments, index.assignments)
+    nlist = reloaded.centroids.shape[0]
+    assert sorted(reloaded.search(embeddings[:1], nprobe=nlist)[0].tolist()) == list(range(600))
+
+    # rows of a re-laid out gallery are assigned again
+    reloaded.sync(embeddings[100:], valid_mask[100:], identities[100:])
+    assert reloaded.assignments.shape[0] == 500
+
+    logger.info("✅ test ivf index incremental sync done")
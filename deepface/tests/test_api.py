@@ -253,6 +253,23 @@ class TestVerifyEndpoint(unittest.TestCase):
         assert response.status_code == 400
         logger.info("✅ invalid represent request api test is done")
 
+    def test_health(self):
+        response = self.app.get("/health")
+        assert response.status_code in [200, 503]
+        assert response.json["ready"] == (response.status_code == 200)
+        logger.info("✅ health api test is done")
+
+    def test_memory(self):
+        self.app.post("/represent", json={"img": "dataset/img1.jpg", "model_name": "Facenet"})
+
+        response = self.app.get("/memory")
+        assert response.status_code == 200
+        result = response.json
+        assert result["pid"] == os.getpid()
+        assert 0 < result["uss"] <= result["rss"]
+        assert "facial_recognition/Facenet" in result["models"]
+        logger.info("✅ memory api test is done")
+
     def test_invalid_analyze(self):
         data = {
             "img": "dataset/invalid.jpg",
@@ -0,0 +1,113 @@
+# built-in dependencies
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# 3rd party dependencies
+import numpy as np
+import pytest
+
+# project dependencies
+from deepface.modules import batching
+from deepface.modules.batching import MicroBatcher
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+
+def test_concurrent_requests_are_batched():
+    batch_sizes = []
+
+    def infer(inputs: np.ndarray) -> np.ndarray:
+        batch_sizes.append(inputs.shape[0])
+        return inputs.sum(axis=(1, 2))
+
+    batcher = MicroBatcher(infer=infer, name="test", max_batch_size=8, max_delay=0.2)
+    barrier = threading.Barrier(8)
+
+    def submit(i: int) -> np.ndarray:
+        barrier.wait()
+        return batcher.submit(np.full((1, 2, 2), i, dtype=np.float32))
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(submit, range(8)))
+    finally:
+        batcher.close()
+
+    # each caller gets its own rows back
+    for i, result in enumerate(results):
+        assert result.shape == (1,)
+        assert result[0] == 4 * i
+
+    assert sum(batch_sizes) == 8
+    assert len(batch_sizes) < 8
+    metrics = batcher.metrics()
+    assert metrics["requests"] == 8
+    assert metrics["rows"] == 8
+    assert metrics["queue_depth"] == 0
+    assert metrics["max_batch_size"] == max(batch_sizes)
+
+    logger.info("✅ test concurrent requests are batched done")
+
+
+def test_errors_are_raised_to_callers():
+    def infer(inputs: np.ndarray) -> np.ndarray:
+        raise ValueError("broken model")
+
+    batcher = MicroBatcher(infer=infer, name="test", max_batch_size=4, max_delay=0.001)
+    try:
+        with pytest.raises(ValueError, match="broken model"):
+            batcher.submit(np.zeros((1, 3)))
+    finally:
+        batcher.close()
+
+    logger.info("✅ test batching errors done")
+
+
+def test_schedule_without_micro_batching():
+    batching.disable_micro_batching()
+    outputs = batching.schedule("test/identity", lambda inputs: inputs * 2, np.ones((3, 2)))
+    assert np.array_equal(outputs, np.full((3, 2), 2))
+    assert batching.get_batching_metrics() == {}
+
+    batching.enable_micro_batching(max_batch_size=4, max_delay=0.001)
+    try:
+        outputs = batching.schedule("test/identity", lambda inputs: inputs * 2, np.ones((1, 2)))
+        assert np.array_equal(outputs, np.full((1, 2), 2))
+        assert batching.get_batching_metrics()["test/identity"]["rows"] == 1
+    finally:
+        batching.disable_micro_batching()
+
+    logger.info("✅ test schedule without micro batching done")
+
+
+def test_rebuilt_models_are_not_scheduled_through_released_ones():
+    class Client:
+        def __init__(self, factor: float):
+            self.factor = factor
+
+        def infer(self, inputs: np.ndarray) -> np.ndarray:
+            return inputs * self.factor
+
+    batching.enable_micro_batching(max_batch_size=4, max_delay=0.001)
+    try:
+        released = Client(2)
+        batching.schedule("test/client", released.infer, np.ones((1, 2)))
+        batching.release_batcher("test/client", owner=released)
+
+        # a caller still holding the released model does not schedule it again
+        outputs = batching.schedule("test/client", released.infer, np.ones((1, 2)))
+        assert np.array_equal(outputs, np.full((1, 2), 2))
+        assert "test/client" not in batching.get_batching_metrics()
+
+        rebuilt = Client(3)
+        outputs = batching.schedule("test/client", rebuilt.infer, np.ones((1, 2)))
+        assert np.array_equal(outputs, np.full((1, 2), 3))
+        assert batching.batchers["test/client"].owner is rebuilt
+        outputs = batching.schedule("test/client", released.infer, np.ones((1, 2)))
+        assert np.array_equal(outputs, np.full((1, 2), 2))
+        assert batching.batchers["test/client"].owner is rebuilt
+    finally:
+        batching.disable_micro_batching()
+
+    logger.info("✅ test rebuilt models are scheduled separately done")
@@ -1,10 +1,15 @@
 # built-in dependencies
 import os
+import time
+import multiprocessing
 from unittest import mock
 import pytest
 
+# 3rd party dependencies
+import numpy as np
+
 # project dependencies
-from deepface.commons import folder_utils, weight_utils, package_utils
+from deepface.commons import folder_utils, weight_utils, package_utils, memory_utils
 from deepface.commons.logger import Logger
 
 # pylint: disable=unused-argument
@@ -253,3 +258,30 @@ class TestDownloadWeightFeature:
         with pytest.raises(ValueError, match="unimplemented compress type - 7z"):
             _ = weight_utils.download_weights_if_necessary(file_name, source_url, compress_type)
         logger.info("✅ test download weights for unsupported compress type is done")
+
+
+@pytest.mark.skipif(not os.path.isfile("/proc/self/smaps_rollup"), reason="requires linux")
+def test_memory_usage_of_forked_workers():
+    usage = memory_utils.find_memory_usage()
+    assert 0 < usage["uss"] <= usage["pss"] <= usage["rss"]
+
+    # pages of the parent stay shared with a forked child until they are written
+    payload = np.ones(16 * 1024 * 1024, dtype=np.uint8)
+    worker = multiprocessing.get_context("fork").Process(target=time.sleep, args=(2,))
+    worker.start()
+    try:
+        time.sleep(0.5)
+        usages = memory_utils.find_workers_memory_usage()
+        assert worker.pid in usages
+        assert usages[worker.pid]["shared"] >= payload.nbytes
+        assert usages[worker.pid]["uss"] < payload.nbytes
+    finally:
+        worker.join()
+
+    # workers which exited are skipped instead of failing the measurement
+    with pytest.raises(ValueError, match="cannot be measured"):
+        memory_utils.find_memory_usage(pid=worker.pid)
+    assert worker.pid not in memory_utils.find_workers_memory_usage()
+    assert memory_utils.find_workers_memory_usage(pid=2**22 + 1) == {}
+
+    logger.info("✅ test memory usage of forked workers done")
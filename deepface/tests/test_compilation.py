@@ -0,0 +1,43 @@
+# 3rd party dependencies
+import cv2
+import numpy as np
+
+# project dependencies
+from deepface import DeepFace
+from deepface.modules import compilation
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+
+def test_buckets():
+    assert compilation.find_buckets(1) == [1]
+    assert compilation.find_buckets(32) == [1, 2, 4, 8, 16, 32]
+    assert compilation.find_buckets(20) == [1, 2, 4, 8, 16, 32]
+    logger.info("✅ test buckets done")
+
+
+def test_compiled_inference_matches_eager_inference():
+    model = DeepFace.build_model("Facenet")
+    rng = np.random.default_rng(seed=0)
+    batch = rng.uniform(size=(11, 160, 160, 3)).astype(np.float32)
+    eager = [model.forward(batch[:size], output="numpy") for size in [1, 3, 11]]
+
+    DeepFace.enable_compiled_inference(max_batch_size=4)
+    try:
+        # models built so far are warmed up once enabled
+        compiled_model = model.compiled_model
+        assert compiled_model.buckets == [1, 2, 4]
+        for size, expected in zip([1, 3, 11], eager):
+            embeddings = model.forward(batch[:size], output="numpy")
+            assert embeddings.shape == expected.shape
+            assert np.allclose(embeddings, expected, atol=1e-4)
+        assert model.compiled_model is compiled_model
+
+        img = cv2.resize(cv2.imread("dataset/img1.jpg"), (224, 224))
+        results = DeepFace.build_model("Gender", task="facial_attribute").predict([img] * 3)
+        assert results.shape == (3, 2)
+    finally:
+        DeepFace.disable_compiled_inference()
+
+    logger.info("✅ test compiled inference matches eager inference done")
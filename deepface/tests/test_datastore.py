@@ -0,0 +1,108 @@
+# 3rd party dependencies
+import numpy as np
+import pytest
+
+# project dependencies
+from deepface.modules import datastore
+from deepface.modules.datastore import EmbeddingStore
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+
+def build_representation(idx: int, embedding):
+    return {
+        "identity": f"img{idx}.jpg",
+        "hash": f"hash{idx}",
+        "embedding": embedding,
+        "target_x": idx,
+        "target_y": idx,
+        "target_w": 10,
+        "target_h": 10,
+    }
+
+
+def test_append_and_reopen(tmp_path):
+    store = EmbeddingStore(str(tmp_path / "store"))
+    store.append([build_representation(0, None)])
+    store.append([build_representation(1, [1.0, 2.0, 3.0]), build_representation(2, [4, 5, 6])])
+
+    reopened = EmbeddingStore(str(tmp_path / "store"))
+    assert len(reopened) == 3
+    assert reopened.dims == 3
+    assert isinstance(reopened.embeddings, np.memmap)
+    assert reopened.embeddings.dtype == np.float32
+    assert reopened.valid_mask.tolist() == [False, True, True]
+    assert np.allclose(reopened.embeddings[2], [4, 5, 6])
+    assert reopened.metadata["identity"].tolist() == ["img0.jpg", "img1.jpg", "img2.jpg"]
+
+    # embedding matrix is a regular .npy file
+    assert np.load(str(tmp_path / "store" / "embeddings.npy")).shape == (3, 3)
+
+    logger.info("✅ test append and reopen embedding store done")
+
+
+def test_remove_and_compact(tmp_path):
+    store = EmbeddingStore(str(tmp_path / "store"))
+    store.append([build_representation(i, [float(i)] * 4) for i in range(4)])
+
+    store.remove(["img1.jpg"])
+    assert store.size == 4
+    assert len(store) == 3
+    assert "img1.jpg" not in store.identities()
+
+    # tombstoned rows exceed the compaction ratio
+    store.remove(["img0.jpg", "img2.jpg"])
+    assert store.size == 1
+    assert store.to_representations()[0]["embedding"] == [3.0] * 4
+    assert np.load(str(tmp_path / "store" / "embeddings.npy")).tolist() == [[3.0] * 4]
+
+    # alive rows are copied in chunks rather than loaded at once
+    matrix = np.arange(20, dtype=np.float32).reshape(5, 4)
+    rows = np.array([0, 2, 3, 4])
+    datastore._copy_npy_rows(str(tmp_path / "copy.npy"), matrix, rows, chunk_size=3)
+    assert np.array_equal(np.load(str(tmp_path / "copy.npy")), matrix[rows])
+
+    logger.info("✅ test remove and compact embedding store done")
+
+
+def test_norms_are_stored(tmp_path):
+    store = EmbeddingStore(str(tmp_path / "store"))
+    store.append([build_representation(0, None), build_representation(1, [3.0, 4.0])])
+    assert np.allclose(store.norms, [0, 5])
+
+    # stores created without norms find them once while opening
+    with np.load(store.metadata_path) as data:
+        columns = {key: data[key] for key in data.files if key != "norm"}
+    np.savez(store.metadata_path, **columns)
+
+    reopened = EmbeddingStore(str(tmp_path / "store"))
+    assert np.allclose(reopened.norms, [0, 5])
+    with np.load(store.metadata_path) as data:
+        assert "norm" in data.files
+
+    logger.info("✅ test embedding store norms done")
+
+
+def test_interrupted_append_is_overwritten(tmp_path):
+    store = EmbeddingStore(str(tmp_path / "store"))
+    store.append([build_representation(0, [1.0, 1.0])])
+
+    # simulate an append interrupted before its metadata was saved
+    store._write_rows(np.full((5, 2), 9, dtype=np.float32))
+    reopened = EmbeddingStore(str(tmp_path / "store"))
+    assert len(reopened) == 1
+
+    reopened.append([build_representation(1, [2.0, 2.0])])
+    assert np.load(str(tmp_path / "store" / "embeddings.npy")).tolist() == [[1, 1], [2, 2]]
+
+    logger.info("✅ test interrupted append done")
+
+
+def test_dimension_mismatch(tmp_path):
+    store = EmbeddingStore(str(tmp_path / "store"))
+    store.append([build_representation(0, [1.0, 1.0])])
+    with pytest.raises(ValueError, match="must have same dimensions"):
+        store.append([build_representation(1, [1.0, 1.0, 1.0])])
+
+    logger.info("✅ test dimension mismatch done")
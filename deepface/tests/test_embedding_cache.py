@@ -0,0 +1,122 @@
+# built-in dependencies
+import io
+import os
+from unittest import mock
+
+# 3rd party dependencies
+import numpy as np
+
+# project dependencies
+from deepface.modules import modeling
+from deepface.modules.embedding_cache import (
+    EmbeddingCache,
+    find_cache_key,
+    read_image_content,
+    FACE_OVERHEAD,
+)
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+
+def build_faces(value: float, dims: int = 16):
+    return [{"embedding": [value] * dims, "facial_area": {"x": 0, "y": 0, "w": 5, "h": 5}}]
+
+
+def test_cache_key_follows_content_and_settings():
+    img = np.zeros((8, 8, 3), dtype=np.uint8)
+    key = find_cache_key(img, model_name="Facenet", align=True)
+
+    assert find_cache_key(img.copy(), align=True, model_name="Facenet") == key
+    assert find_cache_key(img, model_name="Facenet", align=False) != key
+
+    changed = img.copy()
+    changed[0, 0, 0] = 1
+    assert find_cache_key(changed, model_name="Facenet", align=True) != key
+
+    logger.info("✅ test embedding cache key done")
+
+
+def test_cache_key_follows_model_variant():
+    base_env = {
+        key: value
+        for key, value in os.environ.items()
+        if key not in {"DEEPFACE_BACKEND", "DEEPFACE_QUANTIZATION"}
+    }
+    variants = set()
+    for env in [
+        {},
+        {"DEEPFACE_BACKEND": "onnx"},
+        {"DEEPFACE_QUANTIZATION": "dynamic"},
+        {"DEEPFACE_QUANTIZATION": "static"},
+    ]:
+        with mock.patch.dict(os.environ, {**base_env, **env}, clear=True):
+            variants.add(
+                modeling.find_model_variant(task="facial_recognition", model_name="Facenet")
+            )
+    # keras, onnx runtime and int8 embeddings are never served to each other
+    assert len(variants) == 4
+
+    with mock.patch.dict(os.environ, {"DEEPFACE_BACKEND": "onnx"}):
+        assert modeling.find_model_variant(task="facial_recognition", model_name="SFace") == "SFace"
+
+    logger.info("✅ test embedding cache key of model variants done")
+
+
+def test_files_are_addressed_by_raw_content():
+    img_path = "dataset/img1.jpg"
+    with open(img_path, "rb") as f:
+        raw = f.read()
+
+    content, img = read_image_content(img_path)
+    assert content == raw
+    assert img == img_path
+
+    # file objects are consumed, so that their bytes are loaded on a miss
+    content, img = read_image_content(io.BytesIO(raw))
+    assert content == raw
+    assert img.read() == raw
+    assert find_cache_key(raw, model_name="Facenet") != find_cache_key(
+        raw[:-1], model_name="Facenet"
+    )
+
+    pixels = np.zeros((8, 8, 3), dtype=np.uint8)
+    content, img = read_image_content(pixels)
+    assert content is pixels and img is pixels
+
+    logger.info("✅ test embedding cache raw content done")
+
+
+def test_least_recently_used_entries_are_evicted():
+    face_bytes = 16 * 8 + FACE_OVERHEAD
+    cache = EmbeddingCache(max_bytes=2 * face_bytes)
+    cache.put("a", build_faces(1))
+    cache.put("b", build_faces(2))
+    assert cache.get("a") is not None
+
+    cache.put("c", build_faces(3))
+    assert len(cache) == 2
+    assert cache.nbytes == 2 * face_bytes
+    assert cache.get("b") is None
+    assert cache.get("a")[0]["embedding"] == [1] * 16
+
+    # results are copies of the cached entries
+    cache.get("c")[0]["embedding"][0] = 100
+    assert cache.get("c")[0]["embedding"][0] == 3
+
+    logger.info("✅ test embedding cache eviction done")
+
+
+def test_evicted_entries_are_loaded_from_disk(tmp_path):
+    cache = EmbeddingCache(max_bytes=0, path=str(tmp_path / "cache"))
+    cache.put("a", build_faces(1))
+    assert len(cache) == 0
+    assert cache.get("a")[0]["embedding"] == [1] * 16
+
+    # a new process finds entries of the previous ones
+    reopened = EmbeddingCache(path=str(tmp_path / "cache"))
+    assert reopened.get("a")[0]["facial_area"]["w"] == 5
+    assert len(reopened) == 1
+    assert reopened.get("b") is None
+
+    logger.info("✅ test embedding cache disk tier done")
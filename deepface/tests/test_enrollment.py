@@ -0,0 +1,139 @@
+# built-in dependencies
+import os
+import pickle
+import threading
+from unittest import mock
+
+# project dependencies
+from deepface.modules import enrollment, detection
+from deepface.commons import image_utils
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+
+def build_representations(employee: str):
+    return [
+        {
+            "identity": employee,
+            "hash": image_utils.find_image_hash(employee),
+            "embedding": [0.5, 0.5],
+            "target_x": 0,
+            "target_y": 0,
+            "target_w": 10,
+            "target_h": 10,
+        }
+    ]
+
+
+def test_resume_from_checkpoint(tmp_path):
+    employees = {"dataset/img1.jpg", "dataset/img2.jpg"}
+    checkpoint_path = str(tmp_path / "checkpoint.pkl")
+
+    with open(checkpoint_path, "wb") as f:
+        for employee in sorted(employees):
+            representations = build_representations(employee)
+            pickle.dump((employee, representations[0]["hash"], representations), f)
+        complete_size = f.tell()
+        # record cut off by an interruption
+        f.write(pickle.dumps(("dataset/img3.jpg", "", []))[:10])
+
+    checkpointed, size = enrollment._load_checkpoint(checkpoint_path)
+    assert set(checkpointed.keys()) == employees
+    assert size == complete_size
+
+    # all images are completed already, so nothing is detected or embedded again
+    hashing_threads = []
+    find_image_hash = image_utils.find_image_hash
+
+    def record_hashing_thread(file_path: str) -> str:
+        hashing_threads.append(threading.current_thread())
+        return find_image_hash(file_path)
+
+    with mock.patch.object(image_utils, "find_image_hash", side_effect=record_hashing_thread):
+        representations = enrollment.find_bulk_embeddings(
+            employees=employees, silent=True, checkpoint_path=checkpoint_path
+        )
+    assert sorted(rep["identity"] for rep in representations) == sorted(employees)
+    assert all(rep["embedding"] == [0.5, 0.5] for rep in representations)
+    # images are hashed in the pipeline rather than before it starts
+    assert len(hashing_threads) == 2
+    assert threading.main_thread() not in hashing_threads
+
+    logger.info("✅ test resume from checkpoint done")
+
+
+def test_checkpoint_of_modified_image_is_ignored(tmp_path):
+    employee = "dataset/img1.jpg"
+    checkpoint_path = str(tmp_path / "checkpoint.pkl")
+
+    with open(checkpoint_path, "wb") as f:
+        pickle.dump((employee, "outdated-hash", build_representations(employee)), f)
+
+    checkpointed, _ = enrollment._load_checkpoint(checkpoint_path)
+    assert checkpointed[employee][0] != image_utils.find_image_hash(employee)
+
+    logger.info("✅ test checkpoint of modified image done")
+
+
+def test_resume_after_truncated_record(tmp_path):
+    employee = "dataset/img1.jpg"
+    checkpoint_path = str(tmp_path / "checkpoint.pkl")
+
+    with open(checkpoint_path, "wb") as f:
+        representations = build_representations(employee)
+        pickle.dump((employee, representations[0]["hash"], representations), f)
+        # record cut off by an interruption
+        f.write(pickle.dumps(("dataset/img2.jpg", "", []))[:10])
+
+    # img2.jpg is embedded on resume and appended after the last complete record
+    enrollment.find_bulk_embeddings(
+        employees={employee, "dataset/img2.jpg"}, silent=True, checkpoint_path=checkpoint_path
+    )
+
+    checkpointed, size = enrollment._load_checkpoint(checkpoint_path)
+    assert set(checkpointed.keys()) == {employee, "dataset/img2.jpg"}
+    assert len(checkpointed["dataset/img2.jpg"][1]) > 0
+    assert size == os.path.getsize(checkpoint_path)
+
+    logger.info("✅ test resume after truncated record done")
+
+
+def test_failed_images_are_checkpointed(tmp_path):
+    employee = "dataset/img1.jpg"
+    checkpoint_path = str(tmp_path / "checkpoint.pkl")
+
+    # any exception of an image is recorded, not only the ones of images without faces
+    with mock.patch.object(detection, "extract_faces", side_effect=RuntimeError("crashed")):
+        representations = enrollment.find_bulk_embeddings(
+            employees={employee}, silent=True, checkpoint_path=checkpoint_path
+        )
+    assert len(representations) == 1
+    assert representations[0]["embedding"] is None
+
+    checkpointed, _ = enrollment._load_checkpoint(checkpoint_path)
+    assert checkpointed[employee][1][0]["embedding"] is None
+
+    logger.info("✅ test failed images are checkpointed done")
+
+
+def test_unreadable_image_in_process_pool(tmp_path):
+    employee = str(tmp_path / "broken.jpg")
+    with open(employee, "wb") as f:
+        f.write(b"not an image")
+    checkpoint_path = str(tmp_path / "checkpoint.pkl")
+
+    # the path is decoded in the worker process, which fails for this image only
+    representations = enrollment.find_bulk_embeddings(
+        employees={employee},
+        silent=True,
+        use_processes=True,
+        checkpoint_path=checkpoint_path,
+    )
+    assert len(representations) == 1
+    assert representations[0]["embedding"] is None
+
+    checkpointed, _ = enrollment._load_checkpoint(checkpoint_path)
+    assert employee in checkpointed
+
+    logger.info("✅ test unreadable image in process pool done")
@@ -162,3 +162,33 @@ def test_find_without_refresh_database():
         logger.debug(df.head())
         assert df.shape[0] > 0
     logger.info("✅ test find without refresh database done")
+
+
+def test_find_matches_find_batched():
+    img_path = os.path.join("dataset", "img1.jpg")
+    dfs = DeepFace.find(img_path=img_path, db_path="dataset", silent=True)
+    results = DeepFace.find(img_path=img_path, db_path="dataset", silent=True, batched=True)
+
+    assert len(dfs) == len(results)
+    for df, result in zip(dfs, results):
+        assert df.shape[0] == len(result)
+        assert df["identity"].tolist() == [face["identity"] for face in result]
+        assert df["distance"].tolist() == [face["distance"] for face in result]
+        assert "embedding" not in df.columns
+    logger.info("✅ test find matches find batched done")
+
+
+def test_find_with_many_images():
+    img_paths = [os.path.join("dataset", "img1.jpg"), os.path.join("dataset", "img2.jpg")]
+    results = DeepFace.find(img_path=img_paths, db_path="dataset", silent=True)
+    assert len(results) == len(img_paths)
+
+    for img_path, dfs in zip(img_paths, results):
+        # each image is searched as if it was passed alone
+        expected_dfs = DeepFace.find(img_path=img_path, db_path="dataset", silent=True)
+        assert len(dfs) == len(expected_dfs)
+        for df, expected_df in zip(dfs, expected_dfs):
+            assert isinstance(df, pd.DataFrame)
+            assert df["identity"].tolist() == expected_df["identity"].tolist()
+
+    logger.info("✅ test find with many images done")
@@ -101,3 +101,24 @@ def test_filetype_for_find():
     assert not any(face["identity"] == "dataset/img47.jpg" for face in result)
 
     logger.info("✅ test wrong filetype done")
+
+
+def test_find_top_k_and_max_results():
+    img_path = os.path.join("dataset", "img1.jpg")
+    results = DeepFace.find(img_path=img_path, db_path="dataset", silent=True, batched=True)
+    top_results = DeepFace.find(
+        img_path=img_path, db_path="dataset", silent=True, batched=True, top_k=2
+    )
+    assert len(top_results) == len(results)
+    for result, top_result in zip(results, top_results):
+        assert len(top_result) == min(2, len(result))
+        assert [face["identity"] for face in top_result] == [
+            face["identity"] for face in result[:2]
+        ]
+
+    limited_results = DeepFace.find(
+        img_path=img_path, db_path="dataset", silent=True, batched=True, max_results=1
+    )
+    assert sum(len(result) for result in limited_results) == 1
+
+    logger.info("✅ test find with top k and max results done")
@@ -0,0 +1,90 @@
+# built-in dependencies
+import os
+import pickle
+
+# 3rd party dependencies
+import numpy as np
+
+# project dependencies
+from deepface.modules import gallery
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+
+def test_gallery_index_is_cached(tmp_path):
+    first = gallery.get_gallery_index(db_path=str(tmp_path), model_name="Facenet")
+    second = gallery.get_gallery_index(db_path=str(tmp_path), model_name="Facenet")
+    other = gallery.get_gallery_index(db_path=str(tmp_path), model_name="ArcFace")
+    assert first is second
+    assert first is not other
+
+    gallery.clear_gallery_indexes()
+    assert gallery.get_gallery_index(db_path=str(tmp_path), model_name="Facenet") is not first
+
+    logger.info("✅ test gallery index cache done")
+
+
+def test_quantized_pickle_gallery_spills_embeddings(tmp_path):
+    db_path = str(tmp_path)
+    rng = np.random.default_rng(seed=0)
+    embeddings = rng.normal(size=(20, 8)).astype(np.float32)
+    representations = [
+        {
+            "identity": os.path.join(db_path, f"img{i}.jpg"),
+            "hash": str(i),
+            "embedding": embeddings[i].tolist() if i != 3 else None,
+            "target_x": 0,
+            "target_y": 0,
+            "target_w": 10,
+            "target_h": 10,
+        }
+        for i in range(20)
+    ]
+    index = gallery.GalleryIndex(db_path=db_path, model_name="Facenet")
+    with open(index.pickle_path, "wb") as f:
+        pickle.dump(representations, f)
+
+    index.refresh(refresh_database=False)
+    index.quantized_index(kind="int8")
+
+    # exact embeddings are memory mapped instead of kept next to the codes
+    assert isinstance(index.embeddings, np.memmap)
+    assert index.embeddings.dtype == np.float32
+    assert np.array_equal(index.embeddings[index.valid_mask], embeddings[index.valid_mask])
+    assert not index.valid_mask[3]
+
+    logger.info("✅ test quantized pickle gallery spills embeddings done")
+
+
+def test_gallery_snapshot_is_not_modified_by_refresh(tmp_path):
+    db_path = str(tmp_path)
+    representations = [
+        {
+            "identity": os.path.join(db_path, f"img{i}.jpg"),
+            "hash": str(i),
+            "embedding": [float(i), 1.0],
+            "target_x": 0,
+            "target_y": 0,
+            "target_w": 10,
+            "target_h": 10,
+        }
+        for i in range(3)
+    ]
+    index = gallery.GalleryIndex(db_path=db_path, model_name="Facenet")
+    with open(index.pickle_path, "wb") as f:
+        pickle.dump(representations[:2], f)
+    index.refresh(refresh_database=False)
+
+    embeddings, valid_mask, norms, metadata = index.snapshot()
+    # pylint: disable=protected-access
+    index._apply(old_images={representations[0]["identity"]}, new_representations=[])
+    index._apply(old_images=set(), new_representations=representations[2:])
+
+    assert embeddings.shape[0] == valid_mask.shape[0] == norms.shape[0] == 2
+    assert metadata["identity"].tolist() == [rep["identity"] for rep in representations[:2]]
+    assert index.snapshot()[3]["identity"].tolist() == [
+        rep["identity"] for rep in representations[1:]
+    ]
+
+    logger.info("✅ test gallery snapshot done")
@@ -0,0 +1,127 @@
+# built-in dependencies
+import os
+import shutil
+import time
+
+# 3rd party dependencies
+import pytest
+
+# project dependencies
+from deepface.modules.manifest import ScanManifest
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+
+def test_manifest_tracks_new_and_removed_images(tmp_path):
+    db_path = str(tmp_path / "db")
+    os.makedirs(os.path.join(db_path, "user_1"))
+    first_image = os.path.join(db_path, "user_1", "img1.jpg")
+    shutil.copy(os.path.join("dataset", "img1.jpg"), first_image)
+    # webp even though its extension is jpg
+    shutil.copy(os.path.join("dataset", "img47.jpg"), os.path.join(db_path, "img47.jpg"))
+
+    manifest = ScanManifest(root=db_path, path=str(tmp_path / "manifest.pkl"))
+    changed, modified_files = manifest.refresh()
+    assert changed is True
+    assert manifest.images() == {first_image}
+    assert first_image in modified_files
+    manifest.save()
+
+    # persisted manifest is re-used by a new instance
+    reopened = ScanManifest(root=db_path, path=str(tmp_path / "manifest.pkl"))
+    assert reopened.refresh() == (False, set())
+    assert reopened.images() == {first_image}
+
+    second_image = os.path.join(db_path, "user_1", "img2.jpg")
+    shutil.copy(os.path.join("dataset", "img2.jpg"), second_image)
+    os.remove(first_image)
+    os.utime(os.path.join(db_path, "user_1"), ns=(0, 0))
+
+    changed, modified_files = reopened.refresh()
+    assert changed is True
+    assert modified_files == {second_image}
+    assert reopened.images() == {second_image}
+
+    logger.info("✅ test manifest tracks new and removed images done")
+
+
+def test_manifest_tracks_images_overwritten_in_place(tmp_path):
+    db_path = str(tmp_path / "db")
+    os.makedirs(db_path)
+    image = os.path.join(db_path, "img1.jpg")
+    shutil.copy(os.path.join("dataset", "img1.jpg"), image)
+
+    manifest = ScanManifest(root=db_path, path=str(tmp_path / "manifest.pkl"))
+    manifest.refresh()
+    directory_mtime = os.stat(db_path).st_mtime_ns
+
+    # same name, modification time of its directory is kept
+    shutil.copy(os.path.join("dataset", "img2.jpg"), image)
+    os.utime(db_path, ns=(directory_mtime, directory_mtime))
+
+    # files of unchanged directories are not stated unless asked
+    assert manifest.refresh() == (False, set())
+
+    changed, modified_files = manifest.refresh(check_files=True)
+    assert changed is True
+    assert modified_files == {image}
+    assert manifest.refresh(check_files=True) == (False, set())
+
+    logger.info("✅ test manifest tracks images overwritten in place done")
+
+
+def test_watched_manifest_skips_unchanged_tree(tmp_path):
+    pytest.importorskip("watchdog")
+    db_path = str(tmp_path / "db")
+    os.makedirs(db_path)
+    image = os.path.join(db_path, "img1.jpg")
+    shutil.copy(os.path.join("dataset", "img1.jpg"), image)
+
+    manifest = ScanManifest(root=db_path, path=str(tmp_path / "manifest.pkl"))
+    manifest.watch()
+    try:
+        assert manifest.refresh() == (True, {image})
+        manifest.save()
+        # nothing is reported, so the tree is not scanned even if it is changed behind
+        manifest._directories = {}  # pylint: disable=protected-access
+        assert manifest.refresh() == (False, set())
+        # the tree is scanned again once the manifest is reloaded
+        manifest.load()
+        assert manifest.refresh() == (False, set())
+
+        # writing a datastore into db_path is not a change
+        with open(os.path.join(db_path, "ds_model_vggface.pkl"), "wb") as f:
+            f.write(b"0")
+        time.sleep(0.5)
+        assert manifest.refresh() == (False, set())
+        assert len(manifest) == 1
+
+        # overwritten in place, modification time of its directory is kept
+        directory_mtime = os.stat(db_path).st_mtime_ns
+        shutil.copy(os.path.join("dataset", "img2.jpg"), image)
+        os.utime(db_path, ns=(directory_mtime, directory_mtime))
+
+        for _ in range(50):
+            changed, modified_files = manifest.refresh()
+            if changed:
+                break
+            time.sleep(0.1)
+        assert modified_files == {image}
+    finally:
+        manifest.unwatch()
+
+    logger.info("✅ test watched manifest done")
+
+
+def test_manifest_skips_datastores(tmp_path):
+    db_path = str(tmp_path / "db")
+    datastore_path = os.path.join(db_path, "ds_model_vggface_detector_opencv")
+    os.makedirs(datastore_path)
+    shutil.copy(os.path.join("dataset", "img1.jpg"), os.path.join(datastore_path, "img1.jpg"))
+
+    manifest = ScanManifest(root=db_path, path=str(tmp_path / "manifest.pkl"))
+    manifest.refresh()
+    assert len(manifest) == 0
+
+    logger.info("✅ test manifest skips datastores done")
@@ -0,0 +1,43 @@
+# built-in dependencies
+from concurrent.futures import ThreadPoolExecutor
+
+# project dependencies
+from deepface import DeepFace
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+
+def test_concurrent_builds_share_a_model():
+    DeepFace.unload_model(model_name="DeepID")
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        clients = list(executor.map(lambda _: DeepFace.build_model("DeepID"), range(8)))
+
+    assert all(client is clients[0] for client in clients)
+    assert DeepFace.get_loaded_models()["facial_recognition/DeepID"]["bytes"] > 0
+    logger.info("✅ test concurrent builds share a model done")
+
+
+def test_memory_budget_evicts_least_recently_used_models():
+    DeepFace.preload_models(["DeepID"])
+    openface = DeepFace.build_model("OpenFace")
+    DeepFace.build_model("Facenet")
+
+    try:
+        # preloaded models survive any budget, the others are evicted least recently used
+        # first until it is met, which evicts all of them for a budget of 0
+        DeepFace.set_model_memory_budget(0)
+        loaded = DeepFace.get_loaded_models()
+        assert loaded["facial_recognition/DeepID"]["pinned"] is True
+        assert "facial_recognition/OpenFace" not in loaded
+        assert "facial_recognition/Facenet" not in loaded
+
+        assert DeepFace.build_model("OpenFace") is not openface
+    finally:
+        DeepFace.set_model_memory_budget(None)
+
+    assert DeepFace.unload_model(model_name="DeepID") is True
+    assert DeepFace.unload_model(model_name="DeepID") is False
+    assert "facial_recognition/DeepID" not in DeepFace.get_loaded_models()
+    logger.info("✅ test memory budget evicts least recently used models done")
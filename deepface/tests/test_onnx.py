@@ -0,0 +1,113 @@
+# built-in dependencies
+import os
+from unittest import mock
+
+# 3rd party dependencies
+import numpy as np
+import pytest
+
+# project dependencies
+from deepface import DeepFace
+from deepface.modules import verification
+from deepface.models.facial_recognition import ONNX
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("tf2onnx")
+
+
+@pytest.mark.parametrize("model_name", ["Facenet", "VGG-Face"])
+def test_onnx_backend_matches_keras(model_name):
+    keras_client = DeepFace.build_model(model_name=model_name)
+    onnx_client = DeepFace.build_model(model_name=model_name, backend="onnx")
+
+    assert onnx_client is not keras_client
+    assert onnx_client is DeepFace.build_model(model_name=model_name, backend="onnx")
+    assert onnx_client.input_shape == keras_client.input_shape
+    assert onnx_client.output_shape == keras_client.output_shape
+
+    width, height = keras_client.input_shape
+    rng = np.random.default_rng(seed=0)
+    batch = rng.uniform(size=(3, height, width, 3)).astype(np.float32)
+
+    keras_embeddings = np.array(keras_client.forward(batch))
+    onnx_embeddings = np.array(onnx_client.forward(batch))
+    assert onnx_embeddings.shape == keras_embeddings.shape
+
+    distances = verification.find_cosine_distance(keras_embeddings, onnx_embeddings)
+    assert np.all(np.diag(distances) < 1e-4)
+
+    logger.info(f"✅ test onnx backend of {model_name} done")
+
+
+@pytest.mark.parametrize("quantization", ["dynamic", "static"])
+def test_int8_quantization_drift(quantization):
+    report = DeepFace.quantize_model(
+        model_name="Facenet512", db_path="dataset", quantization=quantization, max_images=20
+    )
+    assert report["held_out_faces"] > 0
+    assert report["calibration_faces"] > 0
+    assert report["mean_drift"] <= report["max_drift"]
+    assert report["mean_drift"] < 0.05
+    assert report["decision_changes"] < 0.2
+
+    client = DeepFace.build_model(model_name="Facenet512", quantization=quantization)
+    assert client.model_path == report["model_path"]
+    assert client.output_shape == 512
+
+    logger.info(f"✅ test {quantization} int8 quantization drift done")
+
+
+def test_quantization_from_environment():
+    with mock.patch.dict(os.environ, {"DEEPFACE_QUANTIZATION": "dynamic"}):
+        # represent, verify and find build models without backend and quantization
+        client = DeepFace.build_model(model_name="Facenet")
+        assert client is DeepFace.build_model(model_name="Facenet", quantization="dynamic")
+        assert client.quantization == "dynamic"
+
+        # explicit arguments and models which cannot be quantized keep their own runtime
+        assert DeepFace.build_model(model_name="Facenet", backend="onnx").quantization is None
+        assert not isinstance(DeepFace.build_model(model_name="SFace"), ONNX.ONNXRecognitionClient)
+
+        embedding_objs = DeepFace.represent(img_path="dataset/img1.jpg", model_name="Facenet")
+        assert len(embedding_objs[0]["embedding"]) == 128
+
+    logger.info("✅ test quantization from environment done")
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match="unimplemented backend"):
+        DeepFace.build_model(model_name="Facenet", backend="tensorrt")
+
+    with pytest.raises(ValueError, match="cannot be quantized"):
+        DeepFace.build_model(model_name="SFace", quantization="dynamic")
+
+    with pytest.raises(ValueError, match="tensorflow backend"):
+        DeepFace.build_model(model_name="Facenet", backend="tensorflow", quantization="dynamic")
+
+    logger.info("✅ test unknown backend done")
+
+
+def test_exported_graph_follows_weights(tmp_path, monkeypatch):
+    monkeypatch.setenv("DEEPFACE_HOME", str(tmp_path))
+    weights_path = ONNX.find_weights_path("Facenet")
+    os.makedirs(os.path.dirname(weights_path))
+    with open(weights_path, "wb") as f:
+        f.write(b"weights")
+    model_path = ONNX.find_model_path("Facenet")
+    assert model_path != ONNX.find_model_path("Facenet", quantization="dynamic")
+
+    # changed weights are exported again instead of loading a graph of the old ones
+    with open(weights_path, "wb") as f:
+        f.write(b"updated weights")
+    os.utime(weights_path, (0, 0))
+    assert ONNX.find_model_path("Facenet") != model_path
+
+    # so does another exporter version
+    model_path = ONNX.find_model_path("Facenet")
+    with mock.patch.object(ONNX, "find_exporter_version", return_value="0.0.0"):
+        assert ONNX.find_model_path("Facenet") != model_path
+
+    logger.info("✅ test exported graph follows weights done")
@@ -0,0 +1,79 @@
+# 3rd party dependencies
+import numpy as np
+import pytest
+
+# project dependencies
+from deepface.modules import search
+from deepface.modules.quantization import QuantizedIndex
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+
+@pytest.mark.parametrize("kind", ["float16", "int8", "pq"])
+@pytest.mark.parametrize("distance_metric", ["cosine", "euclidean"])
+def test_compressed_search_finds_closest_rows(tmp_path, kind, distance_metric, build_gallery):
+    embeddings, valid_mask, identities = build_gallery(600)
+    valid_mask[3] = False
+
+    index = QuantizedIndex(
+        path=str(tmp_path / f"{kind}.npz"), kind=kind, normalized=distance_metric == "cosine"
+    )
+    index.sync(embeddings, valid_mask, identities)
+
+    queries = embeddings[:3]
+    thresholds = np.full(3, np.inf)
+    matches = index.search(queries, thresholds, valid_mask, distance_metric, top_k=5)
+    expected = search.search_exhaustive(
+        embeddings, valid_mask, queries, thresholds, distance_metric, top_k=5
+    )
+    for i, ((rows, distances), (expected_rows, _)) in enumerate(zip(matches, expected)):
+        assert rows.shape[0] == 5
+        assert 3 not in rows.tolist()
+        if kind != "pq":
+            assert rows[0] == expected_rows[0]
+            assert np.allclose(distances[0], expected[i][1][0], atol=0.1)
+
+    logger.info(f"✅ test {kind} search with {distance_metric} done")
+
+
+def test_incremental_sync_and_persistence(tmp_path, build_gallery):
+    embeddings, valid_mask, identities = build_gallery(600)
+
+    index = QuantizedIndex(path=str(tmp_path / "int8.npz"), kind="int8", normalized=True)
+    index.sync(embeddings[:500], valid_mask[:500], identities[:500])
+    scale = index.scale.copy()
+
+    index.sync(embeddings, valid_mask, identities)
+    assert index.codes.shape == (600, 32)
+    assert index.codes.dtype == np.uint8
+    # new rows are encoded without re-training
+    assert np.array_equal(index.scale, scale)
+
+    reloaded = QuantizedIndex(path=str(tmp_path / "int8.npz"), kind="int8", normalized=True)
+    assert np.array_equal(reloaded.codes, index.codes)
+
+    # rows of a re-laid out gallery are encoded again
+    reloaded.sync(embeddings[100:], valid_mask[100:], identities[100:])
+    assert reloaded.codes.shape[0] == 500
+
+    logger.info("✅ test quantized index incremental sync done")
+
+
+def test_pq_dots_match_decoded_codes(tmp_path, build_gallery):
+    embeddings, valid_mask, identities = build_gallery(600)
+
+    index = QuantizedIndex(path=str(tmp_path / "pq.npz"), kind="pq", normalized=False)
+    index.sync(embeddings, valid_mask, identities)
+
+    # pylint: disable=protected-access
+    queries = index._prepare(embeddings[:4])
+    subvectors = queries.reshape(queries.shape[0], -1, 8)
+    tables = np.einsum("qms,mks->qmk", subvectors, index.codebooks)
+    decoded = index.codebooks[np.arange(index.codes.shape[1]), index.codes].reshape(600, -1)
+
+    dots = index._find_dots(queries, tables, 0, 600)
+    assert dots.shape == (4, 600)
+    assert np.allclose(dots, queries @ decoded.T, atol=1e-3)
+
+    logger.info("✅ test pq dots done")
@@ -1,5 +1,6 @@
 # built-in dependencies
 import io
+from unittest import mock
 import cv2
 import pytest
 import numpy as np
@@ -7,6 +8,8 @@ import pytest
 
 # project dependencies
 from deepface import DeepFace
+from deepface.commons import image_utils
+from deepface.models.facial_recognition import SFace
 from deepface.commons.logger import Logger
 
 logger = Logger()
@@ -100,6 +103,93 @@ def test_represent_for_skipped_detector_backend_with_preloaded_image():
     logger.info("✅ test represent function for skipped detector and preloaded image done")
 
 
+def test_represent_with_cache(tmp_path):
+    DeepFace.configure_embedding_cache(path=str(tmp_path / "cache"))
+    img_path = "dataset/img1.jpg"
+    embedding_objs = DeepFace.represent(img_path, use_cache=True)
+
+    # a repeated file hits the cache without being decoded
+    with mock.patch.object(image_utils, "load_image", side_effect=AssertionError):
+        cached_objs = DeepFace.represent(img_path, use_cache=True)
+    assert len(cached_objs) == len(embedding_objs)
+    for cached_obj, embedding_obj in zip(cached_objs, embedding_objs):
+        assert cached_obj["embedding"] == embedding_obj["embedding"]
+        assert cached_obj["facial_area"] == embedding_obj["facial_area"]
+
+    # preloaded images are addressed by their pixels
+    img = cv2.imread(img_path)
+    preloaded_objs = DeepFace.represent(img, use_cache=True)
+    assert DeepFace.represent(img.copy(), use_cache=True) == preloaded_objs
+
+    # verify keeps its own entries
+    first = DeepFace.verify("dataset/img1.jpg", "dataset/img2.jpg", use_cache=True)
+    second = DeepFace.verify("dataset/img1.jpg", "dataset/img2.jpg", use_cache=True)
+    assert first["distance"] == second["distance"]
+
+    DeepFace.configure_embedding_cache()
+    logger.info("✅ test represent with cache done")
+
+
+def test_represent_numpy_output():
+    img_path = "dataset/img1.jpg"
+    list_objs = DeepFace.represent(img_path)
+    numpy_objs = DeepFace.represent(img_path, output="numpy")
+
+    assert len(numpy_objs) == len(list_objs)
+    for numpy_obj, list_obj in zip(numpy_objs, list_objs):
+        assert isinstance(numpy_obj["embedding"], np.ndarray)
+        assert numpy_obj["embedding"].dtype == np.float32
+        assert numpy_obj["embedding"].shape == (4096,)
+        assert np.allclose(numpy_obj["embedding"], list_obj["embedding"])
+        assert numpy_obj["facial_area"] == list_obj["facial_area"]
+
+    with pytest.raises(ValueError, match="unimplemented output"):
+        DeepFace.represent(img_path, output="tensor")
+
+    logger.info("✅ test represent with numpy output done")
+
+
+def test_sface_batched_forward_matches_single_faces():
+    model = DeepFace.build_model(model_name="SFace")
+    rng = np.random.default_rng(seed=0)
+    batch = rng.uniform(size=(4, 112, 112, 3)).astype(np.float32)
+
+    embeddings = model.forward(batch, output="numpy")
+    assert embeddings.shape == (4, 128)
+
+    # reference implementation describes a single face per call
+    faces = (batch * 255).astype(np.uint8)
+    expected = np.concatenate([model.model.model.feature(face) for face in faces], axis=0)
+    assert np.allclose(embeddings, expected, atol=1e-4)
+
+    logger.info("✅ test sface batched forward done")
+
+
+def test_sface_stops_batching_after_failure():
+    # a graph exported with a fixed batch size returns a single embedding for a batch
+    net = mock.Mock()
+    net.forward.return_value = np.zeros((1, 128), dtype=np.float32)
+    recognizer = mock.Mock()
+    recognizer.feature.return_value = np.ones((1, 128), dtype=np.float32)
+    with mock.patch.object(SFace.cv, "FaceRecognizerSF") as recognizer_cls, mock.patch.object(
+        SFace.cv.dnn, "readNetFromONNX", return_value=net
+    ):
+        recognizer_cls.create.return_value = recognizer
+        wrapper = SFace.SFaceWrapper(model_path="sface.onnx")
+
+    faces = np.zeros((3, 112, 112, 3), dtype=np.uint8)
+    for _ in range(2):
+        embeddings = wrapper.features(faces)
+        assert embeddings.shape == (3, 128)
+        assert np.all(embeddings == 1)
+
+    # faces are described one by one from the first failure on
+    assert net.forward.call_count == 1
+    assert recognizer.feature.call_count == 6
+
+    logger.info("✅ test sface stops batching after failure done")
+
+
 def test_max_faces():
     # confirm that input image has more than one face
     results = DeepFace.represent(img_path="dataset/couple.jpg")
@@ -0,0 +1,80 @@
+# built-in dependencies
+from multiprocessing import shared_memory
+
+# 3rd party dependencies
+import numpy as np
+import pytest
+
+# project dependencies
+from deepface.modules import search
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+
+def test_assign_shards_by_directory():
+    identities = np.array(
+        ["db/alice/1.jpg", "db/alice/2.jpg", "db/bob/1.jpg", "db/carol/1.jpg", "db/dave.jpg"]
+    )
+    shard_ids = search.assign_shards(identities, num_shards=3, db_path="db", shard_by="directory")
+    assert shard_ids.shape == (5,)
+    assert shard_ids[0] == shard_ids[1]
+    assert ((shard_ids >= 0) & (shard_ids < 3)).all()
+
+    # assignment is stable across calls and processes
+    assert (search.assign_shards(identities, 3, "db", "directory") == shard_ids).all()
+
+    logger.info("✅ test assign shards done")
+
+
+@pytest.mark.parametrize("with_norms", [True, False])
+def test_sharded_search_matches_exhaustive_search(with_norms):
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(1000, 16))
+    valid_mask = rng.random(1000) > 0.1
+    target_embeddings = embeddings[:3] + rng.normal(scale=0.01, size=(3, 16))
+    target_thresholds = np.full(3, 0.9)
+    identities = np.array([f"db/user_{i % 50}/{i}.jpg" for i in range(1000)])
+
+    expected = search.search_exhaustive(
+        embeddings, valid_mask, target_embeddings, target_thresholds, "cosine", top_k=10
+    )
+
+    sharded = search.ShardedGallery(
+        embeddings=embeddings,
+        valid_mask=valid_mask,
+        shard_ids=search.assign_shards(identities, 4, "db", "directory"),
+        num_shards=4,
+        # norms of the gallery are shared with the workers, or found once if not given
+        norms=np.linalg.norm(embeddings, axis=1) if with_norms else None,
+    )
+    try:
+        matches = sharded.search(target_embeddings, target_thresholds, "cosine", top_k=10)
+    finally:
+        sharded.close()
+
+    assert len(matches) == len(expected)
+    for (rows, distances), (expected_rows, expected_distances) in zip(matches, expected):
+        assert rows.tolist() == expected_rows.tolist()
+        assert np.allclose(distances, expected_distances)
+
+    logger.info("✅ test sharded search done")
+
+
+def test_sharded_gallery_releases_workers_and_block():
+    sharded = search.ShardedGallery(
+        embeddings=np.ones((10, 4)),
+        valid_mask=np.ones(10, dtype=bool),
+        shard_ids=np.arange(10) % 2,
+        num_shards=2,
+    )
+    # pylint: disable=protected-access
+    block_name = sharded._block.name
+    # shard workers are lightweight processes, they never load models or tensorflow
+    assert not sharded._pool.submit(eval, "'tensorflow' in __import__('sys').modules").result()
+    sharded.close()
+
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=block_name)
+
+    logger.info("✅ test sharded gallery releases workers and block done")
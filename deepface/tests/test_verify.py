@@ -1,9 +1,11 @@
 # 3rd party dependencies
 import pytest
 import cv2
+import numpy as np
 
 # project dependencies
 from deepface import DeepFace
+from deepface.modules import verification
 from deepface.commons.logger import Logger
 
 logger = Logger()
@@ -144,6 +146,36 @@ def test_verify_for_precalculated_embeddings():
     logger.info("✅ test verify for pre-calculated embeddings done")
 
 
+def test_verify_for_precalculated_numpy_embeddings():
+    model_name = "Facenet"
+
+    img1_embedding = DeepFace.represent(
+        img_path="dataset/img1.jpg", model_name=model_name, output="numpy"
+    )[0]["embedding"]
+    img2_embedding = DeepFace.represent(
+        img_path="dataset/img2.jpg", model_name=model_name, output="numpy"
+    )[0]["embedding"]
+
+    result = DeepFace.verify(
+        img1_path=img1_embedding, img2_path=img2_embedding, model_name=model_name, silent=True
+    )
+    expected = DeepFace.verify(
+        img1_path=img1_embedding.tolist(),
+        img2_path=img2_embedding.tolist(),
+        model_name=model_name,
+        silent=True,
+    )
+    assert result["verified"] is True
+    assert abs(result["distance"] - expected["distance"]) < 1e-6
+
+    with pytest.raises(ValueError, match="When passing img1_path as a numpy array"):
+        DeepFace.verify(
+            img1_path=np.array(["a"] * 128), img2_path=img2_embedding, model_name=model_name
+        )
+
+    logger.info("✅ test verify for pre-calculated numpy embeddings done")
+
+
 def test_verify_with_precalculated_embeddings_for_incorrect_model():
     # generate embeddings with VGG (default)
     img1_path = "dataset/img1.jpg"
@@ -188,3 +220,58 @@ def test_verify_for_nested_embeddings():
         _ = DeepFace.verify(img1_path=img1_embeddings, img2_path=img2_path)
 
     logger.info("✅ test verify for nested embeddings is done")
+
+
+def test_verify_many():
+    img1 = cv2.imread("dataset/img1.jpg")
+    pairs = [
+        ("dataset/img1.jpg", "dataset/img2.jpg"),
+        ("dataset/img1.jpg", "dataset/img3.jpg"),
+        (img1, "dataset/img2.jpg"),
+    ]
+    results = DeepFace.verify_many(pairs, model_name="Facenet", batch_size=2)
+    assert len(results) == 3
+    assert [result["verified"] for result in results] == [True, False, True]
+
+    for (img1_path, img2_path), result in zip(pairs, results):
+        expected = DeepFace.verify(img1_path, img2_path, model_name="Facenet")
+        assert abs(result["distance"] - expected["distance"]) < 1e-4
+        assert result["threshold"] == expected["threshold"]
+        assert result["facial_areas"] == expected["facial_areas"]
+
+    logger.info("✅ test verify many done")
+
+
+@pytest.mark.parametrize("metric", metrics)
+def test_blocked_batch_distances_match_single_distances(metric):
+    rng = np.random.default_rng(seed=0)
+    gallery = rng.normal(size=(50, 16))
+    probes = rng.normal(size=(3, 16))
+
+    distances = verification.find_distance(gallery, probes, metric, chunk_size=7)
+    assert distances.shape == (3, 50)
+    for i, probe in enumerate(probes):
+        for j, embedding in enumerate(gallery):
+            expected = verification.find_distance(embedding, probe, metric)
+            assert abs(distances[i, j] - expected) < 1e-5
+
+    # float32 galleries are not upcasted, and normalized galleries are not normalized again
+    float32_distances = verification.find_distance(gallery.astype(np.float32), probes, metric)
+    assert float32_distances.dtype == np.float32
+    normalized = verification.l2_normalize(gallery, axis=1)
+    if metric != "euclidean":
+        assert np.allclose(
+            verification.find_distance(normalized, probes, metric, alpha_normalized=True),
+            distances,
+            atol=1e-5,
+        )
+
+    # pre-calculated gallery norms give the same distances
+    norms = np.linalg.norm(gallery, axis=1)
+    assert np.allclose(
+        verification.find_distance(gallery, probes, metric, chunk_size=7, alpha_norms=norms),
+        distances,
+        atol=1e-5,
+    )
+
+    logger.info(f"✅ test blocked batch distances for {metric} done")
@@ -0,0 +1,88 @@
+# built-in dependencies
+import sys
+import subprocess
+
+# project dependencies
+from deepface import DeepFace
+from deepface.modules import warmup
+from deepface.commons.logger import Logger
+
+logger = Logger()
+
+
+def test_warmup_in_background():
+    thread = DeepFace.warmup(
+        models=["Facenet", "facial_attribute/Gender"], detectors=["opencv"], batch_sizes=(1, 4)
+    )
+    assert thread is not None
+    thread.join()
+
+    readiness = DeepFace.get_readiness()
+    for name in ["facial_recognition/Facenet", "facial_attribute/Gender", "face_detector/opencv"]:
+        assert readiness[name]["state"] == "ready"
+        assert readiness[name]["seconds"] >= 0
+    assert warmup.is_ready() is True
+
+    # models ready already are not warmed up again
+    assert DeepFace.warmup(models=["Facenet"]) is None
+    logger.info("✅ test warmup in background done")
+
+
+def test_failed_warmup():
+    DeepFace.warmup(models=["facial_attribute/Beauty"], background=False)
+
+    readiness = DeepFace.get_readiness()["facial_attribute/Beauty"]
+    assert readiness["state"] == "failed"
+    assert "Invalid model_name" in readiness["error"]
+    assert warmup.is_ready() is False
+
+    with warmup.readiness_lock:
+        del warmup.readiness["facial_attribute/Beauty"]
+    logger.info("✅ test failed warmup done")
+
+
+def test_model_keys():
+    assert warmup.find_model_keys(["VGG-Face", " facial_attribute/Age", ""]) == [
+        ("facial_recognition", "VGG-Face"),
+        ("facial_attribute", "Age"),
+    ]
+    logger.info("✅ test model keys done")
+
+
+# a master process downloading weights, then forking a worker which builds and runs a model
+FORKED_WORKER_SCRIPT = """
+import multiprocessing
+import numpy as np
+from deepface.modules import modeling, warmup
+
+assert warmup.download_weights(["DeepID"])
+# the master never builds models, so tensorflow has not run before the fork
+assert len(modeling.cached_models) == 0
+
+def serve():
+    client = modeling.build_model(task="facial_recognition", model_name="DeepID")
+    width, height = client.input_shape
+    embeddings = client.forward(np.zeros((2, height, width, 3)), output="numpy")
+    assert embeddings.shape == (2, client.output_shape)
+
+worker = multiprocessing.get_context("fork").Process(target=serve)
+worker.start()
+worker.join(timeout=300)
+if worker.is_alive():
+    worker.kill()
+    raise SystemExit("forked worker hangs")
+raise SystemExit(worker.exitcode)
+"""
+
+
+def test_forked_worker_runs_models():
+    # a fresh interpreter, since models built by other tests ran tensorflow in this one
+    result = subprocess.run(
+        [sys.executable, "-c", FORKED_WORKER_SCRIPT],
+        capture_output=True,
+        text=True,
+        timeout=600,
+        check=False,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    logger.info("✅ test forked worker runs models done")
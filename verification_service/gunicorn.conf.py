@@ -0,0 +1,7 @@
+def post_fork(server, worker):
+    """Warm up a worker as soon as it is forked, otherwise the first health check starts it."""
+    # With --preload, main is imported once in the master, so this does not import it again
+    import main
+
+    if main.DEEPFACE_AVAILABLE:
+        main.DeepFace.warmup(models=main.PRELOAD_MODELS, detectors=main.WARMUP_DETECTORS)
@@ -72,6 +72,24 @@ except ImportError:
     logger.warning("DeepFace not available, using basic OpenCV detection instead")
     DEEPFACE_AVAILABLE = False
 
+# Models to warm up before serving, as task/model_name or model_name for facial recognition
+# models, e.g. VGG-Face,facial_attribute/Age. With gunicorn --preload this module is imported
+# once in the master process, which downloads their weights only. Tensorflow is not fork
+# safe once it runs, so each worker builds its own copy of the models after the fork.
+PRELOAD_MODELS = [
+    model.strip() for model in os.getenv("DEEPFACE_PRELOAD_MODELS", "").split(",") if model.strip()
+]
+# Face detectors to warm up in each worker together with the preloaded models
+WARMUP_DETECTORS = [
+    detector.strip()
+    for detector in os.getenv("DEEPFACE_WARMUP_DETECTORS", "").split(",")
+    if detector.strip()
+]
+if DEEPFACE_AVAILABLE and PRELOAD_MODELS:
+    from deepface.modules import warmup
+    warmup.download_weights(PRELOAD_MODELS)
+
+
 def decode_base64_image(base64_data: str) -> np.ndarray:
     """Decode a base64 image to a numpy array."""
     try:
@@ -378,11 +396,46 @@ def read_root():
 
 @app.get("/health")
 def health_check():
+    """
+    Responds with 503 until the models of this worker are warmed up, so that load balancers
+    route traffic to warm workers only
+    """
+    ready = True
+    readiness = {}
+    if DEEPFACE_AVAILABLE:
+        from deepface.modules import warmup
+        # Workers which are not forked from a preloading master start warming up here
+        DeepFace.warmup(models=PRELOAD_MODELS, detectors=WARMUP_DETECTORS)
+        readiness = DeepFace.get_readiness()
+        ready = warmup.is_ready()
+
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "healthy" if ready else "warming",
+            "service": "Face Verification API",
+            "deepface_available": DEEPFACE_AVAILABLE,
+            "models": readiness,
+            "version": "1.0.0"
+        }
+    )
+
+@app.get("/memory")
+def memory_usage():
+    """
+    Memory of the worker serving the request in bytes. uss is its unique memory, including
+    its own copy of the models, and pages inherited from the master are counted in shared.
+    """
+    try:
+        from deepface.commons import memory_utils
+        usage = memory_utils.find_memory_usage()
+    except (ImportError, ValueError) as e:
+        return JSONResponse(status_code=400, content={"message": str(e)})
+
     return {
-        "status": "healthy",
-        "service": "Face Verification API",
-        "deepface_available": DEEPFACE_AVAILABLE,
-        "version": "1.0.0"
+        "pid": os.getpid(),
+        **usage,
+        "models": DeepFace.get_loaded_models() if DEEPFACE_AVAILABLE else {},
     }
 
 @app.get("/api/verification/status")
@@ -3,5 +3,12 @@
 cd "$(dirname "$0")"
 echo "Starting Face Verification Service..."
 
+# With WORKERS set, serve with gunicorn workers forked after the weights of the models
+# listed in DEEPFACE_PRELOAD_MODELS are downloaded, each worker builds its own models
+if [ -n "$WORKERS" ]; then
+    exec ./venv_deepface/bin/gunicorn main:app --config gunicorn.conf.py --preload --workers "$WORKERS" \
+        --worker-class uvicorn.workers.UvicornWorker --bind 127.0.0.1:8000
+fi
+
 # Use the virtual environment Python with all dependencies
 ./venv_deepface/bin/python main.py